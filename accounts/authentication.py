@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.cache import get_cached_user_data, set_cached_user_data, user_cache_enabled
+from accounts.models import User
+from pros.models import ProfilProfessionnel
+
+# Le hash du mot de passe n'est jamais mis en cache (champ différé, relu à la demande)
+CACHED_FIELDS = tuple(f.attname for f in User._meta.concrete_fields if f.attname != "password")
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sans lecture de la table User à chaque requête.
+    L'utilisateur (rôle, whatsapp_verified, id du profil pro...) vient du cache
+    tant qu'il n'a pas été modifié (cf. accounts.cache).
+    """
+
+    def get_user(self, validated_token):
+        if getattr(api_settings, "CHECK_REVOKE_TOKEN", False) or not user_cache_enabled():
+            # La révocation compare le hash du mot de passe : lecture complète.
+            # Cache désactivé (pas de cache partagé) : comportement standard de simplejwt.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        data = get_cached_user_data(user_id)
+        if data is None:
+            values = (
+                User.objects
+                .filter(**{api_settings.USER_ID_FIELD: user_id})
+                .values(*CACHED_FIELDS)
+                .first()
+            )
+            if values is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            values["_pro_profile_id"] = (
+                ProfilProfessionnel.objects
+                .filter(utilisateur_id=values["id"])
+                .values_list("id", flat=True)
+                .first()
+            )
+            data = values
+            set_cached_user_data(user_id, data)
+
+        data = dict(data)
+        pro_profile_id = data.pop("_pro_profile_id", None)
+        user = User.from_db(User.objects.db, list(data.keys()), list(data.values()))
+        user._pro_profile_id = pro_profile_id
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
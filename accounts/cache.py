@@ -0,0 +1,52 @@
+"""
+Cache court des utilisateurs authentifiés (cf. accounts.authentication).
+
+Chaque requête JWT relisait la ligne User (et souvent le profil pro) :
+on garde ici les colonnes utiles quelques secondes, clé = version du format + id.
+Toute écriture sur User (y compris queryset.update()/delete(), cf. UserQuerySet)
+ou sur le ProfilProfessionnel lié supprime l'entrée, après le commit : supprimée plus tôt,
+une requête concurrente pourrait la recharger depuis l'ancienne ligne pour toute la durée du TTL.
+
+L'invalidation doit atteindre tous les workers : sans cache partagé (CACHE_URL),
+USER_CACHE_TIMEOUT vaut 0 et le cache est désactivé (cf. config.settings).
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# À incrémenter si les colonnes mises en cache changent (les anciennes entrées sont ignorées)
+USER_CACHE_VERSION = 1
+USER_CACHE_KEY = "accounts:user:v{version}:{user_id}"
+
+
+def user_cache_key(user_id) -> str:
+    return USER_CACHE_KEY.format(version=USER_CACHE_VERSION, user_id=user_id)
+
+
+def user_cache_enabled() -> bool:
+    return getattr(settings, "USER_CACHE_TIMEOUT", 0) > 0
+
+
+def get_cached_user_data(user_id) -> Optional[dict]:
+    return cache.get(user_cache_key(user_id))
+
+
+def set_cached_user_data(user_id, data: dict) -> None:
+    cache.set(user_cache_key(user_id), data, timeout=settings.USER_CACHE_TIMEOUT)
+
+
+def invalidate_user_cache(user_id) -> None:
+    if user_id is not None:
+        cle = user_cache_key(user_id)
+        transaction.on_commit(lambda: cache.delete(cle))
+
+
+def invalidate_user_caches(user_ids: Iterable) -> None:
+    """Invalidation en masse (une seule opération sur le cache), après le commit."""
+    cles = [user_cache_key(uid) for uid in user_ids if uid is not None]
+    if cles:
+        transaction.on_commit(lambda: cache.delete_many(cles))
@@ -1,13 +1,42 @@
 from __future__ import annotations
 import random
+import re
 from datetime import timedelta
+from django.apps import apps
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 
+from accounts.cache import invalidate_user_cache, invalidate_user_caches
 
-class UserManager(BaseUserManager):
-    import re
+
+# Numéro normalisé : "+" optionnel puis 8 à 15 chiffres (E.164)
+PHONE_RE = re.compile(r"^\+?\d{8,15}$")
+
+
+class UserQuerySet(models.QuerySet):
+    """
+    Les écritures en masse contournent User.save()/delete() :
+    on invalide ici le cache d'authentification des lignes touchées.
+    """
+
+    def update(self, **kwargs):
+        user_ids = list(self.values_list("pk", flat=True))
+        result = super().update(**kwargs)
+        invalidate_user_caches(user_ids)
+        return result
+
+    def delete(self):
+        user_ids = list(self.values_list("pk", flat=True))
+        result = super().delete()
+        invalidate_user_caches(user_ids)
+        return result
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    def is_valid_phone(self, phone: str) -> bool:
+        """Format attendu après normalize_phone."""
+        return bool(PHONE_RE.match(phone or ""))
 
     def normalize_phone(self, phone: str) -> str:
         phone = str(phone).strip()
@@ -79,6 +108,27 @@ class User(AbstractBaseUser, PermissionsMixin):
     def is_admin(self) -> bool:
         return self.role == self.Role.ADMIN
 
+    def get_pro_profile_id(self):
+        """Id du profil pro (fourni par le cache d'authentification, sinon une requête légère)."""
+        if not hasattr(self, "_pro_profile_id"):
+            self._pro_profile_id = (
+                apps.get_model("pros", "ProfilProfessionnel").objects
+                .filter(utilisateur_id=self.pk)
+                .values_list("id", flat=True)
+                .first()
+            )
+        return self._pro_profile_id
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_user_cache(self.pk)
+
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_user_cache(user_id)
+        return result
+
     def __str__(self) -> str:
         return f"{self.phone} [{self.role}]"
 
@@ -9,6 +9,9 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from accounts.models import User, WhatsAppOTP
 from catalog.models import Job, Location
+from core.templates_messages import MessageTemplates
+from notifications.models import Notification
+from notifications.services import enqueue
 from pros.models import ProfilProfessionnel
 
 
@@ -86,8 +89,8 @@ class RegisterSerializer(serializers.Serializer):
         code = generate_otp_code()
         WhatsAppOTP.create_otp(phone=user.phone, code=code)
 
-        # TODO: Appeler ici votre task Celery ou service pour envoyer le SMS WhatsApp
-        # send_whatsapp_otp.delay(user.phone, code)
+        # 4. Envoi WhatsApp via la boîte d'envoi (même transaction : pas d'OTP perdu ni envoyé pour rien)
+        enqueue(destinataire=user.phone, message=MessageTemplates.code_otp(code), type=Notification.Type.OTP)
 
         return user
 
@@ -151,10 +154,13 @@ class ResendOTPSerializer(serializers.Serializer):
             raise serializers.ValidationError("Numéro inconnu.")
         return phone
 
+    @transaction.atomic
     def create(self, validated_data):
         code = generate_otp_code()
         # create_otp gère l'update si existe déjà
-        return WhatsAppOTP.create_otp(phone=validated_data["phone"], code=code)
+        otp = WhatsAppOTP.create_otp(phone=validated_data["phone"], code=code)
+        enqueue(destinataire=otp.phone, message=MessageTemplates.code_otp(code), type=Notification.Type.OTP)
+        return otp
 
 
 class MeSerializer(serializers.ModelSerializer):
@@ -1,3 +1,27 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from accounts.cache import get_cached_user_data, set_cached_user_data
+from accounts.models import User
+
+
+@override_settings(USER_CACHE_TIMEOUT=60)
+class UserCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(phone="+221770000001", password="motdepasse")
+        self.addCleanup(cache.clear)
+
+    def test_invalidation_attend_le_commit(self):
+        set_cached_user_data(self.user.pk, {"is_active": True})
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            # Avant le commit, une requête concurrente lirait encore l'ancienne ligne
+            self.assertIsNotNone(get_cached_user_data(self.user.pk))
+        self.assertIsNone(get_cached_user_data(self.user.pk))
+
+    def test_save_invalide_apres_commit(self):
+        set_cached_user_data(self.user.pk, {"is_active": True})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertIsNone(get_cached_user_data(self.user.pk))
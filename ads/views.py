@@ -1,15 +1,52 @@
 from rest_framework import generics, permissions
 from django.utils import timezone
+
+from core.fast_list import FastListMixin, file_url, iso_datetime
 from .models import Publicite
 from .serializers import PubliciteSerializer
 
-class PubliciteListView(generics.ListAPIView):
+class PubliciteListView(FastListMixin, generics.ListAPIView):
     """
     Retourne les publicités actives pour le défilement (Espace Pub).
+    GET JSON : rendu rapide via .values() (même schéma que PubliciteSerializer).
     """
     permission_classes = [permissions.AllowAny]
+    query_budget = 4
     serializer_class = PubliciteSerializer
 
+    fast_values = (
+        "id",
+        "titre",
+        "fichier",
+        "lien_redirection",
+        "telephone_appel",
+        "telephone_whatsapp",
+        "date_debut",
+        "duree_jours",
+        "date_fin",
+        "est_active",
+    )
+
+    def get_fast_context(self) -> dict:
+        return {**super().get_fast_context(), "now": timezone.now()}
+
+    def fast_row(self, row: dict, ctx: dict) -> dict:
+        fichier = file_url(Publicite, "fichier", row["fichier"], ctx["request"])
+        return {
+            "id": row["id"],
+            "titre": row["titre"],
+            "fichier": fichier,
+            "fichier_url": fichier,
+            "lien_redirection": row["lien_redirection"],
+            "telephone_appel": row["telephone_appel"],
+            "telephone_whatsapp": row["telephone_whatsapp"],
+            "date_debut": iso_datetime(row["date_debut"]),
+            "duree_jours": row["duree_jours"],
+            "date_fin": iso_datetime(row["date_fin"]),
+            "est_active": row["est_active"],
+            "est_visible": bool(row["est_active"] and row["date_fin"] and row["date_fin"] > ctx["now"]),
+        }
+
     def get_queryset(self):
         now = timezone.now()
         # Retourne les pubs actives dont la date de fin n'est pas passée
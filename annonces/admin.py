@@ -109,10 +109,10 @@ class AnnonceAdmin(admin.ModelAdmin):
 
     @admin.action(description="✅ Approuver les annonces sélectionnées")
     def approuver_annonces(self, request, queryset):
-        rows_updated = queryset.update(est_approuvee=True)
+        rows_updated = Annonce.definir_approbation(queryset, True)
         self.message_user(request, f"{rows_updated} annonces approuvées et mises en ligne.")
 
     @admin.action(description="❌ Rejeter/Masquer les annonces sélectionnées")
     def rejeter_annonces(self, request, queryset):
-        rows_updated = queryset.update(est_approuvee=False)
+        rows_updated = Annonce.definir_approbation(queryset, False)
         self.message_user(request, f"{rows_updated} annonces retirées.")
\ No newline at end of file
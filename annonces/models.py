@@ -3,10 +3,14 @@ from __future__ import annotations
 import uuid
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinLengthValidator, RegexValidator
+from django.utils import timezone
 from django.utils.text import slugify
 
 from catalog.models import JobCategory, Location
+from core.search import refresh_search_vector
 
 PHONE_VALIDATOR = RegexValidator(
     regex=r"^\+?\d{8,15}$",
@@ -85,6 +89,9 @@ class Annonce(models.Model):
         verbose_name="Approuvée par l'admin"
     )
 
+    # tsvector (titre + description, sans accents) maintenu par save() — cf. core.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # Statistiques
     nb_vues = models.PositiveIntegerField(default=0, verbose_name="Nombre de vues")
 
@@ -100,8 +107,14 @@ class Annonce(models.Model):
             models.Index(fields=["categorie", "est_approuvee"]),
             models.Index(fields=["type", "est_approuvee"]),
             models.Index(fields=["slug"]),
+            # Extensions unaccent / pg_trgm : la migration générée pour ces index doit dépendre
+            # de ("core", "0001_postgres_extensions") (makemigrations ne l'ajoute pas)
+            GinIndex(fields=["search_vector"], name="annonce_search_vector_gin"),
+            GinIndex(fields=["titre"], name="annonce_titre_trgm_gin", opclasses=["gin_trgm_ops"]),
         ]
 
+    SEARCH_WEIGHTS = {"titre": "A", "description": "B"}
+
     def save(self, *args, **kwargs):
         # Normalisation du téléphone
         if self.telephone:
@@ -114,5 +127,18 @@ class Annonce(models.Model):
 
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(self.SEARCH_WEIGHTS):
+            refresh_search_vector(Annonce.objects.filter(pk=self.pk), self.SEARCH_WEIGHTS)
+
+    @classmethod
+    def definir_approbation(cls, queryset, approuvee: bool) -> int:
+        """Approbation / rejet en masse : une requête UPDATE sur les seules annonces qui changent d'état."""
+        return (
+            cls.objects.filter(pk__in=queryset.values("pk"))
+            .exclude(est_approuvee=approuvee)
+            .update(est_approuvee=approuvee, mis_a_jour_le=timezone.now())
+        )
+
     def __str__(self):
         return f"[{self.type}] {self.titre}"
\ No newline at end of file
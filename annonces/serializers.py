@@ -1,7 +1,8 @@
 from __future__ import annotations
 from rest_framework import serializers
 from .models import Annonce
-from catalog.serializers import JobCategorySerializer, LocationSerializer
+from catalog.serializers import JobCategoryFlatSerializer, LocationSerializer
+from pros.serializers import ActionEnMasseSerializer
 
 
 class AnnonceSerializer(serializers.ModelSerializer):
@@ -10,7 +11,7 @@ class AnnonceSerializer(serializers.ModelSerializer):
     Gère l'affichage des détails (catégories, lieux) et la validation.
     """
     # Détails imbriqués pour l'affichage (Lecture seule)
-    categorie_details = JobCategorySerializer(source="categorie", read_only=True)
+    categorie_details = JobCategoryFlatSerializer(source="categorie", read_only=True)
     zone_details = LocationSerializer(source="zone_geographique", read_only=True)
 
     # Informations de l'auteur
@@ -54,4 +55,8 @@ class AnnonceSerializer(serializers.ModelSerializer):
 
     def validate_telephone(self, value):
         """Nettoyage final du téléphone avant enregistrement."""
-        return value.replace(" ", "").strip()
\ No newline at end of file
+        return value.replace(" ", "").strip()
+
+
+class ApprobationEnMasseSerializer(ActionEnMasseSerializer):
+    est_approuvee = serializers.BooleanField()
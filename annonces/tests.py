@@ -1,3 +1,21 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase, override_settings
 
-# Create your tests here.
+from annonces.vues import client_key
+
+
+class ClientKeyTests(TestCase):
+    def requete(self, forwarded):
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded)
+        request.user = AnonymousUser()
+        return request
+
+    def test_x_forwarded_for_ignore_sans_proxy_de_confiance(self):
+        self.assertEqual(client_key(self.requete("1.1.1.1")), client_key(self.requete("2.2.2.2")))
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1})
+    def test_entree_ajoutee_par_le_proxy(self):
+        # Le client peut préfixer l'en-tête, pas modifier l'entrée ajoutée par le proxy
+        self.assertEqual(client_key(self.requete("1.1.1.1, 3.3.3.3")), client_key(self.requete("2.2.2.2, 3.3.3.3")))
+        self.assertNotEqual(client_key(self.requete("3.3.3.3")), client_key(self.requete("4.4.4.4")))
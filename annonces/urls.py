@@ -4,7 +4,8 @@ from .views import (
     AnnoncePublicListView,
     MesAnnoncesListView,
     AnnonceDetailView,
-    AdminApprobationAnnonceView
+    AdminApprobationAnnonceView,
+    AdminApprobationEnMasseView,
 )
 
 urlpatterns = [
@@ -21,4 +22,5 @@ urlpatterns = [
 
     # --- Espace Administration ---
     path("admin/<int:pk>/approuver/", AdminApprobationAnnonceView.as_view(), name="admin-annonces-approuver"),
+    path("admin/approbation/", AdminApprobationEnMasseView.as_view(), name="admin-annonces-approbation-masse"),
 ]
\ No newline at end of file
@@ -6,8 +6,13 @@ from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import Annonce
-from .serializers import AnnonceSerializer
+from .serializers import AnnonceSerializer, ApprobationEnMasseSerializer
+from .vues import record_view
 from billing.models import Subscription
+from catalog.models import Location
+from core.fast_list import FastListMixin, iso_datetime
+from core.pagination import PaginationHybride
+from core.search import RechercheTexteFilter
 from pros.permissions import EstAdministrateur
 from .permissions import IsOwnerOrReadOnly
 
@@ -41,23 +46,95 @@ class AnnonceCreateView(generics.CreateAPIView):
         serializer.save(auteur=self.request.user)
 
 
-class AnnoncePublicListView(generics.ListAPIView):
+class AnnoncePublicListView(FastListMixin, generics.ListAPIView):
     """
     Liste publique des annonces validées avec recherche et filtrage.
+    GET JSON : rendu rapide via .values() (même schéma que AnnonceSerializer).
     """
     permission_classes = [permissions.AllowAny]
+    query_budget = 5
     serializer_class = AnnonceSerializer
+    pagination_class = PaginationHybride
+    cursor_ordering = ("-cree_le", "-id")
 
     # Configuration des filtres pour le mobile
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, RechercheTexteFilter]
     filterset_fields = ["type", "categorie", "zone_geographique"]
-    search_fields = ["titre", "description"]
+    search_trigram_field = "titre"
     ordering = ["-cree_le"]
 
+    fast_values = (
+        "id",
+        "type",
+        "titre",
+        "slug",
+        "description",
+        "zone_geographique_id",
+        "zone_geographique__name",
+        "zone_geographique__type",
+        "zone_geographique__slug",
+        "zone_geographique__parent_id",
+        "adresse_precise",
+        "telephone",
+        "categorie_id",
+        "categorie__name",
+        "categorie__slug",
+        "categorie__parent_id",
+        "categorie__parent__name",
+        "auteur_id",
+        "auteur__phone",
+        "est_approuvee",
+        "nb_vues",
+        "cree_le",
+    )
+    LOCATION_TYPES = dict(Location.Type.choices)
+
+    def fast_row(self, row: dict, ctx: dict) -> dict:
+        zone_details = None
+        if row["zone_geographique_id"] is not None:
+            zone_details = {
+                "id": row["zone_geographique_id"],
+                "name": row["zone_geographique__name"],
+                "type": row["zone_geographique__type"],
+                "type_display": self.LOCATION_TYPES.get(row["zone_geographique__type"]),
+                "slug": row["zone_geographique__slug"],
+                "parent": row["zone_geographique__parent_id"],
+            }
+
+        return {
+            "id": row["id"],
+            "type": row["type"],
+            "titre": row["titre"],
+            "slug": row["slug"],
+            "description": row["description"],
+            "zone_geographique": row["zone_geographique_id"],
+            "zone_details": zone_details,
+            "adresse_precise": row["adresse_precise"],
+            "telephone": row["telephone"],
+            "categorie": row["categorie_id"],
+            "categorie_details": {
+                "id": row["categorie_id"],
+                "name": row["categorie__name"],
+                "slug": row["categorie__slug"],
+                "parent": row["categorie__parent_id"],
+                "parent_name": row["categorie__parent__name"],
+            },
+            "auteur_phone": row["auteur__phone"],
+            "est_mon_annonce": ctx["user_id"] is not None and row["auteur_id"] == ctx["user_id"],
+            "est_approuvee": row["est_approuvee"],
+            "nb_vues": row["nb_vues"],
+            "cree_le": iso_datetime(row["cree_le"]),
+        }
+
+    def get_cursor_ordering(self, queryset):
+        if "pertinence" in queryset.query.annotations and not self.request.query_params.get("ordering"):
+            return ("-pertinence", "-id")
+        return self.cursor_ordering
+
     def get_queryset(self):
         # On ne montre que les annonces approuvées par la modération
         return Annonce.objects.filter(est_approuvee=True).select_related(
-            "categorie", "auteur", "zone_geographique"
+            "categorie", "categorie__parent", "auteur", "zone_geographique"
         )
 
 
@@ -69,7 +146,11 @@ class MesAnnoncesListView(generics.ListAPIView):
     serializer_class = AnnonceSerializer
 
     def get_queryset(self):
-        return Annonce.objects.filter(auteur=self.request.user).order_by("-cree_le")
+        return (
+            Annonce.objects.filter(auteur=self.request.user)
+            .select_related("categorie", "categorie__parent", "auteur", "zone_geographique")
+            .order_by("-cree_le")
+        )
 
 
 class AdminApprobationAnnonceView(generics.UpdateAPIView):
@@ -91,6 +172,24 @@ class AdminApprobationAnnonceView(generics.UpdateAPIView):
         return Response({"detail": f"Annonce {status_msg} avec succès."})
 
 
+class AdminApprobationEnMasseView(generics.GenericAPIView):
+    """
+    Approbation / rejet de plusieurs annonces en une requête (modération après campagne).
+    POST {"ids": [...], "est_approuvee": true|false}
+    """
+    permission_classes = [permissions.IsAuthenticated, EstAdministrateur]
+    serializer_class = ApprobationEnMasseSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        est_approuvee = serializer.validated_data["est_approuvee"]
+        modifiees = Annonce.definir_approbation(
+            Annonce.objects.filter(pk__in=serializer.validated_data["ids"]), est_approuvee
+        )
+        return Response({"est_approuvee": est_approuvee, "modifiees": modifiees})
+
+
 # annonces/views.py
 
 class AnnonceDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -108,4 +207,15 @@ class AnnonceDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Astuce simple : On retourne tout, et c'est le Frontend ou une permission
         # plus fine qui gère l'affichage si besoin.
         # Pour faire simple et sécurisé par défaut :
-        return Annonce.objects.all()
\ No newline at end of file
+        return Annonce.objects.all()
+
+    def retrieve(self, request, *args, **kwargs):
+        annonce = self.get_object()
+
+        # Vues comptées en mémoire puis écrites par lots (cf. annonces.vues) ;
+        # ni l'auteur ni les annonces en attente de modération ne sont comptés
+        if annonce.est_approuvee and annonce.auteur_id != getattr(request.user, "id", None):
+            record_view(annonce.pk, request)
+
+        serializer = self.get_serializer(annonce)
+        return Response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+Compteur de vues des annonces (Annonce.nb_vues), sans écriture en base à chaque lecture.
+
+- Seules les annonces approuvées sont comptées (cf. AnnonceDetailView.retrieve).
+- Déduplication : une vue par client et par annonce sur DEDUP_WINDOW (cache.add atomique).
+  Client anonyme = IP (REMOTE_ADDR, ou l'entrée X-Forwarded-For de nos proxies selon NUM_PROXIES) + User-Agent.
+  La garantie tient sur l'ensemble des workers uniquement avec un cache partagé (CACHE_URL=redis://...) :
+  avec le cache local par défaut (locmem), chaque process déduplique de son côté.
+- Agrégation : les incréments sont cumulés dans un tampon local au process.
+- Flush : toutes les FLUSH_INTERVAL secondes (déclenché par les lectures, exécuté en tâche de fond)
+  et à l'arrêt du process, en UN SEUL UPDATE (CASE WHEN par annonce).
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+from rest_framework.throttling import BaseThrottle
+
+from annonces.models import Annonce
+from core.workers import submit
+
+DEDUP_WINDOW = 30 * 60
+FLUSH_INTERVAL = 30
+FLUSH_THRESHOLD = 500  # flush anticipé si le tampon dépasse ce nombre de vues
+
+_buffer: Counter = Counter()
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def client_key(request) -> str:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"u{user.pk}"
+    # X-Forwarded-For est fourni par le client : seule l'entrée ajoutée par nos proxies (NUM_PROXIES) compte
+    ip = BaseThrottle().get_ident(request)
+    agent = request.META.get("HTTP_USER_AGENT", "")
+    return "a" + hashlib.sha1(f"{ip}|{agent}".encode("utf-8")).hexdigest()
+
+
+def record_view(annonce_id: int, request) -> bool:
+    """Enregistre une vue (si non dupliquée). Retourne True si elle a été comptée."""
+    global _last_flush
+
+    if not cache.add(f"annonces:vue:{annonce_id}:{client_key(request)}", 1, timeout=DEDUP_WINDOW):
+        return False
+
+    with _lock:
+        _buffer[annonce_id] += 1
+        due = (
+            time.monotonic() - _last_flush >= FLUSH_INTERVAL
+            or sum(_buffer.values()) >= FLUSH_THRESHOLD
+        )
+        if due:
+            _last_flush = time.monotonic()
+
+    if due:
+        submit(flush_views)
+    return True
+
+
+def flush_views() -> int:
+    """Écrit les vues en attente en une requête. Retourne le nombre d'annonces mises à jour."""
+    with _lock:
+        pending = dict(_buffer)
+        _buffer.clear()
+
+    if not pending:
+        return 0
+
+    increment = Case(
+        *(When(pk=pk, then=Value(n)) for pk, n in pending.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    try:
+        return Annonce.objects.filter(pk__in=pending.keys()).update(nb_vues=F("nb_vues") + increment)
+    except Exception:
+        # On remet les vues dans le tampon pour le prochain flush
+        with _lock:
+            _buffer.update(pending)
+        raise
+
+
+atexit.register(flush_views)
@@ -2,11 +2,14 @@ import json
 from django.contrib import admin
 from django.utils.html import format_html, mark_safe
 from django.utils.translation import gettext_lazy as _
-from .models import Payment, Subscription
+
+from core.exports import ExportAdminMixin
+from .models import Payment, Subscription, WebhookEvent
 
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(ExportAdminMixin, admin.ModelAdmin):
+    export_nom = "payments"
     list_display = (
         'provider_ref',
         'user',
@@ -82,11 +85,7 @@ class PaymentAdmin(admin.ModelAdmin):
         Action utile si le webhook n'est jamais arrivé.
         Force le statut à PAID et lance la logique d'abonnement.
         """
-        count = 0
-        for payment in queryset:
-            if payment.status != Payment.Status.PAID:
-                payment.mark_as_paid()
-                count += 1
+        count = Payment.mark_many_as_paid(queryset)
 
         if count > 0:
             self.message_user(request, f"{count} paiement(s) validé(s) et abonnement(s) activé(s).", level='SUCCESS')
@@ -127,4 +126,12 @@ class SubscriptionAdmin(admin.ModelAdmin):
         return obj.is_active()
 
     is_active_display.boolean = True
-    is_active_display.short_description = "Actif ?"
\ No newline at end of file
+    is_active_display.short_description = "Actif ?"
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'reference', 'event_status', 'statut', 'recu_le', 'traite_le')
+    list_filter = ('statut', 'provider', 'event_status')
+    search_fields = ('event_id', 'reference')
+    readonly_fields = ('provider', 'event_id', 'reference', 'event_status', 'payload', 'erreur', 'recu_le', 'traite_le')
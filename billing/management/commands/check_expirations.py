@@ -1,42 +1,132 @@
+import time
+
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 from django.utils import timezone
-from billing.models import Subscription
+
 from accounts.models import User
+from billing.models import Subscription
+from core.templates_messages import MessageTemplates
+from notifications.models import Notification
+from notifications.services import enqueue_many
+from pros.models import ProfilProfessionnel
 
 
 class Command(BaseCommand):
-    help = "Vérifie les abonnements expirés et désactive la visibilité des pros"
+    help = "Vérifie les abonnements expirés et désactive la visibilité des pros (traitement par lots)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--resync-visibilite",
+            action="store_true",
+            help="Recalcule abonnement_actif_jusqu_au pour tous les profils pros (rattrapage).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Nombre d'abonnements traités par lot (défaut: 1000).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Affiche ce qui serait fait sans rien modifier.",
+        )
 
     def handle(self, *args, **options):
         now = timezone.now()
+        chunk_size = max(1, options["chunk_size"])
+        dry_run = options["dry_run"]
 
-        # 1. Identifier les abonnements actifs qui viennent d'expirer
-        expired_subs = Subscription.objects.filter(
-            status=Subscription.Status.ACTIVE,
-            end_at__lt=now
-        )
+        if options["resync_visibilite"] and not dry_run:
+            total = Subscription.sync_all_pro_visibility()
+            self.stdout.write(f"{total} profils pros resynchronisés.")
 
         count = 0
-        for sub in expired_subs:
-            # Mettre à jour le statut de l'abonnement
-            sub.status = Subscription.Status.EXPIRED
-            sub.save(update_fields=["status"])
-
-            # Désactiver la visibilité du profil pro
-            if hasattr(sub.user, 'pro_profile'):
-                pro = sub.user.pro_profile
-                pro.est_publie = False
-                pro.save(update_fields=["est_publie"])
-
-                # Ici, on pourrait déclencher l'envoi du message WhatsApp via l'API
-                msg = (
-                    "Bonjour cher partenaire,\n"
-                    "Pour être contacté par des potentiels clients sur notre plateforme, "
-                    "nous vous invitons à mettre à jour votre paiement (1000 F seulement). "
-                    "[Lien paiement]"
-                )
-                self.stdout.write(f"Relance à envoyer à {sub.user.phone} : {msg}")
-
-            count += 1
-
-        self.stdout.write(self.style.SUCCESS(f"{count} abonnements expirés traités."))
\ No newline at end of file
+        relances = 0
+        lot = 0
+        last_id = 0
+        while True:
+            debut = time.monotonic()
+            if dry_run:
+                expired = self._select_chunk(now, chunk_size, after_id=last_id)
+            else:
+                with transaction.atomic():
+                    expired = self._expire_chunk(now, chunk_size)
+                    relances += self._apply_side_effects(expired)
+
+            if not expired:
+                break
+
+            lot += 1
+            count += len(expired)
+            last_id = max(sub_id for sub_id, _ in expired)
+            self.stdout.write(
+                f"Lot {lot} : {len(expired)} abonnements "
+                f"{'à expirer' if dry_run else 'expirés'} en {(time.monotonic() - debut) * 1000:.0f} ms"
+            )
+
+            if len(expired) < chunk_size:
+                break
+
+        suffix = " (dry-run, aucune modification)" if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} abonnements expirés traités, {relances} relances mises en file{suffix}."
+        ))
+
+    def _select_chunk(self, now, chunk_size, after_id):
+        return list(
+            Subscription.objects
+            .filter(status=Subscription.Status.ACTIVE, end_at__lt=now, id__gt=after_id)
+            .order_by("id")
+            .values_list("id", "user_id")[:chunk_size]
+        )
+
+    def _expire_chunk(self, now, chunk_size):
+        """
+        UPDATE ... RETURNING : passe un lot d'abonnements en EXPIRED et renvoie (id, user_id).
+        SKIP LOCKED évite de bloquer sur un abonnement en cours de renouvellement (webhook).
+        """
+        table = connection.ops.quote_name(Subscription._meta.db_table)
+        sql = f"""
+            UPDATE {table}
+            SET status = %s, updated_at = %s
+            WHERE id IN (
+                SELECT id FROM {table}
+                WHERE status = %s AND end_at < %s
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, user_id
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [
+                Subscription.Status.EXPIRED, timezone.now(),
+                Subscription.Status.ACTIVE, now,
+                chunk_size,
+            ])
+            return cursor.fetchall()
+
+    def _apply_side_effects(self, expired) -> int:
+        """Retourne le nombre de relances réellement mises en file (hors doublons du jour)."""
+        if not expired:
+            return 0
+        user_ids = [user_id for _, user_id in expired]
+
+        # Dépublication en une requête + recalcul de la colonne de visibilité
+        ProfilProfessionnel.objects.filter(utilisateur_id__in=user_ids).update(est_publie=False)
+        Subscription.sync_all_pro_visibility(user_ids=user_ids)
+
+        # Relances WhatsApp : déposées dans la boîte d'envoi (envoi par le worker de notifications)
+        sub_by_user = {user_id: sub_id for sub_id, user_id in expired}
+        phones = User.objects.filter(id__in=user_ids, pro_profile__isnull=False).values_list("id", "phone")
+        return enqueue_many(
+            Notification(
+                type=Notification.Type.RELANCE_PAIEMENT,
+                destinataire=phone,
+                message=MessageTemplates.RELANCE_PAIEMENT,
+                cle_idempotence=f"relance:{sub_by_user[user_id]}:{timezone.localdate().isoformat()}",
+            )
+            for user_id, phone in phones
+        )
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from billing.models import WebhookEvent
+from billing.webhooks import process_webhook_event
+
+
+class Command(BaseCommand):
+    help = "Rejoue les webhooks de paiement enregistrés mais non traités (worker arrêté, crash...)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=60,
+            help="Ne rejoue que les événements reçus depuis plus de N secondes (défaut: 60).",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Remet aussi en file les événements en ÉCHEC.",
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(seconds=options["older_than"])
+
+        if options["retry_failed"]:
+            relances = WebhookEvent.objects.filter(statut=WebhookEvent.Statut.ECHEC).update(
+                statut=WebhookEvent.Statut.RECU, erreur=""
+            )
+            self.stdout.write(f"{relances} événement(s) en échec remis en file.")
+
+        ids = list(
+            WebhookEvent.objects
+            .filter(statut=WebhookEvent.Statut.RECU, recu_le__lte=limite)
+            .order_by("recu_le")
+            .values_list("id", flat=True)
+        )
+        for event_id in ids:
+            process_webhook_event(event_id)
+
+        traites = WebhookEvent.objects.filter(pk__in=ids, statut=WebhookEvent.Statut.TRAITE).count()
+        self.stdout.write(self.style.SUCCESS(f"{traites}/{len(ids)} événement(s) rejoué(s) avec succès."))
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 from datetime import timedelta
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, Value, When
 from django.utils import timezone
 
+from pros.models import ProfilProfessionnel
+
 
 class Payment(models.Model):
     """
@@ -58,17 +61,58 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=["provider_ref"]),
             models.Index(fields=["status"]),
+            # Exports par période (rapprochement mensuel)
+            models.Index(fields=["created_at"]),
         ]
 
-    def mark_as_paid(self):
-        """Marque le paiement comme réussi et déclenche l'abonnement."""
-        if self.status != self.Status.PAID:
+    def mark_as_paid(self) -> bool:
+        """
+        Marque le paiement comme réussi et déclenche l'abonnement.
+        La ligne est verrouillée (SELECT ... FOR UPDATE) : en cas d'appels concurrents
+        (webhook rejoué, validation admin), l'abonnement n'est prolongé qu'une seule fois.
+        Retourne False si le paiement était déjà payé.
+        """
+        with transaction.atomic():
+            statut = (
+                Payment.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("status", flat=True)
+                .first()
+            )
+            if statut == self.Status.PAID:
+                self.status = statut
+                return False
+
             self.status = self.Status.PAID
             self.paid_at = timezone.now()
             self.save(update_fields=["status", "paid_at"])
 
             # Déclenchement automatique de l'abonnement
             Subscription.activate_for_user(self.user, self)
+        return True
+
+    @classmethod
+    def mark_many_as_paid(cls, queryset) -> int:
+        """
+        Version ensembliste de mark_as_paid (validation admin en masse), dans une transaction :
+        paiements verrouillés puis passés à PAID en une requête, abonnements créés ou prolongés
+        de 30 jours par paiement (une requête par nombre de paiements d'un même utilisateur),
+        visibilité des profils resynchronisée en une requête.
+        Retourne le nombre de paiements validés (ceux déjà payés sont ignorés).
+        """
+        with transaction.atomic():
+            # Verrou sur les seuls paiements (la liste admin peut porter des jointures)
+            ids = list(
+                cls.objects.select_for_update()
+                .filter(pk__in=queryset.values("pk"))
+                .exclude(status=cls.Status.PAID)
+                .values_list("id", flat=True)
+            )
+            if not ids:
+                return 0
+            cls.objects.filter(pk__in=ids).update(status=cls.Status.PAID, paid_at=timezone.now())
+            Subscription.activate_for_users(ids)
+        return len(ids)
 
     def __str__(self) -> str:
         return f"Payment {self.provider_ref} - {self.amount} {self.currency} ({self.status})"
@@ -115,6 +159,45 @@ class Subscription(models.Model):
             models.Index(fields=["user", "status"]),
         ]
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.sync_pro_visibility()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.sync_pro_visibility()
+        return result
+
+    def sync_pro_visibility(self):
+        """
+        Recopie la fin de l'abonnement ACTIVE sur ProfilProfessionnel.abonnement_actif_jusqu_au
+        (colonne lue par la recherche publique à la place d'une sous-requête par ligne).
+        """
+        fin = (
+            Subscription.objects
+            .filter(user_id=self.user_id, status=self.Status.ACTIVE)
+            .aggregate(fin=Max("end_at"))["fin"]
+        )
+        ProfilProfessionnel.objects.filter(utilisateur_id=self.user_id).update(abonnement_actif_jusqu_au=fin)
+
+    @classmethod
+    def sync_all_pro_visibility(cls, user_ids=None) -> int:
+        """
+        Resynchronisation ensembliste (une seule requête UPDATE) des profils
+        (tous, ou ceux des `user_ids` donnés).
+        Utile après un import ou une modification en masse des abonnements.
+        """
+        fin_active = (
+            cls.objects
+            .filter(user_id=OuterRef("utilisateur_id"), status=cls.Status.ACTIVE, end_at__isnull=False)
+            .order_by("-end_at")
+            .values("end_at")[:1]
+        )
+        profils = ProfilProfessionnel.objects.all()
+        if user_ids is not None:
+            profils = profils.filter(utilisateur_id__in=user_ids)
+        return profils.update(abonnement_actif_jusqu_au=Subquery(fin_active))
+
     def is_active(self) -> bool:
         """Vérifie si l'abonnement est valide à l'instant T."""
         if self.status != self.Status.ACTIVE:
@@ -129,8 +212,8 @@ class Subscription(models.Model):
         Logique métier : Crée ou prolonge un abonnement de 30 jours.
         Appelé automatiquement dès qu'un paiement est 'PAID'.
         """
-        # On récupère l'abonnement actif actuel ou on en crée un
-        sub, created = cls.objects.get_or_create(
+        # On récupère l'abonnement actif actuel ou on en crée un (verrouillé jusqu'au commit)
+        sub, created = cls.objects.select_for_update().get_or_create(
             user=user,
             defaults={'status': cls.Status.ACTIVE}
         )
@@ -154,5 +237,84 @@ class Subscription(models.Model):
             user.pro_profile.est_publie = True
             user.pro_profile.save(update_fields=["est_publie"])
 
+    @classmethod
+    def activate_for_users(cls, payment_ids) -> None:
+        """
+        Équivalent ensembliste de activate_for_user pour des paiements déjà passés à PAID.
+        Un utilisateur avec N paiements obtient N x 30 jours, comme N appels successifs.
+        """
+        maintenant = timezone.now()
+        par_utilisateur = dict(
+            Payment.objects.filter(pk__in=payment_ids)
+            .values_list("user_id").annotate(n=Count("id")).order_by()
+        )
+        user_ids = list(par_utilisateur)
+
+        # Abonnements manquants créés d'un coup (verrou sur les existants jusqu'au commit)
+        existants = set(cls.objects.select_for_update().filter(user_id__in=user_ids).values_list("user_id", flat=True))
+        cls.objects.bulk_create(
+            [cls(user_id=uid, status=cls.Status.EXPIRED) for uid in user_ids if uid not in existants]
+        )
+
+        dernier_paiement = (
+            Payment.objects.filter(pk__in=payment_ids, user_id=OuterRef("user_id"))
+            .order_by("-created_at", "-pk").values("pk")[:1]
+        )
+        actif = Q(status=cls.Status.ACTIVE, end_at__gt=maintenant)
+        groupes = {}
+        for uid, n in par_utilisateur.items():
+            groupes.setdefault(n, []).append(uid)
+        for n, uids in groupes.items():
+            duree = timedelta(days=30 * n)
+            cls.objects.filter(user_id__in=uids).update(
+                start_at=Case(When(actif, then=F("start_at")), default=Value(maintenant)),
+                end_at=Case(When(actif, then=F("end_at") + duree), default=Value(maintenant + duree)),
+                status=cls.Status.ACTIVE,
+                last_payment_id=Subquery(dernier_paiement),
+                updated_at=maintenant,
+            )
+
+        ProfilProfessionnel.objects.filter(utilisateur_id__in=user_ids).update(
+            est_publie=True, mis_a_jour_le=maintenant
+        )
+        cls.sync_all_pro_visibility(user_ids)
+
+    def __str__(self) -> str:
+        return f"Abonnement {self.user.phone} ({self.status})"
+
+
+class WebhookEvent(models.Model):
+    """
+    Registre des notifications reçues de la passerelle.
+    La contrainte d'unicité (provider, event_id) rend les rejeux gratuits :
+    un événement déjà enregistré est acquitté sans être retraité.
+    """
+
+    class Statut(models.TextChoices):
+        RECU = "RECU", "Reçu"
+        TRAITE = "TRAITE", "Traité"
+        ECHEC = "ECHEC", "Échec"
+
+    provider = models.CharField(max_length=20, choices=Payment.Provider.choices, default=Payment.Provider.BICTORYS)
+    event_id = models.CharField(max_length=160, help_text="Identifiant de l'événement (ou référence:statut)")
+    reference = models.CharField(max_length=120, db_index=True)
+    event_status = models.CharField(max_length=40, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+
+    statut = models.CharField(max_length=20, choices=Statut.choices, default=Statut.RECU)
+    erreur = models.TextField(blank=True)
+
+    recu_le = models.DateTimeField(auto_now_add=True)
+    traite_le = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-recu_le"]
+        constraints = [
+            models.UniqueConstraint(fields=["provider", "event_id"], name="webhook_event_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["statut", "recu_le"]),
+        ]
+
     def __str__(self) -> str:
-        return f"Abonnement {self.user.phone} ({self.status})"
\ No newline at end of file
+        return f"{self.provider} {self.event_id} ({self.statut})"
\ No newline at end of file
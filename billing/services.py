@@ -4,6 +4,8 @@ import hmac
 import hashlib
 import os
 import logging
+import threading
+import time
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 from urllib.parse import urlencode
@@ -15,6 +17,8 @@ logger = logging.getLogger(__name__)
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     requests = None
 
@@ -44,6 +48,154 @@ def get_bictorys_config() -> BictorysConfig:
     )
 
 
+class GatewayUnavailable(RuntimeError):
+    """Passerelle injoignable, en erreur, ou disjoncteur ouvert (échec rapide)."""
+
+    def __init__(self, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur (par process) : après `failure_threshold` échecs consécutifs,
+    les appels échouent immédiatement pendant `reset_timeout` secondes,
+    puis un appel d'essai est laissé passer (demi-ouvert).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: int = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> int:
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            restant = self._opened_at + self.reset_timeout - time.monotonic()
+            return int(restant) + 1 if restant > 0 else 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Demi-ouvert : on laisse passer un essai, le prochain échec rouvre aussitôt
+                self._opened_at = None
+                self._failures = self.failure_threshold - 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class BictorysClient:
+    """
+    Client HTTP de la passerelle : une Session partagée (connexions keep-alive réutilisées),
+    timeouts courts, nouveaux essais bornés et disjoncteur.
+    Les nouveaux essais ne portent que sur les cas où la requête n'a pas été traitée
+    (échec de connexion, 429/503) : la charge n'est jamais créée deux fois.
+    """
+
+    def __init__(self, cfg: BictorysConfig):
+        if requests is None:
+            raise RuntimeError("Le package 'requests' est manquant. Installez-le avec 'pip install requests'.")
+        if not cfg.api_key:
+            raise ValueError("BICTORYS_API_KEY est manquante dans les variables d'environnement.")
+
+        self.cfg = cfg
+        self.timeout = (
+            float(os.getenv("BICTORYS_CONNECT_TIMEOUT", "3")),
+            float(os.getenv("BICTORYS_READ_TIMEOUT", "8")),
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("BICTORYS_BREAKER_THRESHOLD", "5")),
+            reset_timeout=int(os.getenv("BICTORYS_BREAKER_RESET", "30")),
+        )
+
+        retry = Retry(
+            total=2,
+            connect=2,
+            read=0,
+            status=2,
+            backoff_factor=0.3,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {cfg.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        })
+
+    def create_checkout(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.breaker.allow():
+            raise GatewayUnavailable("Passerelle Bictorys indisponible (disjoncteur ouvert).", self.breaker.retry_after())
+
+        # Endpoint officiel Bictorys pour les charges
+        url = f"{self.cfg.base_url}/pay/v1/charges"
+        try:
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self.breaker.record_failure()
+            logger.error(f"Erreur API Bictorys: {str(e)}")
+            raise GatewayUnavailable(f"La passerelle de paiement Bictorys est indisponible : {e}")
+
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.record_failure()
+            logger.error(f"Erreur API Bictorys: HTTP {response.status_code}")
+            raise GatewayUnavailable(f"La passerelle de paiement Bictorys est indisponible (HTTP {response.status_code}).")
+
+        # La passerelle a répondu : elle est joignable, même si la requête est refusée
+        self.breaker.record_success()
+        try:
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.HTTPError, ValueError) as e:
+            logger.error(f"Réponse Bictorys invalide : {e}")
+            raise RuntimeError(f"Réponse Bictorys invalide : {e}")
+
+        # Bictorys peut renvoyer 'checkout_url', 'payment_url' ou 'url'
+        checkout_url = data.get("checkout_url") or data.get("payment_url") or data.get("url")
+
+        if not checkout_url:
+            logger.error(f"Réponse Bictorys sans URL : {data}")
+            raise RuntimeError("URL de paiement non générée par Bictorys.")
+
+        return {"checkout_url": checkout_url, "provider_payload": data}
+
+
+_client: Optional[BictorysClient] = None
+_client_lock = threading.Lock()
+
+
+def get_bictorys_client() -> BictorysClient:
+    """Client partagé par process (pool de connexions + état du disjoncteur)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = BictorysClient(get_bictorys_config())
+    return _client
+
+
 def bictorys_create_checkout(
         *,
         reference: str,
@@ -54,6 +206,7 @@ def bictorys_create_checkout(
 ) -> Dict[str, Any]:
     """
     Initialise une session de paiement avec Bictorys.
+    Ne doit pas être appelée dans une transaction : c'est un appel réseau.
     """
     cfg = get_bictorys_config()
 
@@ -67,15 +220,6 @@ def bictorys_create_checkout(
         }
 
     # --- MODE PRODUCTION ---
-    if requests is None:
-        raise RuntimeError("Le package 'requests' est manquant. Installez-le avec 'pip install requests'.")
-
-    if not cfg.api_key:
-        raise ValueError("BICTORYS_API_KEY est manquante dans les variables d'environnement.")
-
-    # Endpoint officiel Bictorys pour les charges
-    url = f"{cfg.base_url}/pay/v1/charges"
-
     payload = {
         "reference": reference,
         "amount": amount,
@@ -87,30 +231,14 @@ def bictorys_create_checkout(
         },
         "metadata": metadata or {},
     }
+    return get_bictorys_client().create_checkout(payload)
 
-    headers = {
-        "Authorization": f"Bearer {cfg.api_key}",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-
-        # Bictorys peut renvoyer 'checkout_url', 'payment_url' ou 'url'
-        checkout_url = data.get("checkout_url") or data.get("payment_url") or data.get("url")
-
-        if not checkout_url:
-            logger.error(f"Réponse Bictorys sans URL : {data}")
-            raise RuntimeError("URL de paiement non générée par Bictorys.")
 
-        return {"checkout_url": checkout_url, "provider_payload": data}
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Erreur API Bictorys: {str(e)}")
-        raise RuntimeError(f"La passerelle de paiement Bictorys est indisponible : {e}")
+def bictorys_circuit_open() -> bool:
+    """True si le disjoncteur refuse les appels (le mode mock n'est jamais coupé)."""
+    if _client is None or get_bictorys_config().mock:
+        return False
+    return _client.breaker.retry_after() > 0
 
 
 def verify_bictorys_signature(raw_body: bytes, signature: str) -> bool:
@@ -1,3 +1,136 @@
-from django.test import TestCase
+import json
+import os
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from billing.models import Payment, Subscription, WebhookEvent
+from billing.webhooks import process_webhook_event
+from pros.models import ProfilProfessionnel
+from pros.testing import creer_catalogue, creer_pro
+
+
+@override_settings(BACKGROUND_TASKS_SYNC=True)
+@mock.patch.dict(os.environ, {"BICTORYS_MOCK": "true", "BICTORYS_WEBHOOK_SECRET": ""})
+class WebhookIdempotenceTests(TestCase):
+    def setUp(self):
+        zone, metier = creer_catalogue()
+        self.user = creer_pro("+221770000001", metier, zone, visible=False).utilisateur
+        self.payment = Payment.objects.create(user=self.user, provider_ref="ref-1")
+
+    def poster(self, **data):
+        body = {"reference": "ref-1", "status": "PAID", **data}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/billing/webhooks/bictorys/", json.dumps(body), content_type="application/json")
+
+    def test_rejeu_acquitte_sans_prolonger_deux_fois(self):
+        premier = self.poster()
+        self.assertEqual(premier.json()["status"], "accepted")
+        fin = Subscription.objects.get(user=self.user).end_at
+
+        rejeu = self.poster()
+        self.assertEqual(rejeu.status_code, 200)
+        self.assertEqual(rejeu.json()["status"], "duplicate")
+
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.assertEqual(Subscription.objects.get(user=self.user).end_at, fin)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PAID)
+
+    def test_meme_evenement_retraite_est_sans_effet(self):
+        self.poster(id="evt-1")
+        event = WebhookEvent.objects.get()
+        fin = Subscription.objects.get(user=self.user).end_at
+
+        process_webhook_event(event.pk)
+
+        self.assertEqual(Subscription.objects.get(user=self.user).end_at, fin)
+
+    def test_echec_tardif_n_annule_pas_un_paiement_encaisse(self):
+        self.poster(id="evt-paid")
+        self.poster(id="evt-failed", status="FAILED")
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PAID)
+        self.assertEqual(WebhookEvent.objects.filter(statut=WebhookEvent.Statut.TRAITE).count(), 2)
+
+
+class MarkManyAsPaidTests(TestCase):
+    """mark_many_as_paid doit produire le même état que des appels successifs à mark_as_paid."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.zone, cls.metier = creer_catalogue()
+
+    def preparer(self, prefixe):
+        # Utilisateur avec abonnement actif (10 jours restants) + 1 paiement ;
+        # utilisateur sans abonnement + 2 paiements ; utilisateur expiré + 1 paiement ; 1 paiement déjà payé
+        maintenant = timezone.now()
+        actif, nouveau, expire = (
+            creer_pro(f"{prefixe}{i}", self.metier, self.zone, visible=False).utilisateur for i in range(3)
+        )
+        Subscription.objects.create(
+            user=actif, status=Subscription.Status.ACTIVE,
+            start_at=maintenant - timedelta(days=20), end_at=maintenant + timedelta(days=10),
+        )
+        Subscription.objects.create(
+            user=expire, status=Subscription.Status.ACTIVE,
+            start_at=maintenant - timedelta(days=40), end_at=maintenant - timedelta(days=10),
+        )
+        paiements = [
+            Payment.objects.create(user=actif, provider_ref=f"{prefixe}-a1"),
+            Payment.objects.create(user=nouveau, provider_ref=f"{prefixe}-n1"),
+            Payment.objects.create(user=nouveau, provider_ref=f"{prefixe}-n2"),
+            Payment.objects.create(user=expire, provider_ref=f"{prefixe}-e1"),
+            Payment.objects.create(
+                user=actif, provider_ref=f"{prefixe}-deja", status=Payment.Status.PAID, paid_at=maintenant,
+            ),
+        ]
+        return [actif, nouveau, expire], paiements
+
+    def etat(self, users):
+        lignes = []
+        for user in users:
+            sub = Subscription.objects.get(user=user)
+            pro = ProfilProfessionnel.objects.get(utilisateur=user)
+            lignes.append({
+                "status": sub.status,
+                "end_at": sub.end_at,
+                "start_at": sub.start_at,
+                "last_payment_ref": sub.last_payment.provider_ref.split("-", 1)[1],
+                "est_publie": pro.est_publie,
+                "visible_jusqu_au": pro.abonnement_actif_jusqu_au,
+            })
+        return lignes
+
+    def assertEtatsEquivalents(self, a, b):
+        self.assertEqual(len(a), len(b))
+        for x, y in zip(a, b):
+            for cle in ("status", "last_payment_ref", "est_publie"):
+                self.assertEqual(x[cle], y[cle], cle)
+            # Les deux chemins lisent l'heure à quelques millisecondes d'écart
+            for cle in ("end_at", "start_at", "visible_jusqu_au"):
+                self.assertAlmostEqual(x[cle], y[cle], delta=timedelta(seconds=5), msg=cle)
+
+    def test_equivalence_avec_mark_as_paid(self):
+        users_a, paiements_a = self.preparer("+22177000010")
+        for payment in paiements_a:
+            payment.mark_as_paid()
+
+        users_b, paiements_b = self.preparer("+22177000020")
+        valides = Payment.mark_many_as_paid(Payment.objects.filter(pk__in=[p.pk for p in paiements_b]))
+
+        self.assertEqual(valides, 4)
+        self.assertFalse(Payment.objects.filter(pk__in=[p.pk for p in paiements_b]).exclude(status="PAID").exists())
+        self.assertEtatsEquivalents(self.etat(users_a), self.etat(users_b))
+
+    def test_deuxieme_appel_sans_effet(self):
+        _, paiements = self.preparer("+22177000030")
+        qs = Payment.objects.filter(pk__in=[p.pk for p in paiements])
+        Payment.mark_many_as_paid(qs)
+        fins = list(Subscription.objects.order_by("pk").values_list("end_at", flat=True))
+
+        self.assertEqual(Payment.mark_many_as_paid(qs), 0)
+        self.assertEqual(list(Subscription.objects.order_by("pk").values_list("end_at", flat=True)), fins)
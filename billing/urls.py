@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CheckoutView, BictorysWebhookView, SubscriptionMeView
+from .views import CheckoutView, BictorysWebhookView, SubscriptionMeView, AdminValidationPaiementsView
 
 urlpatterns = [
     # --- Souscriptions ---
@@ -12,4 +12,8 @@ urlpatterns = [
     # --- Webhooks (Notifications de paiement) ---
     # Endpoint appelé par Bictorys après le paiement (Public)
     path("webhooks/bictorys/", BictorysWebhookView.as_view(), name="bictorys-webhook"),
+
+    # --- Administration ---
+    # POST {"ids": [...]} : validation manuelle en masse
+    path("admin/paiements/valider/", AdminValidationPaiementsView.as_view(), name="admin-paiements-valider"),
 ]
\ No newline at end of file
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import os
 import uuid
-from django.db import transaction
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -11,7 +10,11 @@ from rest_framework import permissions, status, generics
 from accounts.models import User
 from billing.models import Payment, Subscription
 from billing.serializers import CheckoutSerializer, SubscriptionMeSerializer
-from billing.services import bictorys_create_checkout, verify_bictorys_signature
+from billing.services import bictorys_circuit_open, bictorys_create_checkout, verify_bictorys_signature
+from billing.webhooks import process_webhook_event, record_event
+from core.workers import submit_after_commit
+from pros.permissions import EstAdministrateur
+from pros.serializers import ActionEnMasseSerializer
 
 
 class CheckoutView(APIView):
@@ -34,50 +37,62 @@ class CheckoutView(APIView):
         amount = serializer.validated_data["amount"]
         currency = serializer.validated_data["currency"]
 
+        # Échec rapide si la passerelle est connue comme indisponible (aucun paiement créé)
+        if bictorys_circuit_open():
+            return self._gateway_unavailable()
+
+        # Phase 1 : intention de paiement (écriture courte, pas de transaction ouverte pendant l'appel réseau)
         # Référence unique pour Bictorys (Checkout Token)
-        provider_ref = uuid.uuid4().hex
-
-        with transaction.atomic():
-            payment = Payment.objects.create(
-                user=request.user,
-                provider=Payment.Provider.BICTORYS,
-                provider_ref=provider_ref,
-                amount=amount,
-                currency=currency,
-                status=Payment.Status.PENDING,
+        payment = Payment.objects.create(
+            user=request.user,
+            provider=Payment.Provider.BICTORYS,
+            provider_ref=uuid.uuid4().hex,
+            amount=amount,
+            currency=currency,
+            status=Payment.Status.PENDING,
+        )
+
+        # Phase 2 : appel au service Bictorys (Sénégal), hors transaction
+        try:
+            checkout = bictorys_create_checkout(
+                reference=payment.provider_ref,
+                amount=payment.amount,
+                currency=payment.currency,
+                customer_phone=request.user.phone,
+                metadata={"user_id": request.user.id},
+            )
+        except Exception as e:
+            # En cas d'échec de communication avec la passerelle : le paiement ne reste pas en attente
+            Payment.objects.filter(pk=payment.pk, status=Payment.Status.PENDING).update(
+                status=Payment.Status.FAILED,
+                payload={"checkout_error": str(e)[:500]},
             )
+            return self._gateway_unavailable(getattr(e, "retry_after", None))
+
+        Payment.objects.filter(pk=payment.pk).update(payload={"checkout": checkout.get("provider_payload", {})})
 
-            # Appel au service Bictorys (Sénégal)
-            try:
-                checkout = bictorys_create_checkout(
-                    reference=payment.provider_ref,
-                    amount=payment.amount,
-                    currency=payment.currency,
-                    customer_phone=request.user.phone,
-                    metadata={"user_id": request.user.id},
-                )
-
-                payment.payload = {"checkout": checkout.get("provider_payload", {})}
-                payment.save(update_fields=["payload"])
-
-                return Response({
-                    "payment_id": payment.id,
-                    "checkout_url": checkout["checkout_url"],
-                    "provider_ref": payment.provider_ref
-                }, status=status.HTTP_201_CREATED)
-
-            except Exception as e:
-                # En cas d'échec de communication avec la passerelle
-                return Response(
-                    {"detail": "Erreur lors de la communication avec Bictorys."},
-                    status=status.HTTP_503_SERVICE_UNAVAILABLE
-                )
+        return Response({
+            "payment_id": payment.id,
+            "checkout_url": checkout["checkout_url"],
+            "provider_ref": payment.provider_ref
+        }, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def _gateway_unavailable(retry_after=None):
+        response = Response(
+            {"detail": "Erreur lors de la communication avec Bictorys."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        if retry_after:
+            response["Retry-After"] = str(retry_after)
+        return response
 
 
 class BictorysWebhookView(APIView):
     """
     Réceptionne les notifications de paiement de Bictorys.
-    C'est ici que l'abonnement s'active automatiquement (PAID).
+    Acquittement rapide : l'événement est enregistré puis traité en tâche de fond
+    (cf. billing.webhooks), où l'abonnement s'active automatiquement (PAID).
     """
     permission_classes = [permissions.AllowAny]
     authentication_classes = []  # Pas de JWT pour les appels externes
@@ -97,24 +112,24 @@ class BictorysWebhookView(APIView):
         if not provider_ref:
             return Response({"detail": "Référence manquante"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 2. Récupération du paiement
-        payment = Payment.objects.filter(provider_ref=provider_ref).first()
-        if not payment:
+        # 2. Vérification du paiement (lecture indexée, sans verrou)
+        if not Payment.objects.filter(provider_ref=provider_ref).exists():
             return Response({"detail": "Paiement non trouvé"}, status=status.HTTP_404_NOT_FOUND)
 
-        # 3. Traitement selon le statut renvoyé
-        if event_status in ("PAID", "SUCCESS", "COMPLETED"):
-            if payment.status != Payment.Status.PAID:
-                payment.payload = {**(payment.payload or {}), "webhook": data}
-                # mark_as_paid() déclenche l'activation de l'abonnement et la visibilité du profil
-                payment.mark_as_paid()
+        # 3. Registre des événements : un rejeu est acquitté sans retraitement
+        event, created = record_event(
+            provider=Payment.Provider.BICTORYS,
+            data=data,
+            reference=provider_ref,
+            event_status=event_status,
+        )
+        if not created:
+            return Response({"status": "duplicate"}, status=status.HTTP_200_OK)
 
-        elif event_status in ("FAILED", "CANCELED", "EXPIRED"):
-            payment.status = Payment.Status.FAILED
-            payment.payload = {**(payment.payload or {}), "webhook": data}
-            payment.save(update_fields=["status", "payload"])
+        # 4. Traitement (verrou du paiement, activation de l'abonnement) hors de la requête
+        submit_after_commit(process_webhook_event, event.pk)
 
-        return Response({"status": "processed"}, status=status.HTTP_200_OK)
+        return Response({"status": "accepted"}, status=status.HTTP_200_OK)
 
 
 class SubscriptionMeView(generics.RetrieveAPIView):
@@ -126,4 +141,19 @@ class SubscriptionMeView(generics.RetrieveAPIView):
 
     def get_object(self):
         sub, _ = Subscription.objects.get_or_create(user=self.request.user)
-        return sub
\ No newline at end of file
+        return sub
+
+
+class AdminValidationPaiementsView(APIView):
+    """
+    Validation manuelle de paiements en masse (webhooks jamais reçus) :
+    paiements, abonnements et visibilité mis à jour de façon ensembliste dans une transaction.
+    POST {"ids": [...]}
+    """
+    permission_classes = [permissions.IsAuthenticated, EstAdministrateur]
+
+    def post(self, request):
+        serializer = ActionEnMasseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        valides = Payment.mark_many_as_paid(Payment.objects.filter(pk__in=serializer.validated_data["ids"]))
+        return Response({"valides": valides})
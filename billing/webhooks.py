@@ -0,0 +1,90 @@
+"""
+Traitement des webhooks de paiement en deux temps.
+
+1. La vue vérifie la signature, enregistre l'événement dans le registre (WebhookEvent)
+   et répond immédiatement : un doublon (rejeu de la passerelle) est acquitté sans rien refaire.
+2. process_webhook_event() applique l'événement hors du cycle requête/réponse,
+   sous verrou du paiement (select_for_update).
+Les événements restés RECU (worker arrêté, crash) sont rejoués par la commande process_webhook_events.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Tuple
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from billing.models import Payment, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+STATUTS_PAYES = ("PAID", "SUCCESS", "COMPLETED")
+STATUTS_ECHOUES = ("FAILED", "CANCELED", "EXPIRED")
+
+
+def event_key(data: dict, reference: str, event_status: str) -> str:
+    # Sans identifiant d'événement, un rejeu porte la même référence et le même statut
+    event_id = data.get("id") or data.get("event_id") or data.get("eventId")
+    return str(event_id) if event_id else f"{reference}:{event_status}"
+
+
+def record_event(*, provider: str, data: dict, reference: str, event_status: str) -> Tuple[WebhookEvent, bool]:
+    """Enregistre l'événement ; retourne (event, created). created=False pour un doublon."""
+    key = event_key(data, reference, event_status)
+    try:
+        with transaction.atomic():
+            event = WebhookEvent.objects.create(
+                provider=provider,
+                event_id=key,
+                reference=reference,
+                event_status=event_status,
+                payload=data,
+            )
+        return event, True
+    except IntegrityError:
+        return WebhookEvent.objects.get(provider=provider, event_id=key), False
+
+
+def process_webhook_event(event_id: int) -> None:
+    try:
+        with transaction.atomic():
+            event = (
+                WebhookEvent.objects.select_for_update(skip_locked=True)
+                .filter(pk=event_id, statut=WebhookEvent.Statut.RECU)
+                .first()
+            )
+            if event is None:
+                # Déjà traité, ou en cours de traitement par un autre worker
+                return
+
+            payment = Payment.objects.select_for_update().filter(provider_ref=event.reference).first()
+            if payment is None:
+                event.statut = WebhookEvent.Statut.ECHEC
+                event.erreur = "Paiement non trouvé"
+                event.traite_le = timezone.now()
+                event.save(update_fields=["statut", "erreur", "traite_le"])
+                return
+
+            if event.event_status in STATUTS_PAYES:
+                if payment.status != Payment.Status.PAID:
+                    payment.payload = {**(payment.payload or {}), "webhook": event.payload}
+                    payment.save(update_fields=["payload"])
+                    # mark_as_paid() déclenche l'activation de l'abonnement et la visibilité du profil
+                    payment.mark_as_paid()
+
+            elif event.event_status in STATUTS_ECHOUES:
+                # Un échec tardif ne doit pas annuler un paiement déjà encaissé
+                if payment.status == Payment.Status.PENDING:
+                    payment.status = Payment.Status.FAILED
+                    payment.payload = {**(payment.payload or {}), "webhook": event.payload}
+                    payment.save(update_fields=["status", "payload"])
+
+            event.statut = WebhookEvent.Statut.TRAITE
+            event.traite_le = timezone.now()
+            event.save(update_fields=["statut", "traite_le"])
+    except Exception as exc:
+        logger.exception("Webhook #%s en échec", event_id)
+        WebhookEvent.objects.filter(pk=event_id, statut=WebhookEvent.Statut.RECU).update(
+            statut=WebhookEvent.Statut.ECHEC, erreur=str(exc)[:1000], traite_le=timezone.now()
+        )
@@ -0,0 +1,47 @@
+"""
+Cache versionné du catalogue (arbre des localisations).
+
+La version est un jeton stocké dans le cache partagé : toute écriture sur Location
+la renouvelle (cf. Location.save/delete), ce qui invalide les entrées précédentes
+sans avoir à les supprimer une par une.
+"""
+from __future__ import annotations
+
+import hashlib
+import uuid
+from typing import Callable, Tuple
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "catalog:version"
+LOCATIONS_TREE_KEY = "catalog:locations_tree:{version}"
+# Les entrées des versions périmées ne sont plus lues : on les laisse expirer
+LOCATIONS_TREE_TIMEOUT = 60 * 60 * 24
+
+
+def get_catalog_version() -> str:
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # add() : si un autre worker a initialisé la version entre-temps, on garde la sienne
+        cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version() -> None:
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_locations_tree(build: Callable[[], bytes]) -> Tuple[bytes, str]:
+    """
+    Retourne (json pré-encodé, etag) pour la version courante du catalogue.
+    `build` n'est appelé qu'en cas d'absence dans le cache.
+    """
+    key = LOCATIONS_TREE_KEY.format(version=get_catalog_version())
+    entry = cache.get(key)
+    if entry is None:
+        payload = build()
+        etag = f'"{hashlib.md5(payload).hexdigest()}"'
+        entry = (payload, etag)
+        cache.set(key, entry, timeout=LOCATIONS_TREE_TIMEOUT)
+    return entry
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from catalog.models import Location
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule Location.chemin pour tout l'arbre (une requête récursive) ; "
+        "à lancer au déploiement sur une base existante, le filtre hiérarchique ?zone= en dépend"
+    )
+
+    def handle(self, *args, **options):
+        nb = Location.rebuild_chemins()
+        self.stdout.write(self.style.SUCCESS(f"{nb} chemin(s) mis à jour."))
@@ -1,31 +1,152 @@
 from __future__ import annotations
+
+import time
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils.text import slugify
+
+from catalog.cache import bump_catalog_version
 from catalog.models import Location, JobCategory, Job
 
 
-def unique_slug(model, base: str) -> str:
-    base = slugify(base)[:150] or "item"
-    slug = base
-    i = 2
-    while model.objects.filter(slug=slug).exists():
-        slug = f"{base}-{i}"
-        i += 1
-    return slug
+# Renommages : {modèle: {nouveau nom: ancien nom}} (même parent, même type).
+# La ligne existante est renommée au lieu d'être dupliquée ; son id et son slug sont conservés
+# (les pros et annonces qui la référencent ne bougent pas).
+# Ex : RENOMMAGES["Job"] = {"Développeur web": "Développement web"}
+RENOMMAGES = {
+    "Location": {},
+    "JobCategory": {},
+    "Job": {},
+}
+
+OBSOLETES_AFFICHES = 20
+
+
+class SlugsEnMemoire:
+    """Slugs existants chargés une fois ; les suivants sont alloués sans aller-retour base."""
+
+    def __init__(self, model):
+        self.pris = set(model.objects.values_list("slug", flat=True))
+
+    def allouer(self, base: str) -> str:
+        base = slugify(base)[:150] or "item"
+        slug = base
+        i = 2
+        while slug in self.pris:
+            slug = f"{base}-{i}"
+            i += 1
+        self.pris.add(slug)
+        return slug
+
+
+class Synchro:
+    """
+    Diff + insertion en masse d'un modèle hiérarchique.
+    Les lignes existantes sont indexées par clé naturelle (chargées en une requête) ;
+    les lignes manquantes sont accumulées puis créées niveau par niveau (bulk_create).
+    Les renommages déclarés (RENOMMAGES) mettent à jour la ligne existante, et les lignes
+    en base absentes du seed sont signalées (obsoletes()) plutôt que de s'accumuler en silence.
+    """
+
+    def __init__(self, model, cle):
+        self.model = model
+        self.cle = cle
+        self.slugs = SlugsEnMemoire(model)
+        self.existants = {cle(obj): obj for obj in model.objects.all()}
+        self.renommages = RENOMMAGES.get(model.__name__, {})
+        self.vus = set()
+        self.a_creer = []
+        self.a_modifier = {}
+        self.a_renommer = {}
+        self.crees = 0
+
+    def assurer(self, slug_base: str, **champs):
+        obj = self.model(**champs)
+        cle = self.cle(obj)
+        self.vus.add(cle)
+        existant = self.existants.get(cle)
+        if existant is not None:
+            return existant
+
+        ancien_nom = self.renommages.get(champs.get("name"))
+        if ancien_nom:
+            ancienne_cle = self.cle(self.model(**{**champs, "name": ancien_nom}))
+            existant = self.existants.get(ancienne_cle)
+            if existant is not None and existant.pk is not None and ancienne_cle not in self.vus:
+                existant.name = champs["name"]
+                del self.existants[ancienne_cle]
+                self.existants[cle] = existant
+                self.a_renommer[existant.pk] = existant
+                return existant
+
+        obj.slug = self.slugs.allouer(slug_base)
+        self.existants[cle] = obj
+        self.a_creer.append(obj)
+        return obj
+
+    def modifier(self, obj, **champs) -> None:
+        # Seules les lignes déjà en base sont concernées (les nouvelles sont créées avec les bonnes valeurs)
+        if obj.pk is None:
+            return
+        if any(getattr(obj, k) != v for k, v in champs.items()):
+            for k, v in champs.items():
+                setattr(obj, k, v)
+            self.a_modifier[obj.pk] = obj
+
+    def flush(self) -> None:
+        """Crée le niveau courant : les ids sont ensuite disponibles pour le niveau suivant."""
+        if self.a_creer:
+            self.model.objects.bulk_create(self.a_creer, batch_size=1000)
+            self.crees += len(self.a_creer)
+            self.a_creer = []
+
+    def flush_modifications(self, champs) -> int:
+        objs = list(self.a_modifier.values())
+        if objs:
+            self.model.objects.bulk_update(objs, champs, batch_size=1000)
+        self.a_modifier = {}
+        return len(objs)
+
+    def flush_renommages(self) -> int:
+        objs = list(self.a_renommer.values())
+        if objs:
+            self.model.objects.bulk_update(objs, ["name"], batch_size=1000)
+        self.a_renommer = {}
+        return len(objs)
+
+    def obsoletes(self) -> list:
+        """Lignes en base que le seed ne produit plus (renommage non déclaré, entrée retirée)."""
+        return [obj for cle, obj in self.existants.items() if obj.pk is not None and cle not in self.vus]
 
 
 class Command(BaseCommand):
     help = "Seed catalog complet : 14 régions du Sénégal + catégories professionnelles du cahier des charges"
 
     def handle(self, *args, **options):
-        # 1. PAYS
-        senegal, _ = Location.objects.get_or_create(
-            type=Location.Type.COUNTRY,
-            parent=None,
-            name="Sénégal",
-            defaults={"slug": "senegal"},
-        )
+        debut = time.monotonic()
+        with transaction.atomic():
+            resume = self.seed()
+        bump_catalog_version()
+
+        for ligne in resume:
+            self.stdout.write(f"  {ligne}")
+        for synchro in self.synchros:
+            obsoletes = synchro.obsoletes()
+            if not obsoletes:
+                continue
+            # Jamais supprimées automatiquement : des pros / annonces peuvent les référencer
+            self.stdout.write(self.style.WARNING(
+                f"⚠️  {synchro.model.__name__} : {len(obsoletes)} ligne(s) en base absentes du seed "
+                f"(à déclarer dans RENOMMAGES ou à supprimer manuellement) :"
+            ))
+            for obj in obsoletes[:OBSOLETES_AFFICHES]:
+                self.stdout.write(f"    #{obj.pk} {obj} [{obj.slug}]")
+            if len(obsoletes) > OBSOLETES_AFFICHES:
+                self.stdout.write(f"    ... {len(obsoletes) - OBSOLETES_AFFICHES} autre(s)")
+        self.stdout.write(self.style.SUCCESS(f"✅ Seed catalog complet terminé en {time.monotonic() - debut:.2f}s !"))
 
+    def seed(self):
         # 2) RÉGIONS -> DÉPARTEMENTS (46)
         regions_departements = {
             "Dakar": ["Dakar", "Pikine", "Rufisque", "Guédiawaye", "Keur Massar"],
@@ -61,45 +182,53 @@ class Command(BaseCommand):
             "Zone commerciale", "Quartier administratif"
         ]
 
-        for reg_name, deps in regions_departements.items():
-            region, _ = Location.objects.get_or_create(
-                type=Location.Type.REGION,
-                parent=senegal,
-                name=reg_name,
-                defaults={"slug": unique_slug(Location, f"{reg_name}-region")},
-            )
-
-            for dep_name in deps:
-                dep, _ = Location.objects.get_or_create(
-                    type=Location.Type.DEPARTMENT,
-                    parent=region,
-                    name=dep_name,
-                    defaults={"slug": unique_slug(Location, f"{dep_name}-{reg_name}-departement")},
-                )
+        # Un pays = {région: [départements]} ; ajouter un pays ici suffit (même moteur)
+        pays = {
+            "Sénégal": regions_departements,
+        }
 
-                # 1) CITY sous le DEPARTMENT
-                city, _ = Location.objects.get_or_create(
-                    type=Location.Type.CITY,
-                    parent=dep,
-                    name=dep_name,
-                    defaults={"slug": unique_slug(Location, f"{dep_name}-{reg_name}-ville")},
-                )
+        locations = Synchro(Location, lambda l: (l.parent_id if l.parent_id else None, l.name, l.type))
+        generiques = 0
 
-                # 2) DISTRICT (Quartier) sous la CITY - MAPPING SPÉCIFIQUE
-                quartiers_ville = QUARTIERS_PAR_VILLE.get(dep_name, quartiers_generiques)
+        # Niveau par niveau : chaque flush() fournit les ids des parents du niveau suivant
+        racines = {nom: locations.assurer(nom, type=Location.Type.COUNTRY, parent=None, name=nom) for nom in pays}
+        locations.flush()
 
-                for q in quartiers_ville:
-                    Location.objects.get_or_create(
-                        type=Location.Type.DISTRICT,
-                        parent=city,
-                        name=q,
-                        defaults={"slug": unique_slug(Location, f"{q}-{dep_name}")},
+        regions = {}
+        for pays_nom, regs in pays.items():
+            for reg_name in regs:
+                regions[(pays_nom, reg_name)] = locations.assurer(
+                    f"{reg_name}-region", type=Location.Type.REGION, parent=racines[pays_nom], name=reg_name
+                )
+        locations.flush()
+
+        departements = {}
+        for pays_nom, regs in pays.items():
+            for reg_name, deps in regs.items():
+                for dep_name in deps:
+                    departements[(pays_nom, reg_name, dep_name)] = locations.assurer(
+                        f"{dep_name}-{reg_name}-departement",
+                        type=Location.Type.DEPARTMENT, parent=regions[(pays_nom, reg_name)], name=dep_name,
                     )
+        locations.flush()
 
-                if quartiers_ville == quartiers_generiques:
-                    self.stdout.write(
-                        f"  ℹ️  {dep_name}: {len(quartiers_ville)} quartiers génériques créés"
-                    )
+        # 1) CITY sous le DEPARTMENT
+        villes = {
+            (pays_nom, reg_name, dep_name): locations.assurer(
+                f"{dep_name}-{reg_name}-ville", type=Location.Type.CITY, parent=dep, name=dep_name
+            )
+            for (pays_nom, reg_name, dep_name), dep in departements.items()
+        }
+        locations.flush()
+
+        # 2) DISTRICT (Quartier) sous la CITY - MAPPING SPÉCIFIQUE
+        for (_, _, dep_name), city in villes.items():
+            quartiers_ville = QUARTIERS_PAR_VILLE.get(dep_name, quartiers_generiques)
+            if quartiers_ville is quartiers_generiques:
+                generiques += 1
+            for q in quartiers_ville:
+                locations.assurer(f"{q}-{dep_name}", type=Location.Type.DISTRICT, parent=city, name=q)
+        locations.flush()
 
         # 3. MÉTIERS ET CATÉGORIES DU CAHIER DES CHARGES
         catalog_data = {
@@ -420,34 +549,45 @@ class Command(BaseCommand):
                                        "Logisticien",
                                    ] + extra_featured))
 
-        for cat_name, subcats in catalog_data.items():
-            parent_cat, _ = JobCategory.objects.get_or_create(
-                name=cat_name,
-                parent=None,
-                defaults={"slug": unique_slug(JobCategory, cat_name)},
-            )
-
-            for subcat_name, jobs in subcats.items():
-                sub_cat, _ = JobCategory.objects.get_or_create(
-                    name=subcat_name,
-                    parent=parent_cat,
-                    defaults={"slug": unique_slug(JobCategory, f"{subcat_name}-{cat_name}")},
-                )
+        categories = Synchro(JobCategory, lambda c: (c.parent_id if c.parent_id else None, c.name))
+        metiers = Synchro(Job, lambda j: (j.category_id, j.name))
 
-                for job_name in jobs:
-                    is_feat = job_name in featured_list
-                    job, created = Job.objects.get_or_create(
-                        category=sub_cat,
-                        name=job_name,
-                        defaults={
-                            "slug": unique_slug(Job, f"{job_name}-{subcat_name}"),
-                            "is_featured": is_feat
-                        },
-                    )
-                    # Mise à jour si le métier existe déjà pour garantir l'idempotence
-                    if not created and job.is_featured != is_feat:
-                        job.is_featured = is_feat
-                        job.save(update_fields=["is_featured"])
+        parents = {
+            cat_name: categories.assurer(cat_name, name=cat_name, parent=None)
+            for cat_name in catalog_data
+        }
+        categories.flush()
 
-        self.stdout.write(self.style.SUCCESS("✅ Seed catalog complet terminé avec succès !"))
-        self.stdout.write(self.style.SUCCESS(f"✅ Total métiers en vedette : {len(featured_list)}"))
\ No newline at end of file
+        sous_categories = {}
+        for cat_name, subcats in catalog_data.items():
+            for subcat_name in subcats:
+                sous_categories[(cat_name, subcat_name)] = categories.assurer(
+                    f"{subcat_name}-{cat_name}", name=subcat_name, parent=parents[cat_name]
+                )
+        categories.flush()
+
+        featured = set(featured_list)
+        for (cat_name, subcat_name), sub_cat in sous_categories.items():
+            for job_name in catalog_data[cat_name][subcat_name]:
+                is_feat = job_name in featured
+                job = metiers.assurer(
+                    f"{job_name}-{subcat_name}", category=sub_cat, name=job_name, is_featured=is_feat
+                )
+                # Mise à jour si le métier existe déjà pour garantir l'idempotence
+                metiers.modifier(job, is_featured=is_feat)
+        metiers.flush()
+        metiers_modifies = metiers.flush_modifications(["is_featured"])
+        self.synchros = [locations, categories, metiers]
+        renommes = {s.model.__name__: s.flush_renommages() for s in self.synchros}
+
+        # Chemins matérialisés (recherche hiérarchique par zone), y compris pour une base existante
+        # (bulk_create ne passe pas par Location.save)
+        Location.rebuild_chemins()
+
+        return [
+            f"Localisations : {locations.crees} créée(s), {renommes['Location']} renommée(s) "
+            f"({generiques} ville(s) avec quartiers génériques)",
+            f"Catégories : {categories.crees} créée(s), {renommes['JobCategory']} renommée(s)",
+            f"Métiers : {metiers.crees} créé(s), {metiers_modifies} mis à jour, {renommes['Job']} renommé(s)",
+            f"Métiers en vedette : {len(featured_list)}",
+        ]
\ No newline at end of file
@@ -1,5 +1,9 @@
 from __future__ import annotations
-from django.db import models
+from django.db import connection, models
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+from catalog.cache import bump_catalog_version
 
 class Location(models.Model):
     """
@@ -24,6 +28,10 @@ class Location(models.Model):
     )
     slug = models.SlugField(max_length=160, unique=True)
 
+    # Chemin matérialisé des ids depuis la racine : "/1/5/23/".
+    # Les descendants d'une zone sont les lignes dont le chemin commence par le sien (LIKE 'x%' indexé).
+    chemin = models.CharField(max_length=255, blank=True, default="", editable=False)
+
     class Meta:
         # Empêche les doublons de noms au sein d'une même entité parente
         unique_together = ("parent", "name", "type")
@@ -31,8 +39,53 @@ class Location(models.Model):
             models.Index(fields=["type"]),
             models.Index(fields=["slug"]),
             models.Index(fields=["parent"]),
+            models.Index(fields=["chemin"], name="location_chemin_idx", opclasses=["varchar_pattern_ops"]),
         ]
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._sync_chemin()
+        bump_catalog_version()
+
+    def _sync_chemin(self) -> None:
+        parent_chemin = "/"
+        if self.parent_id:
+            parent_chemin = Location.objects.filter(pk=self.parent_id).values_list("chemin", flat=True).first() or "/"
+        nouveau = f"{parent_chemin}{self.pk}/"
+        ancien = self.chemin
+        if nouveau == ancien:
+            return
+
+        Location.objects.filter(pk=self.pk).update(chemin=nouveau)
+        if ancien:
+            # Déplacement : tout le sous-arbre est réécrit en une requête
+            Location.objects.filter(chemin__startswith=ancien).exclude(pk=self.pk).update(
+                chemin=Concat(Value(nouveau), Substr("chemin", len(ancien) + 1))
+            )
+        self.chemin = nouveau
+
+    @classmethod
+    def rebuild_chemins(cls) -> int:
+        """Recalcule tous les chemins (insertions en masse, rattrapage) en une requête récursive."""
+        table = cls._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                WITH RECURSIVE arbre(id, chemin) AS (
+                    SELECT id, '/' || id || '/' FROM {table} WHERE parent_id IS NULL
+                    UNION ALL
+                    SELECT l.id, arbre.chemin || l.id || '/' FROM {table} l JOIN arbre ON l.parent_id = arbre.id
+                )
+                UPDATE {table} SET chemin = arbre.chemin
+                FROM arbre
+                WHERE {table}.id = arbre.id AND {table}.chemin IS DISTINCT FROM arbre.chemin
+            """)
+            return cursor.rowcount
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_catalog_version()
+        return result
+
     def __str__(self) -> str:
         return f"{self.name} ({self.type})"
 
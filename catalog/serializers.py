@@ -2,9 +2,33 @@ from rest_framework import serializers
 from catalog.models import Job, JobCategory, Location
 
 
+def build_category_tree():
+    """
+    Charge toutes les catégories en UNE requête et relie parents/enfants en mémoire.
+    Retourne les racines ; chaque noeud porte 'subcategories_loaded' (lu par JobCategorySerializer).
+    """
+    categories = list(
+        JobCategory.objects.only("id", "name", "slug", "parent_id").order_by("name")
+    )
+    by_id = {}
+    for cat in categories:
+        cat.subcategories_loaded = []
+        by_id[cat.id] = cat
+
+    roots = []
+    for cat in categories:
+        parent = by_id.get(cat.parent_id)
+        if parent is None:
+            roots.append(cat)
+        else:
+            parent.subcategories_loaded.append(cat)
+    return roots
+
+
 class JobCategorySerializer(serializers.ModelSerializer):
     """
     Serializer gérant la hiérarchie des catégories (sous-catégories).
+    Utilise 'subcategories_loaded' injecté par build_category_tree() (aucune requête par noeud).
     """
     subcategories = serializers.SerializerMethodField()
 
@@ -13,9 +37,24 @@ class JobCategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "slug", "parent", "subcategories"]
 
     def get_subcategories(self, obj):
-        if obj.subcategories.exists():
-            return JobCategorySerializer(obj.subcategories.all(), many=True).data
-        return []
+        children = getattr(obj, "subcategories_loaded", None)
+
+        # Fallback : une seule requête pour ce niveau
+        if children is None:
+            children = obj.subcategories.all()
+
+        return JobCategorySerializer(children, many=True).data
+
+
+class JobCategoryFlatSerializer(serializers.ModelSerializer):
+    """
+    Représentation plate (sans récursion) : utilisée dans les listes d'annonces.
+    """
+    parent_name = serializers.CharField(source="parent.name", read_only=True, default=None)
+
+    class Meta:
+        model = JobCategory
+        fields = ["id", "name", "slug", "parent", "parent_name"]
 
 
 class JobSerializer(serializers.ModelSerializer):
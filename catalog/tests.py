@@ -1,3 +1,46 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from catalog.models import Location
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class LocationsTreeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        pays = Location.objects.create(name="Sénégal", type=Location.Type.COUNTRY, slug="senegal")
+        for r in range(3):
+            region = Location.objects.create(name=f"Région {r}", type=Location.Type.REGION, parent=pays, slug=f"r{r}")
+            dep = Location.objects.create(name=f"Dép {r}", type=Location.Type.DEPARTMENT, parent=region, slug=f"d{r}")
+            ville = Location.objects.create(name=f"Ville {r}", type=Location.Type.CITY, parent=dep, slug=f"v{r}")
+            for q in range(4):
+                Location.objects.create(name=f"Quartier {q}", type=Location.Type.DISTRICT, parent=ville, slug=f"q{r}-{q}")
+
+    def test_arbre_dans_le_budget_cache_froid_puis_chaud(self):
+        # Budget indépendant de la taille de l'arbre (pas de N+1), puis aucune requête une fois en cache
+        froid = self.client.get("/api/catalog/locations/tree/")
+        self.assertEqual(froid.status_code, 200)
+        with self.assertNumQueries(0):
+            chaud = self.client.get("/api/catalog/locations/tree/")
+        self.assertEqual(chaud.content, froid.content)
+
+    def test_if_none_match_renvoie_304(self):
+        etag = self.client.get("/api/catalog/locations/tree/")["ETag"]
+        response = self.client.get("/api/catalog/locations/tree/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class RebuildCheminsTests(TestCase):
+    def test_rattrape_les_chemins_vides(self):
+        pays = Location.objects.create(name="Sénégal", type=Location.Type.COUNTRY, slug="senegal")
+        region = Location.objects.create(name="Dakar", type=Location.Type.REGION, parent=pays, slug="dakar")
+        ville = Location.objects.create(name="Pikine", type=Location.Type.CITY, parent=region, slug="pikine")
+        # Base existante : colonne ajoutée par migration, restée vide
+        Location.objects.update(chemin="")
+
+        call_command("rebuild_chemins", stdout=io.StringIO())
+
+        ville.refresh_from_db()
+        self.assertEqual(ville.chemin, f"/{pays.pk}/{region.pk}/{ville.pk}/")
@@ -1,14 +1,20 @@
 from rest_framework import generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from django.db.models import Prefetch
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 
-from catalog.models import Job, Location, JobCategory
+from catalog.cache import get_locations_tree
+
+from catalog.models import Job, Location
 from catalog.serializers import (
     JobSerializer,
     LocationSerializer,
     JobCategorySerializer,
     LocationTreeSerializer,
+    build_category_tree,
 )
 
 
@@ -34,10 +40,10 @@ class FeaturedJobsView(generics.ListAPIView):
 
 class JobCategoriesTreeView(APIView):
     permission_classes = [permissions.AllowAny]
+    query_budget = 3
 
     def get(self, request):
-        categories = JobCategory.objects.filter(parent__isnull=True).prefetch_related("subcategories")
-        serializer = JobCategorySerializer(categories, many=True)
+        serializer = JobCategorySerializer(build_category_tree(), many=True)
         return Response(serializer.data)
 
 
@@ -56,10 +62,25 @@ class LocationsTreeView(APIView):
     """
     Récupère l'arbre complet : REGION -> DEPARTMENT -> CITY -> DISTRICT
     Le Frontend se chargera d'ignorer le niveau CITY pour l'affichage si besoin.
+
+    L'arbre est sérialisé une seule fois par version du catalogue (JSON pré-encodé en cache)
+    et servi avec un ETag : If-None-Match => 304 sans corps.
     """
     permission_classes = [permissions.AllowAny]
+    query_budget = 3
 
     def get(self, request):
+        payload, etag = get_locations_tree(self._build_tree)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(payload, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "public, max-age=0, must-revalidate"
+        return response
+
+    def _build_tree(self) -> bytes:
         # 1. Préparer les Districts (Quartiers)
         districts_qs = (
             Location.objects.filter(type=Location.Type.DISTRICT)
@@ -116,4 +137,4 @@ class LocationsTreeView(APIView):
 
         # Sérialisation
         data = LocationTreeSerializer(regions_qs, many=True).data
-        return Response(data)
+        return JSONRenderer().render(data)
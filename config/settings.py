@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Third-party
     "rest_framework",
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
     "corsheaders",
 
     # Local apps
+    "core",
     "accounts",
     "catalog",
     "pros",
@@ -38,9 +40,11 @@ INSTALLED_APPS = [
     "moderation",
     'annonces',
     'ads',
+    'notifications',
 ]
 
 MIDDLEWARE = [
+    "core.instrumentation.InstrumentationMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -81,10 +85,39 @@ DATABASES = {
     }
 }
 
+# Cache partagé (ex: redis://...) : nécessaire en multi-workers pour l'invalidation du catalogue,
+# la déduplication des vues d'annonces (annonces.vues) et le cache d'authentification (désactivé sans lui)
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# Tâches de fond locales (variantes d'images, etc.) — cf. core.workers
+BACKGROUND_WORKERS = env.int("BACKGROUND_WORKERS", default=2)
+BACKGROUND_TASKS_SYNC = env.bool("BACKGROUND_TASKS_SYNC", default=False)
+
+# Cache des utilisateurs authentifiés par JWT (secondes), cf. accounts.authentication.
+# L'invalidation (désactivation, changement de rôle) doit atteindre tous les workers :
+# sans cache partagé, le cache est désactivé (un cache local servirait un compte désactivé jusqu'à expiration).
+CACHE_PARTAGE = not CACHES["default"]["BACKEND"].endswith(("LocMemCache", "DummyCache"))
+USER_CACHE_TIMEOUT = env.int("USER_CACHE_TIMEOUT", default=60) if CACHE_PARTAGE else 0
+
+# Instrumentation (cf. core.instrumentation) : /api/metrics/ lisible avec ce jeton ou par le staff ;
+# QUERY_BUDGET_STRICT=True fait échouer les requêtes qui dépassent le query_budget de leur vue (tests/CI)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+QUERY_BUDGET_STRICT = env.bool("QUERY_BUDGET_STRICT", default=False)
+
+# Envoi des notifications (worker : manage.py send_notifications)
+# FakeProvider par défaut en DEBUG uniquement ; hors DEBUG la variable est obligatoire
+# (ex: notifications.providers.WhatsAppCloudProvider), sinon les OTP seraient marqués envoyés sans l'être.
+if DEBUG:
+    NOTIFICATIONS_PROVIDER = env("NOTIFICATIONS_PROVIDER", default="notifications.providers.FakeProvider")
+else:
+    NOTIFICATIONS_PROVIDER = env("NOTIFICATIONS_PROVIDER")
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -92,8 +125,15 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.instrumentation.InstrumentedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
         "PAGE_SIZE": env.int("API_PAGE_SIZE", default=20),
+    # Reverse proxies de confiance devant l'app : l'IP cliente est l'entrée de X-Forwarded-For
+    # ajoutée par le dernier d'entre eux (0 = REMOTE_ADDR, l'en-tête est ignoré)
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
 }
 
 SPECTACULAR_SETTINGS = {
@@ -5,6 +5,8 @@ from django.conf.urls.static import static
 
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from core.metrics_views import MetricsView
+
 urlpatterns = [
     # --- Interface d'administration ---
     path("admin/", admin.site.urls),
@@ -13,6 +15,9 @@ urlpatterns = [
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
 
+    # --- Métriques (format Prometheus) ---
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
+
     # --- Modules métier ---
 
     # Authentification et Comptes (OTP, Login, Register)
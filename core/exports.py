@@ -0,0 +1,206 @@
+"""
+Exports CSV / JSONL en flux (admin et commande `export_data`).
+
+Les lignes sont lues par curseur serveur (.values_list().iterator(chunk_size)) sur les seules
+colonnes exportées, puis encodées au fil de l'eau (gzip optionnel) : la mémoire reste constante
+quelle que soit la taille de la table. Aucune instance de modèle n'est construite.
+
+Les définitions (colonnes, champ de date pour --depuis / --jusqu-a) sont dans EXPORTS ;
+les modèles sont résolus paresseusement pour que core n'importe pas les applications.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.apps import apps
+from django.contrib import admin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+CHUNK_SIZE = 2000
+FORMATS = ("csv", "jsonl")
+
+
+@dataclass(frozen=True)
+class Export:
+    model: str
+    # (en-tête, chemin ORM passé à values_list)
+    colonnes: Tuple[Tuple[str, str], ...]
+    champ_date: str
+
+    def get_queryset(self):
+        return apps.get_model(self.model)._default_manager.all()
+
+    @property
+    def entetes(self) -> List[str]:
+        return [entete for entete, _ in self.colonnes]
+
+
+EXPORTS = {
+    "pros": Export(
+        model="pros.ProfilProfessionnel",
+        colonnes=(
+            ("id", "id"),
+            ("slug", "slug"),
+            ("nom_entreprise", "nom_entreprise"),
+            ("phone", "utilisateur__phone"),
+            ("metier", "metier__name"),
+            ("zone", "zone_geographique__name"),
+            ("telephone_appel", "telephone_appel"),
+            ("telephone_whatsapp", "telephone_whatsapp"),
+            ("est_publie", "est_publie"),
+            ("abonnement_actif_jusqu_au", "abonnement_actif_jusqu_au"),
+            ("note_moyenne", "note_moyenne"),
+            ("nombre_avis", "nombre_avis"),
+            ("cree_le", "cree_le"),
+        ),
+        champ_date="cree_le",
+    ),
+    "payments": Export(
+        model="billing.Payment",
+        colonnes=(
+            ("id", "id"),
+            ("provider_ref", "provider_ref"),
+            ("provider", "provider"),
+            ("phone", "user__phone"),
+            ("amount", "amount"),
+            ("currency", "currency"),
+            ("status", "status"),
+            ("created_at", "created_at"),
+            ("paid_at", "paid_at"),
+        ),
+        champ_date="created_at",
+    ),
+    "signalements": Export(
+        model="moderation.Signalement",
+        colonnes=(
+            ("id", "id"),
+            ("cree_le", "cree_le"),
+            ("statut", "statut"),
+            ("raison", "raison"),
+            ("professionnel_id", "professionnel_id"),
+            ("professionnel", "professionnel__nom_entreprise"),
+            ("auteur_phone", "auteur__phone"),
+            ("message", "message"),
+            ("note_admin", "note_admin"),
+            ("traite_par_phone", "traite_par__phone"),
+            ("traite_le", "traite_le"),
+        ),
+        champ_date="cree_le",
+    ),
+}
+
+
+def _valeur(valeur):
+    if isinstance(valeur, datetime):
+        return timezone.localtime(valeur).isoformat() if timezone.is_aware(valeur) else valeur.isoformat()
+    if isinstance(valeur, date):
+        return valeur.isoformat()
+    if isinstance(valeur, Decimal):
+        return str(valeur)
+    return valeur
+
+
+def lignes(export: Export, queryset=None, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """Tuples de valeurs (ordre des colonnes), lus par curseur serveur, par clé primaire croissante."""
+    if queryset is None:
+        queryset = export.get_queryset()
+    chemins = [chemin for _, chemin in export.colonnes]
+    qs = queryset.order_by("pk").values_list(*chemins)
+    for ligne in qs.iterator(chunk_size=chunk_size):
+        yield tuple(_valeur(v) for v in ligne)
+
+
+class _Tampon:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne écrite au lieu de la stocker."""
+
+    def write(self, valeur: str) -> str:
+        return valeur
+
+
+def encoder(export: Export, rows: Iterable[tuple], format: str) -> Iterator[str]:
+    if format == "jsonl":
+        entetes = export.entetes
+        for row in rows:
+            yield json.dumps(dict(zip(entetes, row)), ensure_ascii=False) + "\n"
+        return
+
+    writer = csv.writer(_Tampon())
+    yield writer.writerow(export.entetes)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def en_octets(morceaux: Iterable[str], compresser: bool = False, taille: int = 64 * 1024) -> Iterator[bytes]:
+    """Regroupe les lignes en blocs de `taille` octets, compressés en gzip si demandé."""
+    compresseur = zlib.compressobj(6, zlib.DEFLATED, 31) if compresser else None
+    bloc, longueur = [], 0
+    for morceau in morceaux:
+        donnees = morceau.encode("utf-8")
+        bloc.append(donnees)
+        longueur += len(donnees)
+        if longueur >= taille:
+            donnees = b"".join(bloc)
+            bloc, longueur = [], 0
+            if compresseur is not None:
+                donnees = compresseur.compress(donnees)
+            if donnees:
+                yield donnees
+    donnees = b"".join(bloc)
+    if compresseur is not None:
+        donnees = compresseur.compress(donnees) + compresseur.flush()
+    if donnees:
+        yield donnees
+
+
+def nom_fichier(nom: str, format: str, compresser: bool) -> str:
+    horodatage = timezone.localtime().strftime("%Y%m%d-%H%M")
+    return f"{nom}-{horodatage}.{format}" + (".gz" if compresser else "")
+
+
+def reponse_streaming(nom: str, queryset=None, format: str = "csv", compresser: bool = False) -> StreamingHttpResponse:
+    export = EXPORTS[nom]
+    flux = en_octets(encoder(export, lignes(export, queryset), format), compresser)
+    if compresser:
+        content_type = "application/gzip"
+    elif format == "jsonl":
+        content_type = "application/x-ndjson; charset=utf-8"
+    else:
+        content_type = "text/csv; charset=utf-8"
+    response = StreamingHttpResponse(flux, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{nom_fichier(nom, format, compresser)}"'
+    return response
+
+
+class ExportAdminMixin:
+    """
+    Actions d'export en flux pour un ModelAdmin (`export_nom` = clé de EXPORTS).
+    Avec « Tout sélectionner », l'action reçoit toute la liste filtrée.
+    """
+
+    export_nom: Optional[str] = None
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if self.export_nom and self.has_view_permission(request):
+            for format in FORMATS:
+                for compresser in (False, True):
+                    action = self._action_export(format, compresser)
+                    actions[action.__name__] = (action, action.__name__, action.short_description)
+        return actions
+
+    def _action_export(self, format: str, compresser: bool):
+        nom = self.export_nom
+
+        @admin.action(description=f"Exporter la sélection ({format.upper()}{', gzip' if compresser else ''})")
+        def action(modeladmin, request, queryset):
+            return reponse_streaming(nom, queryset, format, compresser)
+
+        action.__name__ = f"exporter_{format}" + ("_gz" if compresser else "")
+        return action
@@ -0,0 +1,105 @@
+"""
+Rendu rapide des listes publiques (lecture seule).
+
+Sur les GET JSON, la vue récupère uniquement les colonnes utiles via .values(),
+construit chaque ligne avec une fonction simple (pas d'instances de modèle ni de champs DRF)
+et encode la réponse en une fois. Le schéma de sortie reste celui du serializer de la vue,
+qui continue de servir le navigateur d'API et la documentation.
+"""
+from __future__ import annotations
+
+import json
+import time
+from decimal import Decimal
+from typing import Optional
+
+from django.http import HttpResponse
+from django.utils import timezone
+
+from core.instrumentation import add_serialization_time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iso_datetime(value) -> Optional[str]:
+    # Même format que serializers.DateTimeField
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def decimal_str(value: Optional[Decimal]) -> Optional[str]:
+    # Même format que serializers.DecimalField (COERCE_DECIMAL_TO_STRING)
+    return None if value is None else str(value)
+
+
+def file_url(model, field_name: str, name: Optional[str], request=None) -> Optional[str]:
+    """URL d'un fichier stocké à partir de son seul nom (colonne brute de .values())."""
+    if not name:
+        return None
+    url = model._meta.get_field(field_name).storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+class FastListMixin:
+    """
+    À combiner avec generics.ListAPIView. La vue définit :
+    - fast_values : colonnes (et annotations) à récupérer
+    - fast_row(row, ctx) : dict de sortie pour une ligne
+    - get_fast_context() (optionnel) : valeurs calculées une fois par requête
+    Si l'un des deux premiers manque, la liste passe par le serializer (chemin DRF standard).
+    Les annotations utilisées comme clé de curseur (distance, pertinence) sont ajoutées si présentes.
+    """
+    fast_values: tuple = ()
+    fast_optional_annotations = ("distance_km", "pertinence")
+
+    def get_fast_context(self) -> dict:
+        user = getattr(self.request, "user", None)
+        return {
+            "request": self.request,
+            "user_id": user.id if user is not None and user.is_authenticated else None,
+        }
+
+    def get_fast_queryset(self, queryset):
+        annotations = [a for a in self.fast_optional_annotations if a in queryset.query.annotations]
+        return queryset.prefetch_related(None).values(*self.fast_values, *annotations)
+
+    def fast_row(self, row: dict, ctx: dict) -> dict:
+        raise NotImplementedError
+
+    def has_fast_path(self) -> bool:
+        # Sans fast_values ni fast_row propre, la vue reste sur le serializer
+        return bool(self.fast_values) and type(self).fast_row is not FastListMixin.fast_row
+
+    def list(self, request, *args, **kwargs):
+        renderer = getattr(request, "accepted_renderer", None)
+        if renderer is None or renderer.format != "json" or not self.has_fast_path():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.get_fast_queryset(self.filter_queryset(self.get_queryset()))
+        ctx = self.get_fast_context()
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            body = self.get_paginated_response([self.fast_row(row, ctx) for row in page]).data
+        else:
+            body = [self.fast_row(row, ctx) for row in queryset]
+
+        start = time.perf_counter()
+        content = dumps(body)
+        add_serialization_time(request, time.perf_counter() - start)
+        return HttpResponse(content, content_type="application/json")
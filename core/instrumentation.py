@@ -0,0 +1,203 @@
+"""
+Instrumentation des requêtes : nombre de requêtes SQL, temps SQL, temps de sérialisation
+et latence totale, agrégés par nom d'URL résolu.
+
+Ce module est chargé par DRF via DEFAULT_RENDERER_CLASSES pendant l'import de
+rest_framework.views : il ne doit pas importer rest_framework.views (import circulaire).
+
+- Exposition au format texte Prometheus (core.metrics_views.MetricsView, /api/metrics/), par process.
+- En DEBUG, en-têtes X-DB-Queries / X-DB-Time-ms / X-Serialization-ms et Server-Timing.
+- Budgets déclaratifs : une vue peut définir `query_budget = N`. Un dépassement est journalisé
+  et compté ; avec QUERY_BUDGET_STRICT=True (tests/CI) il lève QueryBudgetExceeded.
+  Le budget couvre toute la requête, authentification comprise (2 requêtes si le cache
+  utilisateur est froid, cf. accounts.authentication).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds", "serialization_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Wrapper d'exécution (connection.execute_wrapper)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_seconds += time.perf_counter() - start
+
+
+def add_serialization_time(request, seconds: float) -> None:
+    """À appeler par les chemins qui encodent eux-mêmes la réponse (ex: FastListMixin)."""
+    stats = getattr(getattr(request, "_request", request), "_instrumentation", None)
+    if stats is not None:
+        stats.serialization_seconds += seconds
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, limite in enumerate(self.buckets):
+            if value <= limite:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = defaultdict(int)  # (view, method, status) -> nombre
+        self.duration = {}  # view -> _Histogram
+        self.queries = {}  # view -> _Histogram
+        self.sql_seconds = defaultdict(float)
+        self.serialization_seconds = defaultdict(float)
+        self.budget_exceeded = defaultdict(int)
+
+    def record(self, view: str, method: str, status: int, duration: float, stats: RequestStats) -> None:
+        with self._lock:
+            self.requests[(view, method, str(status))] += 1
+            self.duration.setdefault(view, _Histogram(DURATION_BUCKETS)).observe(duration)
+            self.queries.setdefault(view, _Histogram(QUERY_BUCKETS)).observe(stats.queries)
+            self.sql_seconds[view] += stats.sql_seconds
+            self.serialization_seconds[view] += stats.serialization_seconds
+
+    def record_budget_exceeded(self, view: str) -> None:
+        with self._lock:
+            self.budget_exceeded[view] += 1
+
+    def render(self) -> str:
+        lignes = []
+
+        def histogram(name, doc, data):
+            lignes.append(f"# HELP {name} {doc}")
+            lignes.append(f"# TYPE {name} histogram")
+            for view, h in sorted(data.items()):
+                for limite, count in zip(h.buckets, h.counts):
+                    lignes.append(f'{name}_bucket{{view="{view}",le="{limite}"}} {count}')
+                lignes.append(f'{name}_bucket{{view="{view}",le="+Inf"}} {h.count}')
+                lignes.append(f'{name}_sum{{view="{view}"}} {h.total}')
+                lignes.append(f'{name}_count{{view="{view}"}} {h.count}')
+
+        def counter(name, doc, data):
+            lignes.append(f"# HELP {name} {doc}")
+            lignes.append(f"# TYPE {name} counter")
+            for view, value in sorted(data.items()):
+                lignes.append(f'{name}{{view="{view}"}} {value}')
+
+        with self._lock:
+            lignes.append("# HELP http_requests_total Requêtes HTTP traitées.")
+            lignes.append("# TYPE http_requests_total counter")
+            for (view, method, status), value in sorted(self.requests.items()):
+                lignes.append(f'http_requests_total{{view="{view}",method="{method}",status="{status}"}} {value}')
+
+            histogram("http_request_duration_seconds", "Latence totale des requêtes.", self.duration)
+            histogram("db_queries_per_request", "Requêtes SQL par requête HTTP.", self.queries)
+            counter("db_query_duration_seconds_total", "Temps passé en SQL.", self.sql_seconds)
+            counter("serialization_duration_seconds_total", "Temps d'encodage des réponses.", self.serialization_seconds)
+            counter("query_budget_exceeded_total", "Dépassements du budget de requêtes.", self.budget_exceeded)
+
+        return "\n".join(lignes) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _view_budget(view_func) -> Optional[int]:
+    view_class = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
+    return getattr(view_class, "query_budget", None)
+
+
+class InstrumentationMiddleware:
+    """À placer en tête de MIDDLEWARE pour mesurer la latence complète."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        request._instrumentation = stats
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+
+        duration = time.perf_counter() - start
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unresolved"
+        registry.record(view, request.method, response.status_code, duration, stats)
+
+        budget = getattr(request, "_query_budget", None)
+        if budget is not None and stats.queries > budget:
+            registry.record_budget_exceeded(view)
+            message = f"{view} : {stats.queries} requêtes SQL (budget {budget})"
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning("Budget de requêtes dépassé — %s", message)
+
+        if settings.DEBUG:
+            response["X-DB-Queries"] = str(stats.queries)
+            response["X-DB-Time-ms"] = f"{stats.sql_seconds * 1000:.1f}"
+            response["X-Serialization-ms"] = f"{stats.serialization_seconds * 1000:.1f}"
+            response["Server-Timing"] = (
+                f"db;dur={stats.sql_seconds * 1000:.1f}, "
+                f"ser;dur={stats.serialization_seconds * 1000:.1f}, "
+                f"total;dur={duration * 1000:.1f}"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = _view_budget(view_func)
+        return None
+
+
+class InstrumentedJSONRenderer(JSONRenderer):
+    """JSONRenderer qui comptabilise son temps d'encodage dans les métriques."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            request = (renderer_context or {}).get("request")
+            if request is not None:
+                add_serialization_time(request, time.perf_counter() - start)
+
@@ -0,0 +1,42 @@
+"""
+Vue /api/metrics/ (format texte Prometheus) et sa permission.
+
+Séparées de core.instrumentation, qui est chargé par DRF pendant l'import de rest_framework.views.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework.permissions import BasePermission
+from rest_framework.views import APIView
+
+from core.instrumentation import registry
+
+
+def _jeton_metriques_valide(request) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", "")
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    return bool(token) and header.startswith("Bearer ") and constant_time_compare(header[7:], token)
+
+
+class PeutLireMetriques(BasePermission):
+    """Jeton METRICS_TOKEN (collecteur Prometheus) ou compte staff."""
+
+    def has_permission(self, request, view):
+        if _jeton_metriques_valide(request):
+            return True
+        return bool(request.user and request.user.is_authenticated and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    """Métriques du process courant au format texte Prometheus."""
+    permission_classes = [PeutLireMetriques]
+    schema = None
+
+    def get_authenticators(self):
+        # Le jeton du collecteur n'est pas un JWT : on ne le soumet pas à l'authentification
+        if _jeton_metriques_valide(self.request):
+            return []
+        return super().get_authenticators()
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
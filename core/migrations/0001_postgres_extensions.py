@@ -0,0 +1,16 @@
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Extensions requises par core.search (UNACCENT() et index GIN gin_trgm_ops de pros et annonces).
+    Les migrations qui créent ces index en dépendent : ("core", "0001_postgres_extensions").
+    """
+
+    dependencies = []
+
+    operations = [
+        UnaccentExtension(),
+        TrigramExtension(),
+    ]
@@ -0,0 +1,212 @@
+"""
+Pagination partagée par les listes publiques.
+
+- Mode par défaut : PageNumber (compatibilité web : count / next / previous / results).
+- Mode curseur (keyset) : ?pagination=cursor (ou dès qu'un ?cursor=... est fourni).
+  Curseur sur le tuple complet (champ de tri, id), pas d'OFFSET ni de COUNT(*) : adapté au scroll infini mobile.
+  Le total est optionnel : ?count=exact (COUNT) ou ?count=approx (estimation du planner Postgres).
+"""
+from __future__ import annotations
+
+import binascii
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimer_nombre_lignes(queryset) -> Optional[int]:
+    """
+    Estimation du nombre de lignes via EXPLAIN (Postgres), sans exécuter de COUNT(*).
+    Retourne None si l'estimation n'est pas disponible.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _valeur_curseur(valeur):
+    if isinstance(valeur, (datetime, date)):
+        return valeur.isoformat()
+    if isinstance(valeur, Decimal):
+        return str(valeur)
+    return valeur
+
+
+def _inverser(champ: str) -> str:
+    return champ[1:] if champ.startswith("-") else f"-{champ}"
+
+
+class _KeysetPagination(BasePagination):
+    """
+    Keyset sur le tuple complet des champs de tri (ex: (-pertinence, -id)).
+
+    Le curseur porte la valeur de chaque champ pour la dernière (ou première) ligne de la page ;
+    la page suivante est filtrée par comparaison lexicographique
+    (a < x) OR (a = x AND id < y) : pas d'OFFSET, même avec beaucoup d'ex aequo,
+    et ni saut ni doublon si des lignes sont ajoutées entre deux pages.
+    Les champs de tri ne doivent pas être NULL ; le dernier est un identifiant unique.
+    Les lignes peuvent être des instances ou des dicts (.values(), cf. FastListMixin).
+    """
+    page_size = 20
+    cursor_query_param = "cursor"
+    ordering: Tuple[str, ...] = ("-id",)
+    invalid_cursor_message = "Curseur invalide."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        position, inverse = self.decode_cursor(request)
+
+        # Page précédente : ordre inversé, puis lignes remises dans l'ordre demandé
+        ordering = tuple(_inverser(c) for c in self.ordering) if inverse else tuple(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._apres(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        encore = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if inverse:
+            rows.reverse()
+
+        self.has_next = position is not None if inverse else encore
+        self.has_previous = encore if inverse else position is not None
+        # Page vide (lignes supprimées entre deux appels) : on repart de la position reçue
+        self.next_position = self._position(rows[-1]) if rows else position
+        self.previous_position = self._position(rows[0]) if rows else position
+        return rows
+
+    @staticmethod
+    def _apres(ordering, position) -> Q:
+        condition, egalites = None, {}
+        for champ, valeur in zip(ordering, position):
+            nom = champ.lstrip("-")
+            lookup = "lt" if champ.startswith("-") else "gt"
+            clause = Q(**egalites, **{f"{nom}__{lookup}": valeur})
+            condition = clause if condition is None else condition | clause
+            egalites[nom] = valeur
+        return condition
+
+    def _position(self, row) -> list:
+        valeurs = []
+        for champ in self.ordering:
+            nom = champ.lstrip("-")
+            valeur = row[nom] if isinstance(row, dict) else getattr(row, nom)
+            valeurs.append(_valeur_curseur(valeur))
+        return valeurs
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(b64decode(encoded.encode("ascii"), altchars=b"-_", validate=True))
+            position, inverse = data["p"], bool(data.get("r"))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, inverse
+
+    def encode_cursor(self, position, inverse: bool) -> str:
+        data = {"p": position}
+        if inverse:
+            data["r"] = 1
+        encoded = b64encode(json.dumps(data, separators=(",", ":")).encode("utf-8"), altchars=b"-_")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode("ascii"))
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, True)
+
+
+class PaginationHybride(PageNumberPagination):
+    """
+    PageNumber par défaut, keyset sur demande.
+
+    L'ordre du curseur vient de la vue :
+    - `get_cursor_ordering(queryset)` si défini (ordre dépendant de la requête),
+    - sinon l'attribut `cursor_ordering`,
+    - sinon `cursor_ordering` de la pagination.
+    Le dernier champ doit être un tie-breaker unique (ex: "id").
+    """
+    mode_query_param = "pagination"
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    cursor_ordering = ("-id",)
+
+    keyset = None
+    keyset_count = None
+
+    def use_cursor(self, request) -> bool:
+        params = request.query_params
+        return params.get(self.mode_query_param) == "cursor" or self.cursor_query_param in params
+
+    def get_cursor_ordering(self, queryset, view):
+        getter = getattr(view, "get_cursor_ordering", None)
+        if getter is not None:
+            return tuple(getter(queryset))
+        return tuple(getattr(view, "cursor_ordering", self.cursor_ordering))
+
+    def get_keyset_count(self, queryset, request) -> Optional[int]:
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "exact":
+            return queryset.count()
+        if mode == "approx":
+            return estimer_nombre_lignes(queryset)
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_cursor(request):
+            self.keyset = None
+            return super().paginate_queryset(queryset, request, view)
+
+        keyset = _KeysetPagination()
+        keyset.page_size = self.get_page_size(request)
+        keyset.cursor_query_param = self.cursor_query_param
+        keyset.ordering = self.get_cursor_ordering(queryset, view)
+
+        self.keyset = keyset
+        self.keyset_count = self.get_keyset_count(queryset, request)
+        return keyset.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+
+        payload = OrderedDict([
+            ("next", self.keyset.get_next_link()),
+            ("previous", self.keyset.get_previous_link()),
+        ])
+        if self.keyset_count is not None:
+            payload["count"] = self.keyset_count
+        payload["results"] = data
+        return Response(payload)
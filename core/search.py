@@ -0,0 +1,84 @@
+"""
+Recherche plein texte Postgres (remplace le SearchFilter DRF et ses ILIKE '%terme%').
+
+- Colonne `search_vector` (tsvector, config "french", accents retirés) maintenue par les modèles.
+- Index GIN sur le tsvector + index trigram (pg_trgm) sur le champ "nom" pour la tolérance aux fautes.
+- Résultats classés par pertinence (rang plein texte + similarité trigram).
+
+Extensions Postgres requises : unaccent, pg_trgm (créées par la migration core 0001_postgres_extensions,
+dont dépendent les migrations des index).
+"""
+from __future__ import annotations
+
+from functools import reduce
+from operator import add
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db.models import F, FloatField, Func, Q, TextField, Value
+from django.db.models.functions import Coalesce, Greatest
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_CONFIG = "french"
+
+
+class Unaccent(Func):
+    function = "UNACCENT"
+    output_field = TextField()
+
+
+def build_search_vector(poids: dict[str, str]):
+    """
+    poids: {"nom_entreprise": "A", "description": "B"} -> tsvector pondéré, sans accents.
+    """
+    return reduce(add, (
+        SearchVector(Unaccent(Coalesce(F(champ), Value(""))), config=SEARCH_CONFIG, weight=poids_champ)
+        for champ, poids_champ in poids.items()
+    ))
+
+
+def refresh_search_vector(queryset, poids: dict[str, str]) -> int:
+    """Recalcule le tsvector en une seule requête UPDATE."""
+    return queryset.update(search_vector=build_search_vector(poids))
+
+
+class RechercheTexteFilter(BaseFilterBackend):
+    """
+    Filtre `?search=` (même paramètre que SearchFilter) servi par les index GIN.
+
+    Attributs lus sur la vue :
+    - search_vector_field (défaut "search_vector")
+    - search_trigram_field : champ court (nom/titre) comparé par similarité trigram
+
+    Sans `?ordering=` explicite, les résultats sont triés par pertinence décroissante.
+    """
+    search_param = "search"
+    ordering_param = "ordering"
+
+    def get_search_term(self, request) -> str:
+        return request.query_params.get(self.search_param, "").replace("\x00", "").strip()
+
+    def filter_queryset(self, request, queryset, view):
+        terme = self.get_search_term(request)
+        if not terme:
+            return queryset
+
+        vector_field = getattr(view, "search_vector_field", "search_vector")
+        trigram_field = getattr(view, "search_trigram_field", None)
+
+        query = SearchQuery(Unaccent(Value(terme)), config=SEARCH_CONFIG, search_type="websearch")
+        condition = Q(**{vector_field: query})
+        pertinence = Coalesce(SearchRank(F(vector_field), query), Value(0.0), output_field=FloatField())
+
+        if trigram_field:
+            condition |= Q(**{f"{trigram_field}__trigram_similar": terme})
+            pertinence = Greatest(
+                pertinence,
+                TrigramSimilarity(trigram_field, terme),
+                output_field=FloatField(),
+            )
+
+        queryset = queryset.filter(condition).annotate(pertinence=pertinence)
+
+        if not request.query_params.get(self.ordering_param):
+            queryset = queryset.order_by("-pertinence", "-id")
+        return queryset
@@ -0,0 +1,100 @@
+"""
+Allocation de slugs uniques sans boucle de sondage.
+
+- allouer_slug : une requête (plus grand suffixe numérique déjà pris pour la base).
+- allouer_slugs : allocation en masse (imports) — une requête par lot de bases,
+  les doublons à l'intérieur du lot sont aussi départagés.
+- enregistrer_avec_slug : la contrainte d'unicité reste l'arbitre en cas de course
+  (deux enregistrements simultanés sur la même base) : on réalloue et on réessaie.
+"""
+from __future__ import annotations
+
+import re
+from functools import reduce
+from operator import or_
+from typing import Callable, Dict, Iterable, List, Set
+
+from django.db import IntegrityError, transaction
+from django.db.models import IntegerField, Max, Q
+from django.db.models.functions import Cast, Substr
+
+# Place réservée au suffixe "-N" (jusqu'à 7 chiffres)
+SUFFIXE_MAX = 8
+LOT_BASES = 500
+
+
+def _base(base: str, max_length: int) -> str:
+    return (base[: max_length - SUFFIXE_MAX].strip("-")) or "item"
+
+
+def allouer_slug(queryset, base: str, field: str = "slug", max_length: int = 200) -> str:
+    """Premier slug libre : `base`, sinon `base-(N+1)` où N est le plus grand suffixe pris."""
+    base = _base(base, max_length)
+    pris = queryset.filter(
+        Q(**{field: base}) | Q(**{f"{field}__regex": rf"^{re.escape(base)}-[0-9]+$"})
+    )
+    resultat = pris.aggregate(
+        existe=Max(field),
+        suffixe=Max(Cast(Substr(field, len(base) + 2), IntegerField()), filter=~Q(**{field: base})),
+    )
+    if resultat["existe"] is None:
+        return base
+    return f"{base}-{max(resultat['suffixe'] or 1, 1) + 1}"
+
+
+def _suivant(base: str, pris: Set[str], dernier: Dict[str, int]) -> str:
+    if base not in pris:
+        pris.add(base)
+        return base
+    n = dernier.get(base, 1)
+    while True:
+        n += 1
+        candidat = f"{base}-{n}"
+        if candidat not in pris:
+            pris.add(candidat)
+            dernier[base] = n
+            return candidat
+
+
+def allouer_slugs(queryset, bases: Iterable[str], field: str = "slug", max_length: int = 200) -> List[str]:
+    """Allocation en masse (même ordre que `bases`) : une requête par lot de LOT_BASES bases distinctes."""
+    bases = [_base(b, max_length) for b in bases]
+    distinctes = sorted(set(bases))
+
+    pris: Set[str] = set()
+    for i in range(0, len(distinctes), LOT_BASES):
+        lot = distinctes[i:i + LOT_BASES]
+        condition = reduce(or_, (Q(**{field: b}) | Q(**{f"{field}__startswith": f"{b}-"}) for b in lot))
+        pris.update(queryset.filter(condition).values_list(field, flat=True))
+
+    # Reprise au plus grand suffixe existant : pas de parcours depuis 2
+    dernier: Dict[str, int] = {}
+    for slug in pris:
+        base, _, suffixe = slug.rpartition("-")
+        if suffixe.isdigit():
+            dernier[base] = max(dernier.get(base, 1), int(suffixe))
+
+    return [_suivant(b, pris, dernier) for b in bases]
+
+
+def enregistrer_avec_slug(
+        instance,
+        allouer: Callable[[], str],
+        save: Callable[[], None],
+        field: str = "slug",
+        tentatives: int = 5,
+) -> None:
+    """
+    Alloue le slug puis enregistre dans un savepoint ; si un enregistrement concurrent
+    a pris le même slug entre-temps (IntegrityError), on réalloue et on réessaie.
+    """
+    for essai in range(tentatives):
+        setattr(instance, field, allouer())
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            slug_pris = type(instance)._default_manager.filter(**{field: getattr(instance, field)}).exists()
+            if not slug_pris or essai == tentatives - 1:
+                raise
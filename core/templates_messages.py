@@ -20,6 +20,11 @@ class MessageTemplates:
         "dans la rubrique 'Demander un emploi'. Merci."
     )
 
+    # Code de vérification WhatsApp
+    @staticmethod
+    def code_otp(code):
+        return f"Votre code de vérification ContactAfrique : {code}. Il expire dans 5 minutes."
+
     # Partage Profil
     @staticmethod
     def partage_profil(nom_pro, metier):
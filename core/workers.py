@@ -0,0 +1,57 @@
+"""
+Pool de workers locaux pour les traitements différés (images, vidéos...).
+
+Les tâches sont soumises APRÈS le commit de la transaction courante (les lignes sont
+visibles par le worker) et exécutées dans des threads du process, hors du cycle requête/réponse.
+BACKGROUND_TASKS_SYNC=True exécute les tâches immédiatement (tests, commandes de rattrapage).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "BACKGROUND_WORKERS", 2),
+                    thread_name_prefix="background",
+                )
+    return _executor
+
+
+def _run(fn, args, kwargs):
+    try:
+        fn(*args, **kwargs)
+    except Exception:
+        logger.exception("Échec de la tâche de fond %s", getattr(fn, "__name__", fn))
+    finally:
+        # Chaque thread a ses propres connexions : on les libère après la tâche
+        connections.close_all()
+
+
+def submit(fn, *args, **kwargs) -> None:
+    """Soumet immédiatement (sans attendre de commit) : pour les tâches qui ne lisent pas la transaction courante."""
+    if getattr(settings, "BACKGROUND_TASKS_SYNC", False):
+        fn(*args, **kwargs)
+        return
+    get_executor().submit(_run, fn, args, kwargs)
+
+
+def submit_after_commit(fn, *args, **kwargs) -> None:
+    if getattr(settings, "BACKGROUND_TASKS_SYNC", False):
+        transaction.on_commit(lambda: fn(*args, **kwargs))
+        return
+    transaction.on_commit(lambda: get_executor().submit(_run, fn, args, kwargs))
@@ -1,9 +1,12 @@
 from django.contrib import admin
 from django.utils.timezone import now
+
+from core.exports import ExportAdminMixin
 from moderation.models import Signalement
 
 @admin.register(Signalement)
-class SignalementAdmin(admin.ModelAdmin):
+class SignalementAdmin(ExportAdminMixin, admin.ModelAdmin):
+    export_nom = "signalements"
     # Colonnes affichées dans la liste (E2)
     list_display = (
         "id",
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "type", "destinataire", "statut", "tentatives", "prochain_essai_le", "envoye_le")
+    list_filter = ("statut", "type", "canal")
+    search_fields = ("destinataire", "cle_idempotence")
+    readonly_fields = ("cree_le", "envoye_le", "tentatives", "derniere_erreur")
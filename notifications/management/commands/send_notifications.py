@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.providers import get_provider
+from notifications.sender import LIMITE_PAR_DESTINATAIRE_MINUTE, claim_batch, process_batch
+
+
+class Command(BaseCommand):
+    help = "Worker : vide la boîte d'envoi (WhatsApp) avec envois concurrents, limites et nouveaux essais"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Envois simultanés (défaut: 4).")
+        parser.add_argument("--batch-size", type=int, default=100, help="Notifications réservées par lot.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Attente (s) quand la file est vide.")
+        parser.add_argument(
+            "--rate-per-minute",
+            type=int,
+            default=LIMITE_PAR_DESTINATAIRE_MINUTE,
+            help="Messages max par destinataire et par minute.",
+        )
+        parser.add_argument("--once", action="store_true", help="Traite la file puis s'arrête.")
+
+    def handle(self, *args, **options):
+        provider = get_provider()
+        self.stdout.write(f"Worker notifications démarré ({type(provider).__name__}).")
+
+        while True:
+            batch = claim_batch(options["batch_size"])
+            if not batch:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            stats = process_batch(provider, batch, options["workers"], options["rate_per_minute"])
+            self.stdout.write(
+                f"{len(batch)} notifications : {stats['envoyes']} envoyées, "
+                f"{stats['reportes']} reportées, {stats['echecs']} en échec."
+            )
+
+        self.stdout.write(self.style.SUCCESS("File de notifications vidée."))
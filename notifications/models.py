@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from django.db import models
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    """
+    Boîte d'envoi (outbox) des messages sortants (WhatsApp).
+    Les vues et commandes n'envoient jamais directement : elles insèrent ici,
+    un worker se charge ensuite de l'envoi.
+    """
+
+    class Canal(models.TextChoices):
+        WHATSAPP = "WHATSAPP", "WhatsApp"
+
+    class Type(models.TextChoices):
+        OTP = "OTP", "Code de vérification"
+        RELANCE_PAIEMENT = "RELANCE_PAIEMENT", "Relance paiement"
+        PARTAGE_PROFIL = "PARTAGE_PROFIL", "Partage de profil"
+        AUTRE = "AUTRE", "Autre"
+
+    class Statut(models.TextChoices):
+        EN_ATTENTE = "EN_ATTENTE", "En attente"
+        ENVOYE = "ENVOYE", "Envoyé"
+        ECHEC = "ECHEC", "Échec définitif"
+
+    canal = models.CharField(max_length=20, choices=Canal.choices, default=Canal.WHATSAPP)
+    type = models.CharField(max_length=20, choices=Type.choices, default=Type.AUTRE)
+    destinataire = models.CharField(max_length=32, db_index=True, verbose_name="Téléphone destinataire")
+    message = models.TextField()
+
+    # Évite les doublons (ex: relance déjà programmée pour cette échéance)
+    cle_idempotence = models.CharField(max_length=120, unique=True, null=True, blank=True)
+
+    statut = models.CharField(max_length=20, choices=Statut.choices, default=Statut.EN_ATTENTE)
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    prochain_essai_le = models.DateTimeField(default=timezone.now)
+    derniere_erreur = models.TextField(blank=True)
+
+    cree_le = models.DateTimeField(auto_now_add=True)
+    envoye_le = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Notification"
+        verbose_name_plural = "Notifications"
+        ordering = ["-cree_le"]
+        indexes = [
+            # Lecture de la file par le worker
+            models.Index(fields=["statut", "prochain_essai_le"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"[{self.type}] {self.destinataire} ({self.statut})"
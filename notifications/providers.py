@@ -0,0 +1,85 @@
+"""
+Fournisseurs d'envoi (interchangeables via settings.NOTIFICATIONS_PROVIDER).
+
+- FakeProvider : n'envoie rien, journalise le destinataire et garde les messages en mémoire (dev / tests).
+  Le contenu n'est jamais journalisé (codes OTP).
+- WhatsAppCloudProvider : API WhatsApp Cloud (Meta), session HTTP réutilisée.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import List, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+
+class ProviderError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class BaseProvider:
+    def send(self, destinataire: str, message: str, reference=None) -> None:
+        """`reference` : id de la Notification, pour les journaux uniquement."""
+        raise NotImplementedError
+
+
+class FakeProvider(BaseProvider):
+    sent: List[Tuple[str, str]] = []
+    _lock = threading.Lock()
+
+    def send(self, destinataire: str, message: str, reference=None) -> None:
+        logger.info("[WHATSAPP FAKE] -> %s (notification #%s)", destinataire, reference)
+        with self._lock:
+            self.sent.append((destinataire, message))
+
+
+class WhatsAppCloudProvider(BaseProvider):
+    def __init__(self):
+        if requests is None:
+            raise RuntimeError("Le package 'requests' est manquant. Installez-le avec 'pip install requests'.")
+        self.token = os.getenv("WHATSAPP_API_TOKEN", "")
+        self.phone_number_id = os.getenv("WHATSAPP_PHONE_NUMBER_ID", "")
+        self.base_url = os.getenv("WHATSAPP_BASE_URL", "https://graph.facebook.com/v19.0").rstrip("/")
+        if not self.token or not self.phone_number_id:
+            raise ValueError("WHATSAPP_API_TOKEN / WHATSAPP_PHONE_NUMBER_ID manquants dans les variables d'environnement.")
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+        })
+
+    def send(self, destinataire: str, message: str, reference=None) -> None:
+        payload = {
+            "messaging_product": "whatsapp",
+            "to": destinataire.lstrip("+"),
+            "type": "text",
+            "text": {"body": message},
+        }
+        try:
+            response = self.session.post(
+                f"{self.base_url}/{self.phone_number_id}/messages", json=payload, timeout=10
+            )
+        except requests.exceptions.RequestException as e:
+            raise ProviderError(f"WhatsApp indisponible : {e}")
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise ProviderError(f"WhatsApp HTTP {response.status_code}")
+        if response.status_code >= 400:
+            # Numéro invalide, message refusé... : inutile de réessayer
+            raise ProviderError(f"WhatsApp HTTP {response.status_code} : {response.text[:300]}", retryable=False)
+
+
+def get_provider() -> BaseProvider:
+    return import_string(settings.NOTIFICATIONS_PROVIDER)()
@@ -0,0 +1,121 @@
+"""
+Vidage de la boîte d'envoi (utilisé par la commande send_notifications).
+
+- Réservation d'un lot : SELECT ... FOR UPDATE SKIP LOCKED puis "bail" (prochain_essai_le repoussé),
+  plusieurs workers peuvent tourner en parallèle sans envoyer deux fois.
+- Envoi concurrent dans un pool de threads (aucun accès base dans les threads).
+- Limite par destinataire (fenêtre d'une minute, compteur dans le cache partagé).
+- Échecs : nouvel essai avec backoff exponentiel, ECHEC définitif après MAX_TENTATIVES.
+"""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from notifications.models import Notification
+from notifications.providers import BaseProvider, ProviderError
+
+logger = logging.getLogger(__name__)
+
+MAX_TENTATIVES = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+BAIL_SECONDS = 5 * 60
+LIMITE_PAR_DESTINATAIRE_MINUTE = 5
+
+
+def backoff(tentatives: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** max(tentatives - 1, 0), BACKOFF_MAX_SECONDS))
+
+
+def claim_batch(batch_size: int) -> List[Notification]:
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            Notification.objects
+            .select_for_update(skip_locked=True)
+            .filter(statut=Notification.Statut.EN_ATTENTE, prochain_essai_le__lte=now)
+            .order_by("prochain_essai_le", "id")[:batch_size]
+        )
+        if batch:
+            Notification.objects.filter(pk__in=[n.pk for n in batch]).update(
+                prochain_essai_le=now + timedelta(seconds=BAIL_SECONDS)
+            )
+    return batch
+
+
+def _autorise(destinataire: str, limite: int) -> bool:
+    minute = timezone.now().strftime("%Y%m%d%H%M")
+    key = f"notifications:rate:{destinataire}:{minute}"
+    cache.add(key, 0, timeout=90)
+    try:
+        return cache.incr(key) <= limite
+    except ValueError:
+        return True
+
+
+def _send_one(provider: BaseProvider, notification: Notification):
+    try:
+        provider.send(notification.destinataire, notification.message, reference=notification.pk)
+        return notification, None
+    except ProviderError as e:
+        return notification, e
+    except Exception as e:
+        return notification, ProviderError(str(e))
+
+
+def process_batch(
+        provider: BaseProvider,
+        batch: List[Notification],
+        workers: int,
+        limite_par_destinataire: int = LIMITE_PAR_DESTINATAIRE_MINUTE,
+) -> dict:
+    now = timezone.now()
+    stats = {"envoyes": 0, "reportes": 0, "echecs": 0}
+
+    a_envoyer, limites = [], []
+    for notification in batch:
+        (a_envoyer if _autorise(notification.destinataire, limite_par_destinataire) else limites).append(notification)
+
+    # Limite atteinte : on repasse à la minute suivante, sans compter de tentative
+    if limites:
+        Notification.objects.filter(pk__in=[n.pk for n in limites]).update(
+            prochain_essai_le=now + timedelta(seconds=60)
+        )
+        stats["reportes"] = len(limites)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda n: _send_one(provider, n), a_envoyer))
+
+    envoyes = [n.pk for n, error in results if error is None]
+    if envoyes:
+        Notification.objects.filter(pk__in=envoyes).update(
+            statut=Notification.Statut.ENVOYE,
+            envoye_le=timezone.now(),
+            tentatives=F("tentatives") + 1,
+            derniere_erreur="",
+        )
+        stats["envoyes"] = len(envoyes)
+
+    for notification, error in results:
+        if error is None:
+            continue
+        tentatives = notification.tentatives + 1
+        definitif = not error.retryable or tentatives >= MAX_TENTATIVES
+        Notification.objects.filter(pk=notification.pk).update(
+            tentatives=tentatives,
+            derniere_erreur=str(error)[:1000],
+            statut=Notification.Statut.ECHEC if definitif else Notification.Statut.EN_ATTENTE,
+            prochain_essai_le=timezone.now() + backoff(tentatives),
+        )
+        stats["echecs" if definitif else "reportes"] += 1
+        logger.warning("Notification #%s non envoyée (%s) : %s", notification.pk, tentatives, error)
+
+    return stats
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from notifications.models import Notification
+
+
+def enqueue(
+        *,
+        destinataire: str,
+        message: str,
+        type: str = Notification.Type.AUTRE,
+        cle_idempotence: Optional[str] = None,
+) -> Notification:
+    """Ajoute un message à la boîte d'envoi (aucun appel réseau)."""
+    if cle_idempotence:
+        notification, _ = Notification.objects.get_or_create(
+            cle_idempotence=cle_idempotence,
+            defaults={"destinataire": destinataire, "message": message, "type": type},
+        )
+        return notification
+    return Notification.objects.create(destinataire=destinataire, message=message, type=type)
+
+
+def enqueue_many(notifications: Iterable[Notification], batch_size: int = 500) -> int:
+    """
+    Insertion en masse ; les doublons (cle_idempotence) sont ignorés.
+    Retourne le nombre de notifications réellement ajoutées : les clés déjà présentes
+    sont écartées avant l'insertion (une requête par lot), ignore_conflicts ne couvre
+    plus que les courses entre deux exécutions simultanées.
+    """
+    objs = list(notifications)
+    cles = {n.cle_idempotence for n in objs if n.cle_idempotence}
+    existantes = set()
+    cles_liste = list(cles)
+    for i in range(0, len(cles_liste), batch_size):
+        existantes.update(
+            Notification.objects
+            .filter(cle_idempotence__in=cles_liste[i:i + batch_size])
+            .values_list("cle_idempotence", flat=True)
+        )
+
+    nouvelles, vues = [], set()
+    for n in objs:
+        if n.cle_idempotence:
+            if n.cle_idempotence in existantes or n.cle_idempotence in vues:
+                continue
+            vues.add(n.cle_idempotence)
+        nouvelles.append(n)
+
+    Notification.objects.bulk_create(nouvelles, batch_size=batch_size, ignore_conflicts=True)
+    return len(nouvelles)
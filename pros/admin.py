@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import io
+
+from django import forms
 from django.contrib import admin, messages
-from django.urls import reverse
+from django.http import HttpResponse, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils import timezone
 from django.utils.html import format_html, mark_safe
 
+from core.exports import ExportAdminMixin
+
+from .importer import ImportPros, lire_lignes
 from .models import (
     ProfilProfessionnel,
     MediaPro,
@@ -12,6 +20,11 @@ from .models import (
 )
 
 
+class ImportProsForm(forms.Form):
+    fichier = forms.FileField(help_text="CSV avec en-tête ou JSONL (une ligne JSON par pro).")
+    dry_run = forms.BooleanField(required=False, label="Simulation (valider sans créer)")
+
+
 # =========================
 # Inlines
 # =========================
@@ -37,7 +50,8 @@ class MediaProInline(admin.TabularInline):
 # ProfilProfessionnel
 # =========================
 @admin.register(ProfilProfessionnel)
-class ProfilProfessionnelAdmin(admin.ModelAdmin):
+class ProfilProfessionnelAdmin(ExportAdminMixin, admin.ModelAdmin):
+    export_nom = "pros"
     list_display = (
         "apercu_avatar",
         "nom_entreprise",
@@ -67,7 +81,7 @@ class ProfilProfessionnelAdmin(admin.ModelAdmin):
     autocomplete_fields = ["metier", "zone_geographique", "utilisateur"]
     filter_horizontal = ("zones_intervention",)
 
-    readonly_fields = ("slug", "cree_le", "mis_a_jour_le", "apercu_avatar_large")
+    readonly_fields = ("slug", "cree_le", "mis_a_jour_le", "apercu_avatar_large", "abonnement_actif_jusqu_au")
     inlines = [MediaProInline]
 
     fieldsets = (
@@ -98,6 +112,7 @@ class ProfilProfessionnelAdmin(admin.ModelAdmin):
             {
                 "fields": (
                     ("est_publie", "statut_en_ligne"),
+                    "abonnement_actif_jusqu_au",
                     ("latitude", "longitude"),
                 )
             },
@@ -112,6 +127,51 @@ class ProfilProfessionnelAdmin(admin.ModelAdmin):
     )
 
     actions = ["publier_profils", "depublier_profils"]
+    change_list_template = "admin/pros/profilprofessionnel/change_list.html"
+
+    def get_urls(self):
+        urls = [
+            path(
+                "importer/",
+                self.admin_site.admin_view(self.importer_view),
+                name="pros_profilprofessionnel_importer",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def importer_view(self, request):
+        if not self.has_add_permission(request):
+            return HttpResponseRedirect(reverse("admin:pros_profilprofessionnel_changelist"))
+
+        form = ImportProsForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            fichier = form.cleaned_data["fichier"]
+            format = "jsonl" if fichier.name.lower().endswith((".jsonl", ".ndjson")) else "csv"
+            rapport = io.StringIO()
+            resultat = ImportPros(rapport=rapport, dry_run=form.cleaned_data["dry_run"]).run(
+                lire_lignes(fichier.file, format)
+            )
+
+            verbe = "seraient créés" if form.cleaned_data["dry_run"] else "créés"
+            self.message_user(
+                request,
+                f"{resultat.lues} lignes lues : {resultat.creees} pros {verbe}, {resultat.rejetees} rejetées.",
+                messages.WARNING if resultat.rejetees else messages.SUCCESS,
+            )
+            if resultat.rejetees:
+                # Rapport d'erreurs téléchargé directement (numéro de ligne + motifs)
+                response = HttpResponse(rapport.getvalue(), content_type="text/csv; charset=utf-8")
+                response["Content-Disposition"] = 'attachment; filename="import-pros-erreurs.csv"'
+                return response
+            return HttpResponseRedirect(reverse("admin:pros_profilprofessionnel_changelist"))
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Importer des professionnels",
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/pros/profilprofessionnel/import.html", context)
 
     @admin.display(description="Avatar")
     def apercu_avatar(self, obj):
@@ -142,11 +202,13 @@ class ProfilProfessionnelAdmin(admin.ModelAdmin):
 
     @admin.action(description="Publier les profils sélectionnés")
     def publier_profils(self, request, queryset):
-        queryset.update(est_publie=True)
+        modifies = ProfilProfessionnel.definir_publication(queryset, True)
+        self.message_user(request, f"{modifies} profil(s) publié(s).")
 
     @admin.action(description="Masquer (Dépublier) les profils sélectionnés")
     def depublier_profils(self, request, queryset):
-        queryset.update(est_publie=False)
+        modifies = ProfilProfessionnel.definir_publication(queryset, False)
+        self.message_user(request, f"{modifies} profil(s) masqué(s).")
 
 
 # =========================
@@ -154,8 +216,8 @@ class ProfilProfessionnelAdmin(admin.ModelAdmin):
 # =========================
 @admin.register(MediaPro)
 class MediaProAdmin(admin.ModelAdmin):
-    list_display = ("id", "apercu_fichier", "professionnel", "type_media", "est_principal", "cree_le")
-    list_filter = ("type_media", "est_principal")
+    list_display = ("id", "apercu_fichier", "professionnel", "type_media", "statut_traitement", "est_principal", "cree_le")
+    list_filter = ("type_media", "statut_traitement", "est_principal")
     search_fields = ("professionnel__nom_entreprise",)
     autocomplete_fields = ["professionnel"]
 
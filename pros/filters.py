@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import logging
+
+import django_filters
+from django.db.models import Exists, OuterRef, Q
+
+from catalog.models import Location
+from .models import ProfilProfessionnel
+
+logger = logging.getLogger(__name__)
+
+
+def filtrer_zone_hierarchique(queryset, zone_id):
+    """
+    Pros situés dans la zone `zone_id` ou l'une de ses sous-zones (région -> quartiers),
+    par leur localisation principale ou leurs zones d'intervention.
+    S'appuie sur Location.chemin (préfixe indexé) : pas de parcours récursif de l'arbre.
+    """
+    chemin = Location.objects.filter(pk=zone_id).values_list("chemin", flat=True).first()
+    if chemin is None:
+        return queryset.none()
+    if not chemin:
+        # Chemins pas encore calculés (base antérieure à la colonne) : zone exacte seulement
+        logger.warning("Location %s sans chemin : lancer la commande rebuild_chemins", zone_id)
+        intervention = ProfilProfessionnel.zones_intervention.through.objects.filter(
+            profilprofessionnel_id=OuterRef("pk"), location_id=zone_id
+        )
+        return queryset.filter(Q(zone_geographique_id=zone_id) | Q(Exists(intervention)))
+
+    intervention = ProfilProfessionnel.zones_intervention.through.objects.filter(
+        profilprofessionnel_id=OuterRef("pk"),
+        location__chemin__startswith=chemin,
+    )
+    return queryset.filter(Q(zone_geographique__chemin__startswith=chemin) | Q(Exists(intervention)))
+
+
+class RechercheProFilter(django_filters.FilterSet):
+    # ?zone=<id> : région, département, ville ou quartier (sous-zones et zones d'intervention incluses)
+    zone = django_filters.NumberFilter(method="filtrer_zone")
+
+    class Meta:
+        model = ProfilProfessionnel
+        fields = ["metier", "zone_geographique", "statut_en_ligne", "zone"]
+
+    def filtrer_zone(self, queryset, name, value):
+        return filtrer_zone_hierarchique(queryset, int(value))
@@ -0,0 +1,85 @@
+"""
+Déclinaisons d'images (avatars + photos MediaPro) pour limiter les octets transférés sur mobile.
+
+Chaque original produit des variantes WebP stockées à côté de lui :
+    pros/media/atelier.jpg -> pros/media/atelier__thumb.webp, pros/media/atelier__medium.webp
+Le mapping {variante: chemin} est enregistré sur le modèle avec la clé "source"
+(nom de l'original), ce qui rend la génération idempotente.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import os
+from typing import Dict, Optional
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# nom -> (largeur max, hauteur max)
+RENDITIONS = {
+    "thumb": (160, 160),
+    "medium": (640, 640),
+}
+WEBP_QUALITY = 80
+
+
+def variant_name(source: str, rendition: str) -> str:
+    root, _ = os.path.splitext(source)
+    return f"{root}__{rendition}.webp"
+
+
+def variant_url(storage, variantes: Optional[dict], rendition: str) -> Optional[str]:
+    chemin = (variantes or {}).get(rendition)
+    return storage.url(chemin) if chemin else None
+
+
+def build_variants(storage, source: str) -> Dict[str, str]:
+    with storage.open(source, "rb") as fh:
+        image = Image.open(fh)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    variantes = {"source": source}
+    for rendition, size in RENDITIONS.items():
+        copie = image.copy()
+        copie.thumbnail(size, Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        copie.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+
+        nom = variant_name(source, rendition)
+        if storage.exists(nom):
+            storage.delete(nom)
+        variantes[rendition] = storage.save(nom, ContentFile(buffer.getvalue()))
+    return variantes
+
+
+def generate_image_variants(model_label: str, pk: int, field_name: str, variants_field: str) -> None:
+    """
+    Tâche de fond : génère les variantes de `field_name` et les enregistre dans `variants_field`.
+    L'écriture est conditionnée au fichier source : un nouvel upload entre-temps n'est pas écrasé.
+    """
+    model = apps.get_model(model_label)
+    source = model.objects.filter(pk=pk).values_list(field_name, flat=True).first()
+    if not source:
+        return
+
+    storage = model._meta.get_field(field_name).storage
+    try:
+        variantes = build_variants(storage, source)
+    except (OSError, Image.DecompressionBombError) as exc:
+        logger.warning("Variantes impossibles pour %s #%s (%s) : %s", model_label, pk, source, exc)
+        return
+
+    updated = model.objects.filter(pk=pk, **{field_name: source}).update(**{variants_field: variantes})
+
+    if updated and model_label == "pros.MediaPro":
+        professionnel_id = model.objects.filter(pk=pk).values_list("professionnel_id", flat=True).first()
+        model.sync_photo_couverture(professionnel_id)
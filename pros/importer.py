@@ -0,0 +1,278 @@
+"""
+Import en masse de professionnels (associations de métiers, listes partenaires).
+
+Le fichier (CSV avec en-tête, ou JSONL) est lu en flux et traité par lots :
+- validation contre des tables de correspondance Métier / Localisation chargées une fois
+  (id ou slug acceptés), téléphones normalisés par UserManager.normalize_phone ;
+- doublons détectés dans le lot et en base (une requête par lot) ;
+- User + ProfilProfessionnel créés en masse, slugs alloués en masse (core.slugs) ;
+- chaque ligne refusée est écrite dans le rapport d'erreurs (numéro de ligne + motifs).
+La mémoire reste bornée par la taille d'un lot, quel que soit le nombre de lignes.
+
+Colonnes : phone, nom_entreprise, metier, zone, telephone_appel, telephone_whatsapp,
+description, latitude, longitude, password (toutes optionnelles sauf phone / nom_entreprise / metier / zone).
+Sans mot de passe, le compte est créé avec un mot de passe inutilisable (à définir plus tard).
+Les profils sont créés non publiés, comme à l'inscription.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.contrib.auth.hashers import make_password
+from django.db import DataError, IntegrityError, transaction
+from django.utils.text import slugify
+
+from accounts.models import User
+from catalog.models import Job, Location
+from core.search import refresh_search_vector
+from core.slugs import allouer_slugs
+from .models import ProfilProfessionnel
+
+COLONNES_RAPPORT = ["ligne", "phone", "erreurs"]
+PASSWORD_MIN_LENGTH = 8  # comme RegisterSerializer
+
+
+def _max_length(model, champ: str) -> int:
+    return model._meta.get_field(champ).max_length
+
+
+def lire_lignes(fichier, format: str) -> Iterator[Tuple[int, dict]]:
+    """(numéro de ligne, dict) pour un fichier texte ou binaire ouvert."""
+    if isinstance(fichier.read(0), bytes):
+        fichier = io.TextIOWrapper(fichier, encoding="utf-8-sig", newline="")
+
+    if format == "jsonl":
+        for numero, ligne in enumerate(fichier, start=1):
+            ligne = ligne.strip()
+            if not ligne:
+                continue
+            try:
+                data = json.loads(ligne)
+            except ValueError:
+                data = None
+            yield numero, data if isinstance(data, dict) else {"__invalide__": True}
+    else:
+        # Ligne 1 = en-tête
+        for numero, data in enumerate(csv.DictReader(fichier), start=2):
+            yield numero, data
+
+
+@dataclass
+class ResultatImport:
+    lues: int = 0
+    creees: int = 0
+    rejetees: int = 0
+    erreurs: List[dict] = field(default_factory=list)
+
+
+class ImportPros:
+    def __init__(self, rapport=None, chunk_size: int = 1000, dry_run: bool = False):
+        """`rapport` : objet fichier texte recevant le CSV des lignes rejetées (optionnel)."""
+        self.chunk_size = max(1, chunk_size)
+        self.dry_run = dry_run
+        self.rapport = csv.DictWriter(rapport, fieldnames=COLONNES_RAPPORT) if rapport is not None else None
+        if self.rapport is not None:
+            self.rapport.writeheader()
+
+        # Tables de correspondance (id et slug) chargées une seule fois
+        self.metiers = {}
+        for pk, slug, nom in Job.objects.values_list("id", "slug", "name"):
+            self.metiers[str(pk)] = self.metiers[slug] = (pk, nom)
+        self.zones = {}
+        for pk, slug, nom in Location.objects.values_list("id", "slug", "name"):
+            self.zones[str(pk)] = self.zones[slug] = (pk, nom)
+
+    def run(self, lignes: Iterable[Tuple[int, dict]]) -> ResultatImport:
+        resultat = ResultatImport()
+        lignes = iter(lignes)
+        while True:
+            lot = list(islice(lignes, self.chunk_size))
+            if not lot:
+                return resultat
+            resultat.lues += len(lot)
+            self._traiter_lot(lot, resultat)
+
+    # --- Validation ------------------------------------------------------------------------
+
+    @staticmethod
+    def _texte(data: dict, cle: str) -> str:
+        valeur = data.get(cle)
+        return "" if valeur is None else str(valeur).strip()
+
+    def _valider(self, data: dict) -> Tuple[Optional[dict], List[str]]:
+        if data.get("__invalide__"):
+            return None, ["ligne JSON invalide"]
+
+        erreurs = []
+        phone = User.objects.normalize_phone(self._texte(data, "phone"))
+        if not User.objects.is_valid_phone(phone) or len(phone) > _max_length(User, "phone"):
+            erreurs.append("phone invalide")
+
+        # Numéros de contact : le numéro du compte par défaut, sinon même contrôle
+        contacts = {}
+        for cle in ("telephone_appel", "telephone_whatsapp"):
+            brut = self._texte(data, cle)
+            contacts[cle] = User.objects.normalize_phone(brut) if brut else phone
+            if brut and (
+                not User.objects.is_valid_phone(contacts[cle])
+                or len(contacts[cle]) > _max_length(ProfilProfessionnel, cle)
+            ):
+                erreurs.append(f"{cle} invalide")
+
+        nom = self._texte(data, "nom_entreprise")
+        limite_nom = _max_length(ProfilProfessionnel, "nom_entreprise")
+        if not nom:
+            erreurs.append("nom_entreprise manquant")
+        elif len(nom) > limite_nom:
+            erreurs.append(f"nom_entreprise trop long ({limite_nom} max)")
+
+        password = self._texte(data, "password")
+        if password and len(password) < PASSWORD_MIN_LENGTH:
+            erreurs.append(f"password trop court ({PASSWORD_MIN_LENGTH} min)")
+
+        metier = self.metiers.get(self._texte(data, "metier"))
+        if metier is None:
+            erreurs.append("metier introuvable")
+        zone = self.zones.get(self._texte(data, "zone"))
+        if zone is None:
+            erreurs.append("zone introuvable")
+
+        coords = {}
+        for cle, limite in (("latitude", 90), ("longitude", 180)):
+            brut = self._texte(data, cle)
+            if not brut:
+                coords[cle] = None
+                continue
+            try:
+                valeur = Decimal(brut).quantize(Decimal("0.000001"))
+                # NaN passe quantize() mais fait échouer toute comparaison
+                if not valeur.is_finite():
+                    raise InvalidOperation
+            except InvalidOperation:
+                erreurs.append(f"{cle} invalide")
+                continue
+            if not -limite <= valeur <= limite:
+                erreurs.append(f"{cle} hors limites")
+            coords[cle] = valeur
+
+        if erreurs:
+            return None, erreurs
+
+        return {
+            "phone": phone,
+            "password": password,
+            "nom_entreprise": nom,
+            "metier": metier,
+            "zone": zone,
+            "description": self._texte(data, "description"),
+            **contacts,
+            **coords,
+        }, []
+
+    # --- Traitement d'un lot ---------------------------------------------------------------
+
+    def _rejeter(self, resultat: ResultatImport, numero: int, phone: str, erreurs: List[str]) -> None:
+        resultat.rejetees += 1
+        ligne = {"ligne": numero, "phone": phone, "erreurs": "; ".join(erreurs)}
+        if self.rapport is not None:
+            self.rapport.writerow(ligne)
+        elif len(resultat.erreurs) < 1000:
+            resultat.erreurs.append(ligne)
+
+    def _traiter_lot(self, lot, resultat: ResultatImport) -> None:
+        valides = []
+        vus = set()
+        for numero, data in lot:
+            propre, erreurs = self._valider(data)
+            if propre is not None and propre["phone"] in vus:
+                erreurs = ["phone en double dans le fichier"]
+                propre = None
+            if propre is None:
+                self._rejeter(resultat, numero, self._texte(data, "phone"), erreurs)
+                continue
+            vus.add(propre["phone"])
+            valides.append((numero, propre))
+
+        # Numéros déjà inscrits (y compris par les lots précédents) : une requête
+        inscrits = set(User.objects.filter(phone__in=vus).values_list("phone", flat=True))
+        a_creer = []
+        for numero, propre in valides:
+            if propre["phone"] in inscrits:
+                self._rejeter(resultat, numero, propre["phone"], ["numéro déjà inscrit"])
+            else:
+                a_creer.append((numero, propre))
+
+        if self.dry_run:
+            # Simulation : lignes qui auraient été créées
+            resultat.creees += len(a_creer)
+            return
+        if not a_creer:
+            return
+
+        try:
+            resultat.creees += self._inserer([propre for _, propre in a_creer])
+        except (IntegrityError, DataError):
+            # Inscription concurrente ou valeur refusée par la base : le lot est annulé,
+            # on reprend ligne par ligne pour isoler et signaler les lignes fautives.
+            for numero, propre in a_creer:
+                try:
+                    resultat.creees += self._inserer([propre])
+                except IntegrityError:
+                    motif = (
+                        "numéro déjà inscrit" if User.objects.filter(phone=propre["phone"]).exists()
+                        else "conflit d'unicité"
+                    )
+                    self._rejeter(resultat, numero, propre["phone"], [motif])
+                except DataError as exc:
+                    self._rejeter(resultat, numero, propre["phone"], [f"refusé par la base : {str(exc).strip()}"])
+
+    def _inserer(self, a_creer: List[dict]) -> int:
+        """Crée comptes + profils d'un lot dans une transaction ; retourne le nombre de profils créés."""
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(
+                    phone=p["phone"],
+                    role=User.Role.PRO,
+                    password=make_password(p["password"] or None),
+                )
+                for p in a_creer
+            ])
+
+            # Même base que ProfilProfessionnel._slug_base (métier zone nom-uid)
+            slugs = allouer_slugs(
+                ProfilProfessionnel.objects.all(),
+                [
+                    "{}-{}".format(slugify(" ".join((p["metier"][1], p["zone"][1], p["nom_entreprise"])))[:180], user.id)
+                    for p, user in zip(a_creer, users)
+                ],
+            )
+
+            profils = ProfilProfessionnel.objects.bulk_create([
+                ProfilProfessionnel(
+                    utilisateur=user,
+                    nom_entreprise=p["nom_entreprise"],
+                    metier_id=p["metier"][0],
+                    zone_geographique_id=p["zone"][0],
+                    slug=slug,
+                    description=p["description"],
+                    telephone_appel=p["telephone_appel"],
+                    telephone_whatsapp=p["telephone_whatsapp"],
+                    latitude=p["latitude"],
+                    longitude=p["longitude"],
+                    # Par défaut False tant que l'abonnement n'est pas payé
+                    est_publie=False,
+                )
+                for p, user, slug in zip(a_creer, users, slugs)
+            ])
+
+            refresh_search_vector(
+                ProfilProfessionnel.objects.filter(pk__in=[p.pk for p in profils]),
+                ProfilProfessionnel.SEARCH_WEIGHTS,
+            )
+        return len(profils)
@@ -0,0 +1,221 @@
+import hashlib
+import hmac
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+import uuid
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from annonces.models import Annonce
+from billing.models import Payment
+from billing.services import get_bictorys_config
+from pros.management.commands.seed_benchmark import BENCH_CLIENT_PHONE, PREFIXE_PROS
+from pros.models import ContactFavori, ProfilProfessionnel
+
+# Centre de Dakar (scénario géographique)
+DAKAR = (14.7167, -17.4677)
+
+
+def percentile(valeurs, p: float) -> float:
+    """Percentile par rang le plus proche (valeurs triées)."""
+    if not valeurs:
+        return 0.0
+    rang = max(1, math.ceil(p / 100 * len(valeurs)))
+    return valeurs[min(rang, len(valeurs)) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark des endpoints chauds (latences p50/p95/p99, requêtes SQL, débit) -> fichier JSON comparable ; "
+        "exécuté dans une transaction annulée (aucune donnée conservée)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requêtes mesurées par scénario.")
+        parser.add_argument("--warmup", type=int, default=20, help="Requêtes de chauffe (non mesurées).")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--scenario", action="append", help="Limiter à un ou plusieurs scénarios.")
+        parser.add_argument("--label", default="", help="Libellé du run (ex: nom de branche).")
+        parser.add_argument("--output", default="benchmark-results.json")
+        parser.add_argument("--compare", help="Fichier JSON d'un run précédent : affiche les écarts.")
+
+    def handle(self, *args, **options):
+        # Client de test in-process : pas de réseau, ALLOWED_HOSTS inclut "testserver"
+        setup_test_environment()
+        self.rng = random.Random(options["seed"])
+
+        self.slugs = list(
+            ProfilProfessionnel.objects.filter(utilisateur__phone__startswith=PREFIXE_PROS)
+            .order_by("id").values_list("slug", flat=True)[:5000]
+        )
+        if not self.slugs:
+            raise CommandError("Aucune donnée synthétique : lancez d'abord seed_benchmark.")
+        self.metiers = list(
+            ProfilProfessionnel.objects.filter(utilisateur__phone__startswith=PREFIXE_PROS)
+            .order_by().values_list("metier_id", flat=True).distinct()[:200]
+        )
+        self.mots = ["diallo", "atelier", "services", "ndiaye", "express", "fall", "solutions"]
+
+        client_user = User.objects.get(phone=BENCH_CLIENT_PHONE)
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(client_user).access_token}"}
+        self.pro_user = User.objects.filter(phone__startswith=PREFIXE_PROS).order_by("id").first()
+
+        scenarios = {
+            "recherche": self.recherche,
+            "recherche_geo": self.recherche_geo,
+            "recherche_texte": self.recherche_texte,
+            "recherche_curseur": self.recherche_curseur,
+            "pro_detail": self.pro_detail,
+            "locations_tree": lambda c: c.get("/api/catalog/locations/tree/"),
+            "annonces_liste": lambda c: c.get("/api/annonces/"),
+            "favoris": lambda c: c.get("/api/pros/favoris/", **self.auth),
+            "webhook": self.webhook,
+        }
+        if options["scenario"]:
+            inconnus = set(options["scenario"]) - set(scenarios)
+            if inconnus:
+                raise CommandError(f"Scénarios inconnus : {', '.join(sorted(inconnus))}")
+            scenarios = {k: v for k, v in scenarios.items() if k in options["scenario"]}
+
+        # Run entier dans une transaction annulée : les paiements créés pour le scénario webhook,
+        # le registre WebhookEvent et les compteurs ne s'accumulent pas d'un run à l'autre.
+        # Le traitement différé (on_commit / workers) n'est donc jamais exécuté : seul le chemin
+        # synchrone de la requête est mesuré et compté.
+        with transaction.atomic():
+            if "webhook" in scenarios:
+                # Paiements créés à l'avance : seule la réception du webhook est mesurée
+                payments = Payment.objects.bulk_create(
+                    Payment(user=self.pro_user, provider_ref=uuid.uuid4().hex)
+                    for _ in range(options["requests"] + options["warmup"])
+                )
+                self.webhook_refs = [p.provider_ref for p in payments]
+
+            resultats = {}
+            for nom, requete in scenarios.items():
+                resultats[nom] = self.run(requete, options["requests"], options["warmup"])
+                r = resultats[nom]
+                self.stdout.write(
+                    f"{nom:<18} p50={r['p50_ms']:>7.1f}ms p95={r['p95_ms']:>7.1f}ms p99={r['p99_ms']:>7.1f}ms "
+                    f"requêtes SQL={r['queries_p50']} (max {r['queries_max']}) débit={r['throughput_rps']:.0f}/s "
+                    f"erreurs={r['errors']}"
+                )
+            transaction.set_rollback(True)
+
+        rapport = {"meta": self.meta(options), "scenarios": resultats}
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(rapport, fh, indent=2, ensure_ascii=False, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['output']}"))
+
+        if options["compare"]:
+            self.compare(options["compare"], resultats)
+
+    # --- Mesure ---------------------------------------------------------------------------
+
+    def run(self, requete, n: int, warmup: int) -> dict:
+        client = Client()
+        for _ in range(warmup):
+            requete(client)
+
+        durees, requetes_sql, erreurs = [], [], 0
+        debut = time.perf_counter()
+        for _ in range(n):
+            # Requêtes de la connexion courante pendant l'appel ; le travail fait au commit
+            # ou dans les threads du pool (core.workers) n'y figure pas
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                response = requete(client)
+                durees.append((time.perf_counter() - t0) * 1000)
+            requetes_sql.append(len(ctx.captured_queries))
+            if response.status_code >= 400:
+                erreurs += 1
+        total = time.perf_counter() - debut
+
+        durees.sort()
+        requetes_sql.sort()
+        return {
+            "requests": n,
+            "errors": erreurs,
+            "p50_ms": round(percentile(durees, 50), 2),
+            "p95_ms": round(percentile(durees, 95), 2),
+            "p99_ms": round(percentile(durees, 99), 2),
+            "mean_ms": round(sum(durees) / len(durees), 2) if durees else 0.0,
+            "queries_p50": percentile(requetes_sql, 50),
+            "queries_max": requetes_sql[-1] if requetes_sql else 0,
+            "throughput_rps": round(n / total, 1) if total else 0.0,
+        }
+
+    def meta(self, options) -> dict:
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = ""
+        return {
+            "label": options["label"],
+            "git_commit": commit,
+            "date": timezone.now().isoformat(),
+            "seed": options["seed"],
+            "requests_per_scenario": options["requests"],
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "dataset": {
+                "pros": ProfilProfessionnel.objects.count(),
+                "annonces": Annonce.objects.count(),
+                "favoris": ContactFavori.objects.count(),
+            },
+        }
+
+    def compare(self, chemin: str, resultats: dict) -> None:
+        with open(chemin, encoding="utf-8") as fh:
+            precedent = json.load(fh).get("scenarios", {})
+        self.stdout.write(f"Écarts par rapport à {chemin} :")
+        for nom, r in resultats.items():
+            avant = precedent.get(nom)
+            if not avant:
+                continue
+            for cle in ("p50_ms", "p95_ms", "p99_ms"):
+                delta = (r[cle] - avant[cle]) / avant[cle] * 100 if avant[cle] else 0.0
+                self.stdout.write(f"  {nom:<18} {cle:<7} {avant[cle]:>8.1f} -> {r[cle]:>8.1f} ({delta:+.1f}%)")
+            if r["queries_max"] != avant["queries_max"]:
+                self.stdout.write(f"  {nom:<18} requêtes SQL max {avant['queries_max']} -> {r['queries_max']}")
+
+    # --- Scénarios --------------------------------------------------------------------------
+
+    def recherche(self, client):
+        return client.get("/api/pros/recherche/", {"metier": self.rng.choice(self.metiers)})
+
+    def recherche_geo(self, client):
+        lat = DAKAR[0] + self.rng.uniform(-0.05, 0.05)
+        lng = DAKAR[1] + self.rng.uniform(-0.05, 0.05)
+        return client.get("/api/pros/recherche/", {"lat": lat, "lng": lng, "radius_km": 10, "sort": "distance"})
+
+    def recherche_texte(self, client):
+        return client.get("/api/pros/recherche/", {"search": self.rng.choice(self.mots)})
+
+    def recherche_curseur(self, client):
+        return client.get("/api/pros/recherche/", {"pagination": "cursor"})
+
+    def pro_detail(self, client):
+        return client.get(f"/api/pros/public/{self.rng.choice(self.slugs)}/")
+
+    def webhook(self, client):
+        # Un paiement neuf par appel : mesure le chemin complet (enregistrement + acquittement)
+        body = json.dumps({"reference": self.webhook_refs.pop(), "status": "PAID"}).encode()
+        headers = {}
+        secret = get_bictorys_config().webhook_secret
+        if secret:
+            signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+            headers["HTTP_X_BICTORYS_SIGNATURE"] = f"sha256={signature}"
+        return client.post("/api/billing/webhooks/bictorys/", body, content_type="application/json", **headers)
@@ -0,0 +1,52 @@
+import sys
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.exports import CHUNK_SIZE, EXPORTS, FORMATS, en_octets, encoder, lignes
+
+
+def _debut_du_jour(valeur: str) -> datetime:
+    try:
+        jour = date.fromisoformat(valeur)
+    except ValueError:
+        raise CommandError(f"Date invalide (AAAA-MM-JJ attendu) : {valeur}")
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+class Command(BaseCommand):
+    help = "Export CSV / JSONL en flux (pros, payments, signalements) à mémoire constante"
+
+    def add_arguments(self, parser):
+        parser.add_argument("nom", choices=sorted(EXPORTS))
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Compresse la sortie (gzip).")
+        parser.add_argument("--output", help="Fichier de sortie (défaut : sortie standard).")
+        parser.add_argument("--depuis", help="Date de début incluse (AAAA-MM-JJ).")
+        parser.add_argument("--jusqu-a", dest="jusqu_a", help="Date de fin incluse (AAAA-MM-JJ).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Lignes lues par aller-retour.")
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options["nom"]]
+        queryset = export.get_queryset()
+        # Bornes converties en instants : le filtre reste utilisable par un index sur la date
+        if options["depuis"]:
+            queryset = queryset.filter(**{f"{export.champ_date}__gte": _debut_du_jour(options["depuis"])})
+        if options["jusqu_a"]:
+            fin = _debut_du_jour(options["jusqu_a"]) + timedelta(days=1)
+            queryset = queryset.filter(**{f"{export.champ_date}__lt": fin})
+
+        flux = en_octets(
+            encoder(export, lignes(export, queryset, max(1, options["chunk_size"])), options["format"]),
+            options["gzip"],
+        )
+        if options["output"]:
+            with open(options["output"], "wb") as fh:
+                for bloc in flux:
+                    fh.write(bloc)
+            self.stderr.write(self.style.SUCCESS(f"Export écrit dans {options['output']}"))
+        else:
+            for bloc in flux:
+                sys.stdout.buffer.write(bloc)
+            sys.stdout.buffer.flush()
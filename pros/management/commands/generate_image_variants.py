@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from pros.images import generate_image_variants
+from pros.models import MediaPro, ProfilProfessionnel
+
+
+class Command(BaseCommand):
+    help = "Génère les variantes WebP manquantes (avatars + photos MediaPro) de manière synchrone"
+
+    def handle(self, *args, **options):
+        avatars = (
+            ProfilProfessionnel.objects
+            .exclude(avatar__isnull=True).exclude(avatar="")
+            .values_list("pk", "avatar", "avatar_variantes")
+        )
+        nb_avatars = 0
+        for pk, avatar, variantes in avatars.iterator():
+            if (variantes or {}).get("source") != avatar:
+                generate_image_variants("pros.ProfilProfessionnel", pk, "avatar", "avatar_variantes")
+                nb_avatars += 1
+
+        photos = (
+            MediaPro.objects
+            .filter(type_media=MediaPro.TypeMedia.PHOTO)
+            .values_list("pk", "fichier", "variantes")
+        )
+        nb_photos = 0
+        for pk, fichier, variantes in photos.iterator():
+            if (variantes or {}).get("source") != fichier:
+                generate_image_variants("pros.MediaPro", pk, "fichier", "variantes")
+                nb_photos += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Variantes générées : {nb_avatars} avatars, {nb_photos} photos."))
@@ -0,0 +1,47 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pros.importer import ImportPros, lire_lignes
+
+
+class Command(BaseCommand):
+    help = "Import en masse de professionnels depuis un fichier CSV ou JSONL (traitement par lots)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("fichier", help="Chemin du fichier CSV (avec en-tête) ou JSONL.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Déduit de l'extension par défaut.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Lignes traitées par lot.")
+        parser.add_argument("--rapport", help="Fichier CSV recevant les lignes rejetées (ligne, phone, erreurs).")
+        parser.add_argument("--dry-run", action="store_true", help="Valide sans rien écrire en base.")
+
+    def handle(self, *args, **options):
+        chemin = options["fichier"]
+        if not os.path.exists(chemin):
+            raise CommandError(f"Fichier introuvable : {chemin}")
+        format = options["format"] or ("jsonl" if chemin.lower().endswith((".jsonl", ".ndjson")) else "csv")
+
+        rapport = open(options["rapport"], "w", encoding="utf-8", newline="") if options["rapport"] else None
+        debut = time.perf_counter()
+        try:
+            with open(chemin, encoding="utf-8-sig", newline="") as fh:
+                resultat = ImportPros(
+                    rapport=rapport, chunk_size=options["chunk_size"], dry_run=options["dry_run"],
+                ).run(lire_lignes(fh, format))
+        finally:
+            if rapport is not None:
+                rapport.close()
+        duree = time.perf_counter() - debut
+
+        if rapport is None:
+            for erreur in resultat.erreurs[:50]:
+                self.stderr.write(f"ligne {erreur['ligne']} ({erreur['phone']}) : {erreur['erreurs']}")
+            if resultat.rejetees > 50:
+                self.stderr.write(f"... {resultat.rejetees - 50} autres (utilisez --rapport)")
+
+        simulation = " (simulation, rien n'a été écrit)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultat.lues} lignes lues, {resultat.creees} pros créés, {resultat.rejetees} rejetées "
+            f"en {duree:.1f}s{simulation}."
+        ))
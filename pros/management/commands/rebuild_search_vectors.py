@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from annonces.models import Annonce
+from core.search import refresh_search_vector
+from pros.models import ProfilProfessionnel
+
+
+class Command(BaseCommand):
+    help = "Recalcule les tsvector de recherche (pros + annonces) : rattrapage après import ou changement de poids"
+
+    def handle(self, *args, **options):
+        # Les extensions unaccent / pg_trgm sont créées par la migration core.0001_postgres_extensions
+        nb_pros = refresh_search_vector(ProfilProfessionnel.objects.all(), ProfilProfessionnel.SEARCH_WEIGHTS)
+        nb_annonces = refresh_search_vector(Annonce.objects.all(), Annonce.SEARCH_WEIGHTS)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Index de recherche reconstruit : {nb_pros} pros, {nb_annonces} annonces."
+        ))
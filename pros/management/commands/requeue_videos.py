@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from pros.models import MediaPro
+from pros.videos import process_video
+
+
+class Command(BaseCommand):
+    help = (
+        "Relance le traitement des vidéos bloquées (EN_ATTENTE après un redémarrage du worker, "
+        "ou ECHEC avec --echecs) au-delà d'un délai ; traitement synchrone (à planifier en cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=30,
+            help="Minutes sans changement de statut avant relance (défaut: 30).",
+        )
+        parser.add_argument("--echecs", action="store_true", help="Relance aussi les vidéos en ECHEC.")
+        parser.add_argument("--limit", type=int, default=100, help="Nombre maximum de vidéos traitées.")
+        parser.add_argument("--dry-run", action="store_true", help="Liste les vidéos sans les traiter.")
+
+    def handle(self, *args, **options):
+        maintenant = timezone.now()
+        limite = maintenant - timedelta(minutes=options["older_than"])
+
+        statuts = [MediaPro.StatutTraitement.EN_ATTENTE]
+        if options["echecs"]:
+            statuts.append(MediaPro.StatutTraitement.ECHEC)
+
+        bloquees = (
+            MediaPro.objects
+            .filter(type_media=MediaPro.TypeMedia.VIDEO, statut_traitement__in=statuts)
+            .filter(Q(traitement_maj_le__lt=limite) | Q(traitement_maj_le__isnull=True, cree_le__lt=limite))
+        )
+        ids = list(bloquees.order_by("cree_le").values_list("pk", flat=True)[:max(1, options["limit"])])
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(ids)} vidéo(s) à relancer : {ids}")
+            return
+
+        relancees = 0
+        for pk in ids:
+            # Réservation : une autre exécution (ou le worker) ne reprend pas la même vidéo
+            reservee = bloquees.filter(pk=pk).update(
+                statut_traitement=MediaPro.StatutTraitement.EN_ATTENTE, traitement_maj_le=timezone.now()
+            )
+            if not reservee:
+                continue
+            process_video(pk)
+            relancees += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{relancees} vidéo(s) retraitée(s)."))
@@ -0,0 +1,179 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from accounts.models import User
+from annonces.models import Annonce
+from billing.models import Subscription
+from catalog.models import Job, JobCategory, Location
+from core.search import refresh_search_vector
+from pros.models import ContactFavori, MediaPro, ProfilProfessionnel
+
+# Préfixes réservés aux comptes synthétiques (supprimés par --reset)
+PREFIXE_PROS = "+22170"
+PREFIXE_CLIENTS = "+22171"
+BENCH_CLIENT_PHONE = f"{PREFIXE_CLIENTS}0000000"
+
+NOMS = ["Diallo", "Ndiaye", "Fall", "Sow", "Diop", "Ba", "Sarr", "Faye", "Cissé", "Mbaye", "Gueye", "Thiam"]
+ACTIVITES = ["Services", "Atelier", "Entreprise", "Solutions", "Pro", "& Fils", "Express", "Group"]
+MOTS = [
+    "réparation", "installation", "dépannage", "rapide", "qualité", "devis", "gratuit", "expérience",
+    "chantier", "maintenance", "urgence", "garantie", "professionnel", "domicile", "sérieux", "Dakar",
+]
+
+# Boîtes (lat_min, lat_max, lng_min, lng_max) : forte densité à Dakar, le reste sur le pays
+BOITE_DAKAR = (14.65, 14.80, -17.50, -17.25)
+BOITE_SENEGAL = (12.40, 16.60, -17.20, -11.50)
+
+
+class Command(BaseCommand):
+    help = "Jeu de données synthétique et reproductible pour les benchmarks (cf. benchmark_api)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pros", type=int, default=50000)
+        parser.add_argument("--annonces", type=int, default=200000)
+        parser.add_argument("--clients", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire (même graine = mêmes données).")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--reset", action="store_true", help="Supprime d'abord les données synthétiques existantes.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        debut = time.monotonic()
+
+        if options["reset"]:
+            supprimes, _ = User.objects.filter(phone__startswith=PREFIXE_PROS).delete()
+            supprimes_clients, _ = User.objects.filter(phone__startswith=PREFIXE_CLIENTS).delete()
+            self.stdout.write(f"Données synthétiques supprimées ({supprimes + supprimes_clients} lignes).")
+
+        if User.objects.filter(phone__startswith=PREFIXE_PROS).exists():
+            self.stdout.write(self.style.WARNING("Des données synthétiques existent déjà : relancez avec --reset."))
+            return
+
+        if not Location.objects.filter(type=Location.Type.DISTRICT).exists():
+            call_command("seed_catalog")
+
+        quartiers = list(
+            Location.objects.filter(type=Location.Type.DISTRICT)
+            .order_by("id")
+            .values_list("id", "name", "parent__parent__parent__name")
+        )
+        metiers = list(Job.objects.order_by("id").values_list("id", "name"))
+        categories = list(JobCategory.objects.filter(parent__isnull=False).order_by("id").values_list("id", flat=True))
+        if not metiers or not categories:
+            self.stdout.write(self.style.ERROR("Catalogue incomplet (métiers/catégories) : lancez seed_catalog."))
+            return
+
+        now = timezone.now()
+
+        with transaction.atomic():
+            # 1. Comptes pros + profils
+            users = User.objects.bulk_create(
+                [
+                    User(phone=f"{PREFIXE_PROS}{i:07d}", password="!", role=User.Role.PRO, whatsapp_verified=rng.random() < 0.8)
+                    for i in range(options["pros"])
+                ],
+                batch_size=batch_size,
+            )
+
+            profils = []
+            for user in users:
+                quartier_id, quartier_nom, region = rng.choice(quartiers)
+                metier_id, metier_nom = rng.choice(metiers)
+                boite = BOITE_DAKAR if region == "Dakar" or rng.random() < 0.3 else BOITE_SENEGAL
+                nom = f"{rng.choice(NOMS)} {rng.choice(ACTIVITES)}"
+                profils.append(ProfilProfessionnel(
+                    utilisateur=user,
+                    nom_entreprise=nom,
+                    metier_id=metier_id,
+                    zone_geographique_id=quartier_id,
+                    slug=f"{slugify(f'{metier_nom} {quartier_nom} {nom}')[:180]}-{user.id}",
+                    description=" ".join(rng.choices(MOTS, k=rng.randint(8, 30))),
+                    telephone_appel=user.phone,
+                    telephone_whatsapp=user.phone,
+                    statut_en_ligne=rng.choice(ProfilProfessionnel.StatutEnLigne.values),
+                    est_publie=rng.random() < 0.85,
+                    latitude=Decimal(f"{rng.uniform(boite[0], boite[1]):.6f}"),
+                    longitude=Decimal(f"{rng.uniform(boite[2], boite[3]):.6f}"),
+                    note_moyenne=Decimal(f"{rng.uniform(0, 5):.2f}"),
+                    nombre_avis=rng.randint(0, 200),
+                ))
+            profils = ProfilProfessionnel.objects.bulk_create(profils, batch_size=batch_size)
+            self.stdout.write(f"{len(profils)} pros créés.")
+
+            # 2. Abonnements (70% actifs) puis recopie de la visibilité
+            subs = []
+            for user in users:
+                if rng.random() < 0.7:
+                    start = now - timedelta(days=rng.randint(0, 25))
+                    subs.append(Subscription(user=user, status=Subscription.Status.ACTIVE, start_at=start, end_at=start + timedelta(days=30)))
+                else:
+                    start = now - timedelta(days=rng.randint(31, 120))
+                    subs.append(Subscription(user=user, status=Subscription.Status.EXPIRED, start_at=start, end_at=start + timedelta(days=30)))
+            Subscription.objects.bulk_create(subs, batch_size=batch_size)
+            Subscription.sync_all_pro_visibility([u.id for u in users])
+
+            # 3. Médias (fichiers fictifs : seuls les chemins sont utilisés par les listes)
+            medias = []
+            couvertures = []
+            for profil in profils:
+                if rng.random() < 0.4:
+                    for k in range(rng.randint(1, 4)):
+                        fichier = f"pros/media/bench-{profil.id}-{k}.jpg"
+                        medias.append(MediaPro(professionnel=profil, type_media=MediaPro.TypeMedia.PHOTO, fichier=fichier, est_principal=k == 0))
+                        if k == 0:
+                            profil.photo_couverture_fichier = fichier
+                            couvertures.append(profil)
+            MediaPro.objects.bulk_create(medias, batch_size=batch_size)
+            ProfilProfessionnel.objects.bulk_update(couvertures, ["photo_couverture_fichier"], batch_size=batch_size)
+            self.stdout.write(f"{len(medias)} médias créés.")
+
+            # 4. Clients + favoris (le premier client sert au scénario "favoris" du benchmark)
+            clients = User.objects.bulk_create(
+                [User(phone=f"{PREFIXE_CLIENTS}{i:07d}", password="!", role=User.Role.CLIENT) for i in range(options["clients"])],
+                batch_size=batch_size,
+            )
+            favoris = []
+            for index, client in enumerate(clients):
+                nombre = 50 if index == 0 else rng.randint(0, 20)
+                for profil in rng.sample(profils, min(nombre, len(profils))):
+                    favoris.append(ContactFavori(proprietaire=client, professionnel=profil))
+            ContactFavori.objects.bulk_create(favoris, batch_size=batch_size, ignore_conflicts=True)
+            self.stdout.write(f"{len(clients)} clients, {len(favoris)} favoris créés.")
+
+            # 5. Annonces
+            auteurs = users + clients
+            annonces = []
+            for i in range(options["annonces"]):
+                titre = " ".join(rng.choices(MOTS, k=rng.randint(3, 8))).capitalize()
+                annonces.append(Annonce(
+                    auteur=rng.choice(auteurs),
+                    type=rng.choice(Annonce.TypeAnnonce.values),
+                    titre=titre,
+                    slug=f"{slugify(titre)[:200]}-bench{i}",
+                    description=" ".join(rng.choices(MOTS, k=rng.randint(15, 60))),
+                    zone_geographique_id=rng.choice(quartiers)[0],
+                    telephone=f"{PREFIXE_CLIENTS}{rng.randint(0, 9999999):07d}",
+                    categorie_id=rng.choice(categories),
+                    est_approuvee=rng.random() < 0.9,
+                    nb_vues=rng.randint(0, 5000),
+                ))
+            Annonce.objects.bulk_create(annonces, batch_size=batch_size)
+            self.stdout.write(f"{len(annonces)} annonces créées.")
+
+            # 6. Index plein texte (une requête UPDATE par table)
+            refresh_search_vector(
+                ProfilProfessionnel.objects.filter(utilisateur__phone__startswith=PREFIXE_PROS),
+                ProfilProfessionnel.SEARCH_WEIGHTS,
+            )
+            refresh_search_vector(Annonce.objects.filter(slug__contains="-bench"), Annonce.SEARCH_WEIGHTS)
+
+        self.stdout.write(self.style.SUCCESS(f"Jeu de benchmark prêt en {time.monotonic() - debut:.1f}s."))
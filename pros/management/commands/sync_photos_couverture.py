@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from pros.models import MediaPro, ProfilProfessionnel
+
+
+class Command(BaseCommand):
+    help = "Recalcule photo_couverture_fichier (PHOTO principale) pour tous les profils pros"
+
+    def handle(self, *args, **options):
+        principal = MediaPro.objects.filter(
+            professionnel_id=OuterRef("pk"),
+            type_media=MediaPro.TypeMedia.PHOTO,
+            est_principal=True,
+        ).values("fichier")[:1]
+
+        total = ProfilProfessionnel.objects.update(
+            photo_couverture_fichier=Coalesce(Subquery(principal), Value(""))
+        )
+        self.stdout.write(self.style.SUCCESS(f"{total} profils pros synchronisés."))
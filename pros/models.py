@@ -4,13 +4,22 @@ from decimal import Decimal
 import os
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator, FileExtensionValidator
 from django.db import models
 from django.db.models import Q
+from django.utils import timezone
 from django.utils.text import slugify
 
+from accounts.cache import invalidate_user_cache
 from catalog.models import Job, Location
+from core.search import refresh_search_vector
+from core.slugs import allouer_slug, enregistrer_avec_slug
+from core.workers import submit_after_commit
+from pros.images import generate_image_variants
+from pros.videos import process_video
 
 
 class ProfilProfessionnel(models.Model):
@@ -49,6 +58,11 @@ class ProfilProfessionnel(models.Model):
     telephone_whatsapp = models.CharField(max_length=32, verbose_name="Téléphone (WhatsApp)")
 
     avatar = models.ImageField(upload_to="pros/avatars/", null=True, blank=True)
+    # Variantes WebP de l'avatar générées en tâche de fond (cf. pros.images)
+    avatar_variantes = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Dénormalisé : chemin du MediaPro PHOTO principal (maintenu par MediaPro.save/delete)
+    photo_couverture_fichier = models.CharField(max_length=255, blank=True, default="", editable=False)
 
     statut_en_ligne = models.CharField(
         max_length=10,
@@ -60,9 +74,21 @@ class ProfilProfessionnel(models.Model):
     # Business: paiement à jour => visible publiquement
     est_publie = models.BooleanField(default=False, verbose_name="Est visible publiquement")
 
+    # Dénormalisé depuis billing.Subscription (fin de l'abonnement ACTIVE, sinon null).
+    # Visible publiquement <=> est_publie ET abonnement_actif_jusqu_au > maintenant.
+    abonnement_actif_jusqu_au = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Abonnement actif jusqu'au",
+    )
+
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
 
+    # tsvector (nom + description, sans accents) maintenu par save() — cf. core.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     note_moyenne = models.DecimalField(
         max_digits=3,
         decimal_places=2,
@@ -80,6 +106,13 @@ class ProfilProfessionnel(models.Model):
         verbose_name_plural = "Profils Professionnels"
         indexes = [
             models.Index(fields=["est_publie", "metier", "zone_geographique", "statut_en_ligne"]),
+            models.Index(fields=["est_publie", "abonnement_actif_jusqu_au"], name="pro_visibilite_idx"),
+            # Extensions unaccent / pg_trgm : la migration générée pour ces index doit dépendre
+            # de ("core", "0001_postgres_extensions") (makemigrations ne l'ajoute pas)
+            GinIndex(fields=["search_vector"], name="pro_search_vector_gin"),
+            GinIndex(fields=["nom_entreprise"], name="pro_nom_trgm_gin", opclasses=["gin_trgm_ops"]),
+            # Préfiltre "bounding box" de la recherche par distance
+            models.Index(fields=["latitude", "longitude"], name="pro_lat_lng_idx"),
         ]
         constraints = [
             models.CheckConstraint(
@@ -97,33 +130,59 @@ class ProfilProfessionnel(models.Model):
         z_label = getattr(self.zone_geographique, "name", str(self.zone_geographique))
         return slugify(f"{m_label} {z_label} {self.nom_entreprise}")[:180]  # garde place pour suffixe
 
-    def _generate_unique_slug(self) -> str:
-        base = self._build_base_slug()
+    def _slug_base(self) -> str:
         uid = self.utilisateur_id or "new"
-        candidate = f"{base}-{uid}"[:200]
+        return f"{self._build_base_slug()}-{uid}"
 
-        # Si unique => OK
+    def _generate_unique_slug(self) -> str:
+        # Une seule requête (plus grand suffixe pris), cf. core.slugs
         qs = ProfilProfessionnel.objects.all()
         if self.pk:
             qs = qs.exclude(pk=self.pk)
+        return allouer_slug(qs, self._slug_base(), max_length=200)
 
-        if not qs.filter(slug=candidate).exists():
-            return candidate
-
-        # Sinon suffixe incrémental
-        i = 2
-        while True:
-            suffix = f"-{i}"
-            max_len = 200 - len(suffix)
-            cand = (candidate[:max_len] + suffix)[:200]
-            if not qs.filter(slug=cand).exists():
-                return cand
-            i += 1
+    SEARCH_WEIGHTS = {"nom_entreprise": "A", "description": "B"}
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = self._generate_unique_slug()
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            # Course sur le même slug : la contrainte d'unicité tranche, on réalloue
+            enregistrer_avec_slug(
+                self,
+                allouer=self._generate_unique_slug,
+                save=lambda: super(ProfilProfessionnel, self).save(*args, **kwargs),
+            )
+
+        if adding:
+            # L'id du profil est mis en cache avec l'utilisateur (cf. accounts.authentication)
+            invalidate_user_cache(self.utilisateur_id)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(self.SEARCH_WEIGHTS):
+            refresh_search_vector(ProfilProfessionnel.objects.filter(pk=self.pk), self.SEARCH_WEIGHTS)
+
+        if update_fields is None or "avatar" in update_fields:
+            if self.avatar and (self.avatar_variantes or {}).get("source") != self.avatar.name:
+                submit_after_commit(
+                    generate_image_variants, "pros.ProfilProfessionnel", self.pk, "avatar", "avatar_variantes"
+                )
+
+    def delete(self, *args, **kwargs):
+        utilisateur_id = self.utilisateur_id
+        result = super().delete(*args, **kwargs)
+        invalidate_user_cache(utilisateur_id)
+        return result
+
+    @classmethod
+    def definir_publication(cls, queryset, publie: bool) -> int:
+        """Publication / retrait en masse : une requête UPDATE sur les seuls profils qui changent d'état."""
+        return (
+            cls.objects.filter(pk__in=queryset.values("pk"))
+            .exclude(est_publie=publie)
+            .update(est_publie=publie, mis_a_jour_le=timezone.now())
+        )
 
     def __str__(self) -> str:
         # Evite d'exposer un numéro dans l'admin/logs
@@ -134,6 +193,11 @@ class MediaPro(models.Model):
         VIDEO = "VIDEO", "Vidéo"
         CV = "CV", "CV"
 
+    class StatutTraitement(models.TextChoices):
+        EN_ATTENTE = "EN_ATTENTE", "En cours de traitement"
+        PRET = "PRET", "Prêt"
+        ECHEC = "ECHEC", "Échec du traitement"
+
     professionnel = models.ForeignKey(
         ProfilProfessionnel,
         related_name="media",
@@ -151,12 +215,31 @@ class MediaPro(models.Model):
     )
 
     est_principal = models.BooleanField(default=False, verbose_name="Média principal")
+    # PHOTO : variantes WebP (thumb/medium) ; VIDEO : poster + version web (cf. pros.images / pros.videos)
+    variantes = models.JSONField(default=dict, blank=True, editable=False)
+
+    # VIDEO : traitée en tâche de fond, seules les vidéos PRET apparaissent dans la galerie publique
+    statut_traitement = models.CharField(
+        max_length=12,
+        choices=StatutTraitement.choices,
+        default=StatutTraitement.PRET,
+        verbose_name="Statut du traitement",
+    )
+    duree_secondes = models.FloatField(null=True, blank=True, editable=False)
+    largeur = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    hauteur = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # Dernier changement de statut_traitement : repère les vidéos bloquées (cf. requeue_videos)
+    traitement_maj_le = models.DateTimeField(null=True, blank=True, editable=False)
+
     cree_le = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = "Média Professionnel"
         verbose_name_plural = "Médias Professionnels"
-        indexes = [models.Index(fields=["professionnel", "type_media"])]
+        indexes = [
+            models.Index(fields=["professionnel", "type_media"]),
+            models.Index(fields=["professionnel", "statut_traitement"]),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["professionnel"],
@@ -165,6 +248,51 @@ class MediaPro(models.Model):
             )
         ]
 
+    def _variantes_a_jour(self) -> bool:
+        return (self.variantes or {}).get("source") == self.fichier.name
+
+    def save(self, *args, **kwargs):
+        video_a_traiter = (
+            self.type_media == self.TypeMedia.VIDEO and self.fichier and not self._variantes_a_jour()
+        )
+        if video_a_traiter:
+            self.statut_traitement = self.StatutTraitement.EN_ATTENTE
+            self.traitement_maj_le = timezone.now()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "statut_traitement", "traitement_maj_le"}
+
+        super().save(*args, **kwargs)
+        self.sync_photo_couverture(self.professionnel_id)
+
+        if video_a_traiter:
+            submit_after_commit(process_video, self.pk)
+        elif self.type_media == self.TypeMedia.PHOTO and self.fichier and not self._variantes_a_jour():
+            submit_after_commit(generate_image_variants, "pros.MediaPro", self.pk, "fichier", "variantes")
+
+    def delete(self, *args, **kwargs):
+        professionnel_id = self.professionnel_id
+        result = super().delete(*args, **kwargs)
+        self.sync_photo_couverture(professionnel_id)
+        return result
+
+    @classmethod
+    def sync_photo_couverture(cls, professionnel_id):
+        """
+        Recopie le chemin de la PHOTO principale sur le profil (lu par la recherche, sans prefetch).
+        La variante "medium" est préférée à l'original dès qu'elle existe.
+        """
+        principal = (
+            cls.objects
+            .filter(professionnel_id=professionnel_id, type_media=cls.TypeMedia.PHOTO, est_principal=True)
+            .values_list("fichier", "variantes")
+            .first()
+        )
+        chemin = ""
+        if principal:
+            fichier, variantes = principal
+            chemin = (variantes or {}).get("medium") or fichier
+        ProfilProfessionnel.objects.filter(pk=professionnel_id).update(photo_couverture_fichier=chemin)
+
     def clean(self):
         super().clean()
         if not self.fichier:
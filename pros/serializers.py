@@ -9,6 +9,8 @@ from rest_framework import serializers
 
 from pros.models import ProfilProfessionnel, ContactFavori, MediaPro
 from catalog.serializers import JobSerializer, LocationSerializer
+from core.fast_list import file_url
+from pros.images import variant_url
 
 
 class MediaProSerializer(serializers.ModelSerializer):
@@ -35,10 +37,36 @@ class MediaProSerializer(serializers.ModelSerializer):
         },
     }
 
+    variantes = serializers.SerializerMethodField()
+
     class Meta:
         model = MediaPro
-        fields = ["id", "type_media", "fichier", "est_principal", "cree_le"]
-        read_only_fields = ["id", "cree_le"]
+        fields = [
+            "id",
+            "type_media",
+            "fichier",
+            "variantes",
+            "statut_traitement",
+            "duree_secondes",
+            "largeur",
+            "hauteur",
+            "est_principal",
+            "cree_le",
+        ]
+        read_only_fields = ["id", "statut_traitement", "duree_secondes", "largeur", "hauteur", "cree_le"]
+
+    def get_variantes(self, obj) -> dict:
+        # PHOTO : {"thumb", "medium"} ; VIDEO : {"poster", "web"} — une fois générées
+        req = self.context.get("request")
+        storage = MediaPro._meta.get_field("fichier").storage
+        urls = {}
+        for rendition in (obj.variantes or {}):
+            if rendition == "source":
+                continue
+            url = variant_url(storage, obj.variantes, rendition)
+            if url:
+                urls[rendition] = req.build_absolute_uri(url) if req else url
+        return urls
 
     def validate_type_media(self, value: str) -> str:
         value = str(value).upper()
@@ -82,22 +110,26 @@ class MediaProSerializer(serializers.ModelSerializer):
 
         return value
 
-    def _get_pro_from_save_kwargs(self, validated_data):
+    def _get_pro_id_from_save_kwargs(self, validated_data) -> Optional[int]:
+        # serializer.save(professionnel=...) ou save(professionnel_id=...) (id issu du cache d'authentification)
         pro = validated_data.get("professionnel")
         if pro:
-            return pro
+            return pro.pk
+        if validated_data.get("professionnel_id"):
+            return validated_data["professionnel_id"]
         req = self.context.get("request")
-        if req and getattr(req.user, "is_authenticated", False) and hasattr(req.user, "pro_profile"):
-            return req.user.pro_profile
+        if req and getattr(req.user, "is_authenticated", False):
+            return req.user.get_pro_profile_id()
         return None
 
+    # Le profil (photo_couverture_fichier) est resynchronisé par MediaPro.save()
     @transaction.atomic
     def create(self, validated_data):
-        pro = self._get_pro_from_save_kwargs(validated_data)
-        if pro and validated_data.get("est_principal") is True:
-            MediaPro.objects.filter(professionnel=pro, est_principal=True).update(est_principal=False)
-        if pro and "professionnel" not in validated_data:
-            validated_data["professionnel"] = pro
+        pro_id = self._get_pro_id_from_save_kwargs(validated_data)
+        if pro_id and validated_data.get("est_principal") is True:
+            MediaPro.objects.filter(professionnel_id=pro_id, est_principal=True).update(est_principal=False)
+        if pro_id and "professionnel" not in validated_data:
+            validated_data["professionnel_id"] = pro_id
         return super().create(validated_data)
 
     @transaction.atomic
@@ -178,28 +210,8 @@ class _ProPublicBase(serializers.ModelSerializer):
         return obj.telephone_whatsapp if self._can_show_contacts(obj) else None
 
     def get_photo_couverture(self, obj) -> Optional[str]:
-        pre = getattr(obj, "photo_couverture_url", None)
-        if pre is not None:
-            return pre
-
-        try:
-            medias = obj.media.all()
-        except Exception:
-            return None
-
-        principal = None
-        for m in medias:
-            if m.type_media == "PHOTO" and m.est_principal:
-                principal = m
-                break
-
-        if not principal:
-            return None
-
-        try:
-            return principal.fichier.url if principal.fichier else None
-        except Exception:
-            return None
+        # Colonne dénormalisée (cf. MediaPro.sync_photo_couverture) : aucun accès aux médias
+        return file_url(MediaPro, "fichier", getattr(obj, "photo_couverture_fichier", ""))
 
 
 class ProPublicSerializer(_ProPublicBase):
@@ -231,7 +243,19 @@ class ProPublicSerializer(_ProPublicBase):
 
 
 class ProPublicListSerializer(_ProPublicBase):
-    # LISTE: pas de medias complets
+    # LISTE: pas de medias complets, avatar en miniature
+    avatar = serializers.SerializerMethodField()
+
+    def get_avatar(self, obj) -> Optional[str]:
+        storage = ProfilProfessionnel._meta.get_field("avatar").storage
+        url = variant_url(storage, obj.avatar_variantes, "thumb")
+        if url is None:
+            if not obj.avatar:
+                return None
+            url = obj.avatar.url
+        req = self.context.get("request")
+        return req.build_absolute_uri(url) if req else url
+
     class Meta:
         model = ProfilProfessionnel
         fields = [
@@ -278,3 +302,16 @@ class ContactFavoriSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context["request"].user
         return ContactFavori.objects.create(proprietaire=user, **validated_data)
+
+
+class ActionEnMasseSerializer(serializers.Serializer):
+    """Identifiants visés par une action d'administration en masse."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=5000,
+    )
+
+
+class PublicationEnMasseSerializer(ActionEnMasseSerializer):
+    est_publie = serializers.BooleanField()
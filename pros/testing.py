@@ -0,0 +1,36 @@
+"""Données de test partagées (tests de pros, billing, ...)."""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from accounts.models import User
+from catalog.models import Job, JobCategory, Location
+from pros.models import ProfilProfessionnel
+
+
+def creer_catalogue():
+    pays = Location.objects.create(name="Sénégal", type=Location.Type.COUNTRY, slug="senegal")
+    region = Location.objects.create(name="Dakar", type=Location.Type.REGION, parent=pays, slug="dakar-region")
+    categorie = JobCategory.objects.create(name="Bâtiment", slug="batiment")
+    metier = Job.objects.create(name="Plombier", slug="plombier", category=categorie)
+    return region, metier
+
+
+def creer_pro(phone, metier, zone, visible=True, **champs):
+    user = User.objects.create_user(phone=phone, password="motdepasse", role=User.Role.PRO)
+    pro = ProfilProfessionnel.objects.create(
+        utilisateur=user,
+        nom_entreprise=champs.pop("nom_entreprise", f"Atelier {phone[-4:]}"),
+        metier=metier,
+        zone_geographique=zone,
+        telephone_appel=phone,
+        telephone_whatsapp=phone,
+        est_publie=visible,
+        **champs,
+    )
+    if visible:
+        # Colonne normalement maintenue par billing.Subscription
+        ProfilProfessionnel.objects.filter(pk=pro.pk).update(
+            abonnement_actif_jusqu_au=timezone.now() + timedelta(days=30)
+        )
+    return pro
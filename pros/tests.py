@@ -1,3 +1,189 @@
-from django.test import TestCase
+import csv
+import io
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from catalog.models import Location
+from core.slugs import allouer_slug, allouer_slugs, enregistrer_avec_slug
+from pros.importer import ImportPros, lire_lignes
+from pros.models import ContactFavori, ProfilProfessionnel
+from pros.testing import creer_catalogue, creer_pro
+
+
+def csv_rows(fichier):
+    fichier.seek(0)
+    return list(csv.DictReader(fichier))
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Avec QUERY_BUDGET_STRICT, un dépassement du query_budget d'une vue lève QueryBudgetExceeded."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.zone, cls.metier = creer_catalogue()
+        cls.pros = [creer_pro(f"+2217700000{i:02d}", cls.metier, cls.zone) for i in range(15)]
+        cls.client_user = User.objects.create_user(phone="+221780000001", password="motdepasse")
+        ContactFavori.objects.bulk_create(
+            ContactFavori(proprietaire=cls.client_user, professionnel=pro) for pro in cls.pros
+        )
+
+    def auth(self):
+        token = RefreshToken.for_user(self.client_user).access_token
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_recherche_dans_le_budget(self):
+        response = self.client.get("/api/pros/recherche/", {"metier": self.metier.pk})
+        self.assertEqual(response.status_code, 200)
+
+    def test_recherche_anonyme_et_authentifiee(self):
+        self.assertEqual(self.client.get("/api/pros/recherche/").status_code, 200)
+        self.assertEqual(self.client.get("/api/pros/recherche/", **self.auth()).status_code, 200)
+
+    def test_detail_public_dans_le_budget(self):
+        response = self.client.get(f"/api/pros/public/{self.pros[0].slug}/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_favoris_dans_le_budget(self):
+        response = self.client.get("/api/pros/favoris/", **self.auth())
+        self.assertEqual(response.status_code, 200)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        zone, metier = creer_catalogue()
+        cls.ids = [creer_pro(f"+2217710000{i:02d}", metier, zone).pk for i in range(12)]
+        # Ex aequo sur le champ de tri : seul l'id départage
+        ProfilProfessionnel.objects.update(mis_a_jour_le=timezone.now())
+
+    def test_curseur_sur_le_tuple_sans_saut_ni_doublon(self):
+        vus, url, params = [], "/api/pros/recherche/", {"pagination": "cursor", "page_size": 5}
+        premiere = None
+        while url:
+            data = self.client.get(url, params).json()
+            premiere = premiere or data
+            vus += [row["id"] for row in data["results"]]
+            url, params = data["next"], None
+        self.assertEqual(vus, sorted(self.ids, reverse=True))
+
+        # Retour arrière depuis la 2e page : on retrouve exactement la 1re
+        deuxieme = self.client.get(premiere["next"]).json()
+        precedente = self.client.get(deuxieme["previous"]).json()
+        self.assertEqual(precedente["results"], premiere["results"])
+        self.assertIsNone(precedente["previous"])
+
+    def test_curseur_invalide(self):
+        response = self.client.get("/api/pros/recherche/", {"cursor": "pas-un-curseur"})
+        self.assertEqual(response.status_code, 404)
+
+
+class SlugTests(TestCase):
+    def test_allouer_slug_reprend_au_plus_grand_suffixe(self):
+        Location.objects.create(name="A", type=Location.Type.COUNTRY, slug="dakar")
+        Location.objects.create(name="B", type=Location.Type.COUNTRY, slug="dakar-2")
+        Location.objects.create(name="C", type=Location.Type.COUNTRY, slug="dakar-7")
+        # Même préfixe mais pas un suffixe numérique : ignoré
+        Location.objects.create(name="D", type=Location.Type.COUNTRY, slug="dakar-region")
+
+        self.assertEqual(allouer_slug(Location.objects.all(), "dakar", max_length=160), "dakar-8")
+        self.assertEqual(allouer_slug(Location.objects.all(), "thies", max_length=160), "thies")
+
+    def test_allouer_slugs_departage_les_doublons_du_lot(self):
+        Location.objects.create(name="A", type=Location.Type.COUNTRY, slug="dakar")
+        Location.objects.create(name="B", type=Location.Type.COUNTRY, slug="dakar-3")
+
+        slugs = allouer_slugs(Location.objects.all(), ["dakar", "thies", "dakar", "thies"], max_length=160)
+        self.assertEqual(slugs, ["dakar-4", "thies", "dakar-5", "thies-2"])
+
+    def test_enregistrer_avec_slug_realloue_apres_collision(self):
+        Location.objects.create(name="A", type=Location.Type.COUNTRY, slug="pris")
+        loc = Location(name="B", type=Location.Type.COUNTRY)
+        # Simule une course : le premier slug alloué vient d'être pris par un autre enregistrement
+        candidats = iter(["pris", "libre"])
+        enregistrer_avec_slug(loc, allouer=lambda: next(candidats), save=loc.save)
+
+        loc.refresh_from_db()
+        self.assertEqual(loc.slug, "libre")
+
+    def test_profils_homonymes_obtiennent_des_slugs_distincts(self):
+        zone, metier = creer_catalogue()
+        a = creer_pro("+221770000101", metier, zone, nom_entreprise="Atelier Diallo")
+        b = creer_pro("+221770000102", metier, zone, nom_entreprise="Atelier Diallo")
+        self.assertNotEqual(a.slug, b.slug)
+
+
+class ImportProsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.zone, cls.metier = creer_catalogue()
+        User.objects.create_user(phone="+221770009999", password="motdepasse")
+
+    def ligne(self, **champs):
+        return {"phone": "+221 77 123 45 67", "nom_entreprise": "Atelier Sow",
+                "metier": self.metier.slug, "zone": str(self.zone.pk), **champs}
+
+    def test_lignes_valides_creees_et_rejets_rapportes(self):
+        rapport = io.StringIO()
+        lignes = [
+            (2, self.ligne()),
+            (3, self.ligne(phone="+221770000001", metier="inconnu")),
+            (4, self.ligne(phone="abc")),
+            (5, self.ligne(phone="+" + "7" * 40)),
+            (6, self.ligne(phone="+221770000002", telephone_appel="x" * 50)),
+            (7, self.ligne(phone="+221770000003", latitude="95")),
+            (8, self.ligne(phone="+221770000004", nom_entreprise="N" * 200)),
+            (9, self.ligne()),  # doublon dans le fichier
+            (10, self.ligne(phone="+221770009999")),  # déjà inscrit
+            (11, {"__invalide__": True}),
+            (12, self.ligne(phone="+221770000008", longitude="NaN")),
+        ]
+        resultat = ImportPros(rapport=rapport).run(lignes)
+
+        self.assertEqual((resultat.lues, resultat.creees, resultat.rejetees), (11, 1, 10))
+        pro = ProfilProfessionnel.objects.get(utilisateur__phone="+221771234567")
+        self.assertFalse(pro.est_publie)
+        self.assertEqual(pro.telephone_appel, "+221771234567")
+        self.assertTrue(pro.slug)
+
+        motifs = {int(row["ligne"]): row["erreurs"] for row in csv_rows(rapport)}
+        self.assertEqual(sorted(motifs), [3, 4, 5, 6, 7, 8, 9, 10, 11, 12])
+        self.assertIn("metier introuvable", motifs[3])
+        self.assertIn("phone invalide", motifs[4])
+        self.assertIn("phone invalide", motifs[5])
+        self.assertIn("telephone_appel invalide", motifs[6])
+        self.assertIn("latitude hors limites", motifs[7])
+        self.assertIn("nom_entreprise trop long", motifs[8])
+        self.assertIn("double", motifs[9])
+        self.assertIn("déjà inscrit", motifs[10])
+        self.assertIn("JSON invalide", motifs[11])
+        self.assertIn("longitude invalide", motifs[12])
+
+    def test_dry_run_n_ecrit_rien(self):
+        resultat = ImportPros(dry_run=True).run([(2, self.ligne())])
+        self.assertEqual(resultat.creees, 1)
+        self.assertFalse(User.objects.filter(phone="+221771234567").exists())
+
+    def test_conflit_en_base_isole_la_ligne_fautive(self):
+        lignes = [(2, self.ligne()), (3, self.ligne(phone="+221770000005"))]
+        # Lot refusé (inscription concurrente), puis reprise ligne par ligne : la 2e échoue encore
+        with mock.patch.object(ImportPros, "_inserer", side_effect=[IntegrityError(), 1, IntegrityError()]):
+            resultat = ImportPros().run(lignes)
+
+        self.assertEqual((resultat.creees, resultat.rejetees), (1, 1))
+        self.assertEqual(resultat.erreurs[0]["ligne"], 3)
+
+    def test_lecture_csv_et_jsonl_binaire(self):
+        csv_bytes = io.BytesIO("phone,nom_entreprise\n+221770000006,Atelier\n".encode("utf-8"))
+        self.assertEqual(list(lire_lignes(csv_bytes, "csv")), [(2, {"phone": "+221770000006", "nom_entreprise": "Atelier"})])
+
+        jsonl = io.BytesIO(b'{"phone": "+221770000007"}\n\nnot json\n')
+        self.assertEqual(
+            list(lire_lignes(jsonl, "jsonl")),
+            [(1, {"phone": "+221770000007"}), (3, {"__invalide__": True})],
+        )
@@ -2,10 +2,12 @@ from django.urls import path
 from .views import (
     MonProfilProView,
     RechercheProView,
+    RechercheProFacettesView,
     PublicationProView,
     RetraitPublicationProView,
     AdminPublicationProView,
     AdminRetraitPublicationProView,
+    AdminPublicationEnMasseView,
     MediaProCreateView,
     MediaProDeleteView,
     ContactFavoriView,
@@ -17,6 +19,8 @@ urlpatterns = [
     # --- Recherche Publique ---
     # Endpoint pour le mobile : GET /api/pros/recherche/?job=...&lat=...
     path("recherche/", RechercheProView.as_view(), name="pro_recherche"),
+    # Comptes par métier / zone / statut pour les mêmes filtres (une seule requête)
+    path("recherche/facettes/", RechercheProFacettesView.as_view(), name="pro_recherche_facettes"),
     path("public/<slug:slug>/", ProPublicDetailView.as_view(), name="pro_public_detail"),
 
     # --- Espace Professionnel (Gestion de soi) ---
@@ -37,4 +41,5 @@ urlpatterns = [
     # --- Administration (Modération) ---
     path("admin/<int:pro_id>/publier/", AdminPublicationProView.as_view(), name="admin_pro_publier"),
     path("admin/<int:pro_id>/masquer/", AdminRetraitPublicationProView.as_view(), name="admin_pro_masquer"),
+    path("admin/publication/", AdminPublicationEnMasseView.as_view(), name="admin_pro_publication_masse"),
 ]
\ No newline at end of file
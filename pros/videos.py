@@ -0,0 +1,125 @@
+"""
+Traitement asynchrone des vidéos MediaPro (upload -> EN_ATTENTE -> PRET / ECHEC).
+
+Le worker (cf. core.workers) :
+- lit durée et dimensions (ffprobe),
+- extrait une image d'aperçu (poster JPEG),
+- produit une version web (H.264/AAC, 720p max, "faststart" pour la lecture progressive).
+Les chemins sont enregistrés dans MediaPro.variantes ({"source", "poster", "web"}).
+
+ffmpeg/ffprobe sont des binaires système optionnels : s'ils sont absents,
+la vidéo est publiée telle quelle (PRET, sans poster ni version web).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.apps import apps
+from django.core.files import File
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_TIMEOUT = 10 * 60
+WEB_MAX_HEIGHT = 720
+
+
+def _probe(ffprobe: str, source_path: str) -> dict:
+    result = subprocess.run(
+        [
+            ffprobe, "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height:format=duration",
+            "-of", "json",
+            source_path,
+        ],
+        capture_output=True, check=True, timeout=FFMPEG_TIMEOUT,
+    )
+    data = json.loads(result.stdout or b"{}")
+    stream = (data.get("streams") or [{}])[0]
+    duree = (data.get("format") or {}).get("duration")
+    return {
+        "largeur": stream.get("width"),
+        "hauteur": stream.get("height"),
+        "duree_secondes": float(duree) if duree else None,
+    }
+
+
+def _ffmpeg(ffmpeg: str, *args: str) -> None:
+    subprocess.run([ffmpeg, "-y", "-v", "error", *args], capture_output=True, check=True, timeout=FFMPEG_TIMEOUT)
+
+
+def _store(storage, nom: str, chemin_local: str) -> str:
+    if storage.exists(nom):
+        storage.delete(nom)
+    with open(chemin_local, "rb") as fh:
+        return storage.save(nom, File(fh))
+
+
+def process_video(pk: int) -> None:
+    MediaPro = apps.get_model("pros.MediaPro")
+    source = (
+        MediaPro.objects
+        .filter(pk=pk, type_media=MediaPro.TypeMedia.VIDEO)
+        .values_list("fichier", flat=True)
+        .first()
+    )
+    if not source:
+        return
+
+    # Toutes les écritures sont conditionnées au fichier source (un nouvel upload n'est pas écrasé)
+    media_qs = MediaPro.objects.filter(pk=pk, fichier=source)
+
+    ffmpeg, ffprobe = shutil.which("ffmpeg"), shutil.which("ffprobe")
+    if not ffmpeg or not ffprobe:
+        logger.warning("ffmpeg/ffprobe introuvables : vidéo MediaPro #%s publiée sans traitement.", pk)
+        media_qs.update(
+            statut_traitement=MediaPro.StatutTraitement.PRET, variantes={"source": source}, traitement_maj_le=timezone.now()
+        )
+        return
+
+    storage = MediaPro._meta.get_field("fichier").storage
+    root, ext = os.path.splitext(source)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            source_path = os.path.join(tmp, f"source{ext}")
+            with storage.open(source, "rb") as src, open(source_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+
+            meta = _probe(ffprobe, source_path)
+
+            poster_path = os.path.join(tmp, "poster.jpg")
+            seek = "1" if (meta["duree_secondes"] or 0) > 1 else "0"
+            _ffmpeg(ffmpeg, "-ss", seek, "-i", source_path, "-frames:v", "1", "-vf", "scale=640:-2", poster_path)
+
+            web_path = os.path.join(tmp, "web.mp4")
+            _ffmpeg(
+                ffmpeg, "-i", source_path,
+                "-vf", f"scale=-2:'min({WEB_MAX_HEIGHT},ih)'",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", "28",
+                "-c:a", "aac", "-b:a", "96k",
+                "-movflags", "+faststart",
+                web_path,
+            )
+
+            variantes = {
+                "source": source,
+                "poster": _store(storage, f"{root}__poster.jpg", poster_path),
+                "web": _store(storage, f"{root}__web.mp4", web_path),
+            }
+    except (OSError, ValueError, subprocess.SubprocessError) as exc:
+        logger.warning("Traitement vidéo MediaPro #%s en échec : %s", pk, exc)
+        media_qs.update(
+            statut_traitement=MediaPro.StatutTraitement.ECHEC, variantes={"source": source}, traitement_maj_le=timezone.now()
+        )
+        return
+
+    media_qs.update(
+        statut_traitement=MediaPro.StatutTraitement.PRET, variantes=variantes, traitement_maj_le=timezone.now(), **meta
+    )
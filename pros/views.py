@@ -4,16 +4,18 @@ Gestion des recherches, publications, favoris et médias
 """
 from __future__ import annotations
 
+import hashlib
+import math
 from typing import Optional
 
+from django.core.cache import cache
+from django.db import connection
 from django.db.models import (
     F,
     FloatField,
     Value,
     ExpressionWrapper,
     Prefetch,
-    OuterRef,
-    Exists,
     Q,
 )
 from django.db.models.functions import Radians, Sin, Cos, ACos, Greatest, Least
@@ -24,9 +26,11 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions, status, filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 
-from billing.models import Subscription
+from core.fast_list import FastListMixin, decimal_str, file_url
+from core.pagination import PaginationHybride
+from core.search import RechercheTexteFilter
+from .filters import RechercheProFilter
 from .models import ProfilProfessionnel, ContactFavori, MediaPro
 from .serializers import (
     ProMeSerializer,
@@ -34,6 +38,7 @@ from .serializers import (
     ProPublicListSerializer,    # Liste (sans medias)
     ContactFavoriSerializer,
     MediaProSerializer,
+    PublicationEnMasseSerializer,
 )
 from .permissions import EstProfessionnel, EstAdministrateur
 
@@ -42,7 +47,7 @@ from .permissions import EstProfessionnel, EstAdministrateur
 # PAGINATION
 # ============================================================================
 
-class PaginationRecherchePro(PageNumberPagination):
+class PaginationRecherchePro(PaginationHybride):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
@@ -52,40 +57,187 @@ class PaginationRecherchePro(PageNumberPagination):
 # HELPERS
 # ============================================================================
 
-def _active_subscription_subquery(now_dt):
-    return Subscription.objects.filter(
-        user_id=OuterRef("utilisateur_id"),
-        status=Subscription.Status.ACTIVE,
-        end_at__gt=now_dt,
+def _q_visible(now_dt) -> Q:
+    # Publié + abonnement actif (colonne maintenue par billing.Subscription)
+    return Q(est_publie=True, abonnement_actif_jusqu_au__gt=now_dt)
+
+
+RAYON_TERRE_KM = 6371.0
+KM_PAR_DEGRE_LATITUDE = 111.045
+
+
+def _bounding_box(lat: float, lng: float, rayon_km: float):
+    """
+    Rectangle (lat_min, lat_max, lng_min, lng_max) englobant le cercle de rayon `rayon_km`.
+    Sert de préfiltre indexable (index latitude/longitude) avant le calcul exact de distance.
+    lng_min/lng_max valent None si la boîte couvre toutes les longitudes (pôles, antiméridien).
+    """
+    delta_lat = rayon_km / KM_PAR_DEGRE_LATITUDE
+    lat_min = max(-90.0, lat - delta_lat)
+    lat_max = min(90.0, lat + delta_lat)
+
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat <= 1e-6:
+        return lat_min, lat_max, None, None
+
+    delta_lng = rayon_km / (KM_PAR_DEGRE_LATITUDE * cos_lat)
+    lng_min = lng - delta_lng
+    lng_max = lng + delta_lng
+    if lng_min < -180 or lng_max > 180:
+        return lat_min, lat_max, None, None
+
+    return lat_min, lat_max, lng_min, lng_max
+
+
+def _distance_expression(lat_f: float, lng_f: float):
+    # Spherical law of cosines + clamp [-1, 1]
+    cos_val = (
+        Cos(Radians(Value(lat_f))) * Cos(Radians(F("latitude"))) *
+        Cos(Radians(F("longitude")) - Radians(Value(lng_f))) +
+        Sin(Radians(Value(lat_f))) * Sin(Radians(F("latitude")))
     )
+    cos_val_clamped = Least(Value(1.0), Greatest(Value(-1.0), cos_val))
 
+    return ExpressionWrapper(
+        Value(RAYON_TERRE_KM) * ACos(cos_val_clamped),
+        output_field=FloatField(),
+    )
 
-def _annotate_active_subscription(qs, now_dt):
-    return qs.annotate(has_active_subscription=Exists(_active_subscription_subquery(now_dt)))
+
+def _compter_facettes(qs) -> dict:
+    """
+    Comptes par métier, zone et statut (plus le total) en UNE requête :
+    GROUP BY GROUPING SETS sur le jeu filtré de la recherche.
+    """
+    sql, params = (
+        qs.order_by()
+        .values(
+            f_metier_id=F("metier_id"),
+            f_metier_nom=F("metier__name"),
+            f_zone_id=F("zone_geographique_id"),
+            f_zone_nom=F("zone_geographique__name"),
+            f_statut=F("statut_en_ligne"),
+        )
+        .query.sql_with_params()
+    )
+    requete = f"""
+        SELECT f_metier_id, f_metier_nom, f_zone_id, f_zone_nom, f_statut,
+               GROUPING(f_metier_id), GROUPING(f_zone_id), GROUPING(f_statut), COUNT(*)
+        FROM ({sql}) AS recherche
+        GROUP BY GROUPING SETS ((f_metier_id, f_metier_nom), (f_zone_id, f_zone_nom), (f_statut), ())
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(requete, params)
+        lignes = cursor.fetchall()
+
+    statuts = dict(ProfilProfessionnel.StatutEnLigne.choices)
+    facettes = {"count": 0, "metier": [], "zone_geographique": [], "statut_en_ligne": []}
+    for metier_id, metier_nom, zone_id, zone_nom, statut, g_metier, g_zone, g_statut, total in lignes:
+        if not g_metier:
+            facettes["metier"].append({"id": metier_id, "name": metier_nom, "count": total})
+        elif not g_zone:
+            facettes["zone_geographique"].append({"id": zone_id, "name": zone_nom, "count": total})
+        elif not g_statut:
+            facettes["statut_en_ligne"].append({"value": statut, "label": statuts.get(statut, statut), "count": total})
+        else:
+            facettes["count"] = total
+
+    for cle in ("metier", "zone_geographique", "statut_en_ligne"):
+        facettes[cle].sort(key=lambda f: -f["count"])
+    return facettes
 
 
 # ============================================================================
 # VUES PUBLIQUES
 # ============================================================================
 
-class RechercheProView(generics.ListAPIView):
+class RechercheProView(FastListMixin, generics.ListAPIView):
     """
     Recherche (LIST) optimisée mobile:
     - uniquement profils publiés + abonnement actif
     - serializer léger (sans medias)
-    - photo_couverture: prefetch uniquement PHOTOS
+    - photo_couverture: colonne dénormalisée (aucun prefetch de médias)
     - distance_km: annotée si lat/lng fournis
+    - search: plein texte Postgres (tsvector + trigram), trié par pertinence
+    - radius_km: préfiltre bounding box indexé, puis distance exacte sur les candidats
+    - zone: recherche hiérarchique (région/département/ville/quartier + zones d'intervention)
+    - GET JSON: rendu rapide via .values() (même schéma que ProPublicListSerializer)
     """
     permission_classes = [permissions.AllowAny]
+    query_budget = 5
     serializer_class = ProPublicListSerializer
     pagination_class = PaginationRecherchePro
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ["metier", "zone_geographique", "statut_en_ligne"]
-    search_fields = ["nom_entreprise", "description"]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, RechercheTexteFilter]
+    filterset_class = RechercheProFilter
+    search_trigram_field = "nom_entreprise"
     ordering_fields = ["cree_le", "mis_a_jour_le"]
     ordering = ["-mis_a_jour_le"]
 
+    fast_values = (
+        "id",
+        "slug",
+        "nom_entreprise",
+        "metier__name",
+        "zone_geographique__name",
+        "description",
+        "telephone_appel",
+        "telephone_whatsapp",
+        "avatar",
+        "avatar_variantes",
+        "statut_en_ligne",
+        "utilisateur_id",
+        "utilisateur__whatsapp_verified",
+        "est_publie",
+        "latitude",
+        "longitude",
+        "note_moyenne",
+        "cree_le",
+        "mis_a_jour_le",
+        "photo_couverture_fichier",
+    )
+
+    def fast_row(self, row: dict, ctx: dict) -> dict:
+        contactable = row["est_publie"] or row["utilisateur_id"] == ctx["user_id"]
+        return {
+            "id": row["id"],
+            "slug": row["slug"],
+            "nom_entreprise": row["nom_entreprise"],
+            "metier_name": row["metier__name"],
+            "zone_name": row["zone_geographique__name"],
+            "description": row["description"],
+            "telephone_appel": row["telephone_appel"] if contactable else None,
+            "telephone_whatsapp": row["telephone_whatsapp"] if contactable else None,
+            "is_contactable": contactable,
+            "avatar": file_url(
+                ProfilProfessionnel,
+                "avatar",
+                (row["avatar_variantes"] or {}).get("thumb") or row["avatar"],
+                ctx["request"],
+            ),
+            "photo_couverture": file_url(MediaPro, "fichier", row["photo_couverture_fichier"]),
+            "statut_en_ligne": row["statut_en_ligne"],
+            "whatsapp_verifie": row["utilisateur__whatsapp_verified"],
+            "latitude": decimal_str(row["latitude"]),
+            "longitude": decimal_str(row["longitude"]),
+            "distance_km": row.get("distance_km"),
+            "note_moyenne": decimal_str(row["note_moyenne"]),
+        }
+
+    def get_cursor_ordering(self, queryset):
+        # Clés du mode curseur : (distance_km, id) ou (<champ de tri>, id)
+        if self.request.query_params.get("sort") == "distance" and "distance_km" in queryset.query.annotations:
+            return ("distance_km", "id")
+
+        if "pertinence" in queryset.query.annotations and not self.request.query_params.get("ordering"):
+            return ("-pertinence", "-id")
+
+        tri = self.request.query_params.get("ordering", "")
+        if tri.lstrip("-") in self.ordering_fields:
+            return (tri, "-id" if tri.startswith("-") else "id")
+
+        return ("-mis_a_jour_le", "-id")
+
     def get_queryset(self):
         now_dt = now()
 
@@ -93,17 +245,7 @@ class RechercheProView(generics.ListAPIView):
             ProfilProfessionnel.objects
             .select_related("utilisateur", "metier", "zone_geographique")
         )
-        qs = _annotate_active_subscription(qs, now_dt).filter(est_publie=True, has_active_subscription=True)
-
-        # Précharge seulement les PHOTOS (pour photo_couverture) => léger
-        qs = qs.prefetch_related(
-            Prefetch(
-                "media",
-                queryset=MediaPro.objects.filter(type_media=MediaPro.TypeMedia.PHOTO).only(
-                    "id", "professionnel_id", "type_media", "est_principal", "fichier", "cree_le"
-                ),
-            )
-        )
+        qs = qs.filter(_q_visible(now_dt))
 
         lat = self.request.query_params.get("lat")
         lng = self.request.query_params.get("lng")
@@ -120,28 +262,26 @@ class RechercheProView(generics.ListAPIView):
 
                 qs = qs.exclude(latitude__isnull=True).exclude(longitude__isnull=True)
 
-                # Spherical law of cosines + clamp [-1, 1]
-                cos_val = (
-                    Cos(Radians(Value(lat_f))) * Cos(Radians(F("latitude"))) *
-                    Cos(Radians(F("longitude")) - Radians(Value(lng_f))) +
-                    Sin(Radians(Value(lat_f))) * Sin(Radians(F("latitude")))
-                )
-                cos_val_clamped = Least(Value(1.0), Greatest(Value(-1.0), cos_val))
-
-                distance_expr = ExpressionWrapper(
-                    Value(6371.0) * ACos(cos_val_clamped),
-                    output_field=FloatField(),
-                )
-
-                qs = qs.annotate(distance_km=distance_expr)
-
+                r = None
                 if rayon_km:
                     try:
                         r = float(rayon_km)
-                        if r > 0:
-                            qs = qs.filter(distance_km__lte=r)
                     except (ValueError, TypeError):
-                        pass
+                        r = None
+                    if r is not None and not r > 0:
+                        r = None
+
+                # Préfiltre grossier (index latitude/longitude) : la trigo ne porte que sur les candidats
+                if r is not None:
+                    lat_min, lat_max, lng_min, lng_max = _bounding_box(lat_f, lng_f, r)
+                    qs = qs.filter(latitude__gte=lat_min, latitude__lte=lat_max)
+                    if lng_min is not None:
+                        qs = qs.filter(longitude__gte=lng_min, longitude__lte=lng_max)
+
+                qs = qs.annotate(distance_km=_distance_expression(lat_f, lng_f))
+
+                if r is not None:
+                    qs = qs.filter(distance_km__lte=r)
 
                 if tri == "distance":
                     qs = qs.order_by("distance_km", "-mis_a_jour_le")
@@ -152,15 +292,47 @@ class RechercheProView(generics.ListAPIView):
         return qs
 
 
+class RechercheProFacettesView(RechercheProView):
+    """
+    Facettes de la recherche : mêmes paramètres que RechercheProView
+    (metier, zone_geographique, zone, statut_en_ligne, search, lat/lng/radius_km),
+    comptes par métier / zone / statut calculés en une requête groupée.
+    Résultat mis en cache quelques secondes par requête normalisée.
+    """
+    query_budget = 4
+    pagination_class = None
+    FACETTES_TIMEOUT = 60
+    # Paramètres sans effet sur le jeu filtré (pagination, tri)
+    PARAMS_IGNORES = {"page", "page_size", "cursor", "pagination", "count", "ordering", "sort"}
+
+    def _cle_cache(self) -> str:
+        params = sorted(
+            (k, v)
+            for k, values in self.request.query_params.lists()
+            if k not in self.PARAMS_IGNORES
+            for v in values
+        )
+        return "pros:facettes:" + hashlib.md5(repr(params).encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        cle = self._cle_cache()
+        facettes = cache.get(cle)
+        if facettes is None:
+            facettes = _compter_facettes(self.filter_queryset(self.get_queryset()))
+            cache.set(cle, facettes, timeout=self.FACETTES_TIMEOUT)
+        return Response(facettes)
+
+
 class ProPublicDetailView(generics.RetrieveAPIView):
     """
     Détail public (DETAIL):
     - Public: est_publie=True + abonnement actif
     - Propriétaire: voit toujours son profil
     - serializer complet (avec medias)
-    - prefetch: TOUS les médias
+    - prefetch: tous les médias PRÊTS (vidéos en cours de traitement exclues)
     """
     permission_classes = [permissions.AllowAny]
+    query_budget = 5
     serializer_class = ProPublicSerializer
     lookup_field = "slug"
 
@@ -171,35 +343,44 @@ class ProPublicDetailView(generics.RetrieveAPIView):
             ProfilProfessionnel.objects
             .select_related("metier", "zone_geographique", "utilisateur")
         )
-        qs = _annotate_active_subscription(qs, now_dt)
-
-        # Galerie complète
+        # Galerie complète (médias prêts uniquement : vidéos traitées)
         qs = qs.prefetch_related(
             Prefetch(
                 "media",
-                queryset=MediaPro.objects.only(
-                    "id", "professionnel_id", "type_media", "est_principal", "fichier", "cree_le"
+                queryset=MediaPro.objects.filter(statut_traitement=MediaPro.StatutTraitement.PRET).only(
+                    "id", "professionnel_id", "type_media", "est_principal", "fichier", "variantes",
+                    "statut_traitement", "duree_secondes", "largeur", "hauteur", "cree_le",
                 ).order_by("-est_principal", "type_media", "cree_le"),
             )
         )
 
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
-            return qs.filter(Q(utilisateur=user) | Q(est_publie=True, has_active_subscription=True))
+            return qs.filter(Q(utilisateur=user) | _q_visible(now_dt))
 
-        return qs.filter(est_publie=True, has_active_subscription=True)
+        return qs.filter(_q_visible(now_dt))
 
 
 # ============================================================================
 # VUES PROFESSIONNELLES (DASHBOARD)
 # ============================================================================
 
+def _mon_profil(request) -> ProfilProfessionnel:
+    """
+    Profil du pro connecté, lu par clé primaire (id fourni par le cache d'authentification).
+    L'utilisateur déjà chargé est réutilisé : pas de seconde lecture de la table User.
+    """
+    pro = get_object_or_404(ProfilProfessionnel, pk=request.user.get_pro_profile_id())
+    pro.utilisateur = request.user
+    return pro
+
+
 class MonProfilProView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated, EstProfessionnel]
     serializer_class = ProMeSerializer
 
     def get_object(self):
-        return get_object_or_404(ProfilProfessionnel, utilisateur=self.request.user)
+        return _mon_profil(self.request)
 
 
 class PublicationProView(APIView):
@@ -211,15 +392,12 @@ class PublicationProView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated, EstProfessionnel]
 
-    def _abonnement_actif(self, user) -> bool:
-        return Subscription.objects.filter(
-            user=user,
-            status=Subscription.Status.ACTIVE,
-            end_at__gt=now(),
-        ).exists()
+    def _abonnement_actif(self, pro) -> bool:
+        fin = pro.abonnement_actif_jusqu_au
+        return bool(fin and fin > now())
 
     def post(self, request):
-        pro = get_object_or_404(ProfilProfessionnel, utilisateur=request.user)
+        pro = _mon_profil(request)
 
         if not getattr(request.user, "whatsapp_verified", False):
             return Response(
@@ -227,7 +405,7 @@ class PublicationProView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if not self._abonnement_actif(request.user):
+        if not self._abonnement_actif(pro):
             return Response(
                 {"detail": "Abonnement inactif. Veuillez régler 1000F/mois pour être visible."},
                 status=status.HTTP_402_PAYMENT_REQUIRED,
@@ -255,7 +433,7 @@ class RetraitPublicationProView(APIView):
     permission_classes = [permissions.IsAuthenticated, EstProfessionnel]
 
     def post(self, request):
-        pro = get_object_or_404(ProfilProfessionnel, utilisateur=request.user)
+        pro = _mon_profil(request)
         pro.est_publie = False
         pro.save(update_fields=["est_publie"])
         return Response({"detail": "Profil masqué avec succès.", "est_publie": False})
@@ -285,16 +463,37 @@ class AdminRetraitPublicationProView(APIView):
         return Response({"detail": "Profil dépublié par l'administrateur.", "professionnel_id": pro.id})
 
 
+class AdminPublicationEnMasseView(APIView):
+    """
+    Publication / retrait de plusieurs profils en une requête.
+    POST {"ids": [...], "est_publie": true|false}
+    """
+    permission_classes = [permissions.IsAuthenticated, EstAdministrateur]
+
+    def post(self, request):
+        serializer = PublicationEnMasseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        est_publie = serializer.validated_data["est_publie"]
+        modifies = ProfilProfessionnel.definir_publication(
+            ProfilProfessionnel.objects.filter(pk__in=serializer.validated_data["ids"]), est_publie
+        )
+        return Response({"est_publie": est_publie, "modifies": modifies})
+
+
 # ============================================================================
 # VUES MÉDIAS
 # ============================================================================
 
 class MediaProCreateView(generics.CreateAPIView):
+    """
+    Ajout d'un média. Les VIDEO sont renvoyées avec statut_traitement=EN_ATTENTE :
+    poster, métadonnées et version web sont produits en tâche de fond (pros.videos).
+    """
     permission_classes = [permissions.IsAuthenticated, EstProfessionnel]
     serializer_class = MediaProSerializer
 
     def perform_create(self, serializer):
-        serializer.save(professionnel=self.request.user.pro_profile)
+        serializer.save(professionnel_id=self.request.user.get_pro_profile_id())
 class MediaProDeleteView(generics.DestroyAPIView):
     """
     Permet à un professionnel de supprimer un de ses propres médias.
@@ -304,14 +503,17 @@ class MediaProDeleteView(generics.DestroyAPIView):
 
     def get_queryset(self):
         # On ne peut supprimer que les médias qui appartiennent à l'utilisateur connecté
-        return MediaPro.objects.filter(professionnel__utilisateur=self.request.user)
+        return MediaPro.objects.filter(professionnel_id=self.request.user.get_pro_profile_id())
 # ============================================================================
 # VUES FAVORIS
 # ============================================================================
 
 class ContactFavoriView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 6
     serializer_class = ContactFavoriSerializer
+    pagination_class = PaginationHybride
+    cursor_ordering = ("-cree_le", "-id")
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
@@ -328,7 +530,6 @@ class ContactFavoriView(generics.ListCreateAPIView):
                 "professionnel__metier",
                 "professionnel__zone_geographique",
             )
-            .prefetch_related("professionnel__media")
             .filter(proprietaire=self.request.user)
             .order_by("-id")
         )